@@ -0,0 +1,114 @@
+// Applies the snapshots pushed by live_metrics.MetricsPublisher to the dashboard in the browser.
+// Each chart takes a snapshot only while its figure has the shape the snapshot was built for;
+// otherwise `shapes` asks the server callbacks for a fresh figure.
+(function () {
+    var socket = null;
+    var latest = null;
+
+    function connect() {
+        if (socket === null && window.io) {
+            socket = window.io('/metrics');
+            socket.on('metrics', function (snapshot) { latest = snapshot; });
+        }
+    }
+
+    function same(a, b) {
+        return (a === undefined ? null : a) === (b === undefined ? null : b);
+    }
+
+    // Copy of `figure` with trace `index` updated; `marker` holds changes to the trace's marker.
+    function updateTrace(figure, index, changes, marker) {
+        var fig = Object.assign({}, figure);
+        fig.data = figure.data.slice();
+        var trace = Object.assign({}, fig.data[index], changes);
+        if (marker) {
+            trace.marker = Object.assign({}, fig.data[index].marker, marker);
+        }
+        fig.data[index] = trace;
+        return fig;
+    }
+
+    function ready(snapshot, figure, name) {
+        return snapshot && snapshot[name] && figure && figure.data && figure.data.length;
+    }
+
+    var noUpdate = function () { return window.dash_clientside.no_update; };
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        live: {
+            poll: function (n, current) {
+                connect();
+                if (latest === null || (current && current.version === latest.version)) {
+                    return noUpdate();
+                }
+                return latest;
+            },
+
+            // Whether pushes are arriving; until they are, the server callbacks keep polling.
+            connected: function (n, current) {
+                connect();
+                var up = socket !== null && socket.connected;
+                return up === current ? noUpdate() : up;
+            },
+
+            stats: function (snapshot) {
+                return snapshot && snapshot.stats ? snapshot.stats : noUpdate();
+            },
+
+            shapes: function (snapshot, map, cache, latency, regional, timeline) {
+                if (!snapshot) {
+                    return noUpdate();
+                }
+                var s = snapshot.shapes;
+                if ((map && map.base) === s.map && same(cache, s.cache) && same(latency, s.latency) &&
+                        same(regional, s.regional) && same(timeline ? 'timeline' : null, s.timeline)) {
+                    return noUpdate();
+                }
+                return {version: snapshot.version, shapes: s};
+            },
+
+            map: function (snapshot, figure, shape) {
+                if (!ready(snapshot, figure, 'map') || !shape || shape.base !== snapshot.shapes.map) {
+                    return noUpdate();
+                }
+                var m = snapshot.map;
+                return updateTrace(figure, figure.data.length - 1, {text: m.text}, {size: m.size});
+            },
+
+            cache: function (snapshot, figure, shape) {
+                if (!ready(snapshot, figure, 'cache') || shape === null || shape !== snapshot.shapes.cache) {
+                    return noUpdate();
+                }
+                var c = snapshot.cache;
+                var fig = updateTrace(figure, 0, {x: c.x, y: c.y, text: c.y}, {color: c.y});
+                fig = updateTrace(fig, 1, {y: c.hit_ratio});
+                return updateTrace(fig, 2, {y: c.byte_hit_ratio});
+            },
+
+            latency: function (snapshot, figure, shape) {
+                if (!ready(snapshot, figure, 'latency') || shape === null || shape !== snapshot.shapes.latency) {
+                    return noUpdate();
+                }
+                var l = snapshot.latency;
+                var fig = updateTrace(figure, 0, {x: l.x});
+                fig.layout = Object.assign({}, figure.layout, {shapes: l.shapes, annotations: l.annotations});
+                return fig;
+            },
+
+            regional: function (snapshot, figure, shape) {
+                if (!ready(snapshot, figure, 'regional') || shape === null || shape !== snapshot.shapes.regional) {
+                    return noUpdate();
+                }
+                return updateTrace(figure, 0, {values: snapshot.regional.values});
+            },
+
+            timeline: function (snapshot, figure, shape) {
+                if (!ready(snapshot, figure, 'timeline') || !shape) {
+                    return noUpdate();
+                }
+                var t = snapshot.timeline;
+                return updateTrace(figure, 0, {x: t.x, y: t.y}, {color: t.color});
+            }
+        }
+    });
+})();
@@ -0,0 +1,68 @@
+// Formats the stats-data store (see visualization_dashboard.stats_data) into the stat cards
+// and the Live Requests list, so a tick costs no server round-trip for formatting.
+(function () {
+    function html(type, className, children) {
+        return {type: type, namespace: 'dash_html_components', props: {className: className, children: children}};
+    }
+
+    function count(n) {
+        return n.toLocaleString('en-US');
+    }
+
+    function bytes(b) {
+        if (b >= Math.pow(1024, 3)) {
+            return (b / Math.pow(1024, 3)).toFixed(2) + ' GB';
+        }
+        if (b >= Math.pow(1024, 2)) {
+            return (b / Math.pow(1024, 2)).toFixed(1) + ' MB';
+        }
+        if (b >= 1024) {
+            return (b / 1024).toFixed(1) + ' KB';
+        }
+        return b + ' B';
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        stats: {
+            cards: function (data) {
+                if (!data) {
+                    return window.dash_clientside.no_update;
+                }
+                var hitrate = data.requests > 0 ? data.hits / data.requests * 100 : 0;
+                var detail = count(data.hits) + '/' + count(data.requests) + ' hits' +
+                    (data.dropped ? ' • ' + count(data.dropped) + ' dropped' : '');
+                var tails = data.tails.map(function (t) { return t[0] + ' ' + t[1].toFixed(0); }).join(' • ');
+                return [
+                    count(data.viewers),
+                    hitrate.toFixed(1) + '%',
+                    detail,
+                    data.latency.toFixed(0) + 'ms',
+                    tails,
+                    bytes(data.bytes_saved)
+                ];
+            },
+
+            log: function (data) {
+                if (!data) {
+                    return window.dash_clientside.no_update;
+                }
+                if (!data.rows) {
+                    return html('Div', 'request-log-empty', 'Waiting...');
+                }
+                if (!data.log) {
+                    return [];
+                }
+                var log = data.log;
+                return log.city.map(function (city, i) {
+                    var hit = log.hit[i];
+                    return html('Div', 'log-row ' + (hit ? 'hit' : 'miss'), [
+                        html('Span', 'log-icon', hit ? '●' : '○'),
+                        html('Span', 'log-city', city),
+                        html('Span', 'log-latency', log.latency[i] + 'ms'),
+                        html('Span', 'log-status', hit ? 'HIT' : 'MISS')
+                    ]);
+                });
+            }
+        }
+    });
+})();
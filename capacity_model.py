@@ -0,0 +1,125 @@
+import numpy as np
+
+# Throughput of the link out of a node, by the node's tier
+LINK_BANDWIDTH_MBPS = {
+    'regional': 1000,
+    'sub-regional': 400,
+    'local': 100,
+    'village': 25,
+}
+DEFAULT_LINK_BANDWIDTH_MBPS = 100
+ORIGIN_EGRESS_GBPS = 10
+
+# Request-handling servers per cache, by tier, each busy SERVICE_TIME_MS per request
+SERVERS_PER_NODE = {
+    'regional': 64,
+    'sub-regional': 32,
+    'local': 16,
+    'village': 4,
+}
+DEFAULT_SERVERS_PER_NODE = 8
+SERVICE_TIME_MS = 5.0
+REQUEST_TIMEOUT_MS = 4000  # requests that would take longer are dropped
+SATURATED_UTILIZATION = 0.95  # what the requests that survive a saturated queue or link see
+
+
+def erlang_c(servers, load):
+    """Probability that an arrival waits in an M/M/c queue, elementwise.
+
+    ``load`` is the offered traffic in Erlangs (arrival rate x service time).
+    Uses the Erlang B recursion, which stays stable for hundreds of servers.
+    """
+    servers = np.asarray(servers)
+    load = np.asarray(load, dtype=np.float64)
+    blocking = np.ones_like(load)
+    for k in range(1, int(servers.max(initial=0)) + 1):
+        blocking = np.where(k <= servers, load * blocking / (k + load * blocking), blocking)
+    rho = load / np.maximum(servers, 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        waiting = blocking / (1 - rho * (1 - blocking))
+    return np.where(rho < 1, waiting, 1.0)
+
+
+class CapacityModel:
+    """Load-dependent delay and drops for the requests of one tick.
+
+    Every cache a request consults is an M/M/c queue of request servers, and
+    every link its bytes cross (out of the serving node, down to the
+    viewer) is a processor-sharing link, the origin's being the egress cap.
+    Arrival rates come from the tick's own requests, so delay grows with
+    concurrency and segment size. Once a queue or link is over capacity the
+    excess share of its requests is dropped.
+    """
+
+    def __init__(self, cfg, nodes, locations):
+        origin_city = cfg.get('origin_city')
+        tiers = ['origin' if city == origin_city else locations.get(city, {}).get('type', 'unknown')
+                 for city in nodes]
+        bandwidth = dict(LINK_BANDWIDTH_MBPS, **cfg.get('link_bandwidth_mbps', {}))
+        servers = dict(SERVERS_PER_NODE, **cfg.get('servers_per_node', {}))
+        origin_bps = cfg.get('origin_egress_gbps', ORIGIN_EGRESS_GBPS) * 1e9 / 8
+        self.link_rate = np.array([origin_bps if tier == 'origin'
+                                   else bandwidth.get(tier, DEFAULT_LINK_BANDWIDTH_MBPS) * 1e6 / 8
+                                   for tier in tiers])
+        self.is_origin = np.array([tier == 'origin' for tier in tiers], dtype=bool)
+        self.servers = np.array([servers.get(tier, DEFAULT_SERVERS_PER_NODE) for tier in tiers])
+        self.service_s = cfg.get('service_time_ms', SERVICE_TIME_MS) / 1000.0
+        self.timeout_ms = cfg.get('request_timeout_ms', REQUEST_TIMEOUT_MS)
+
+    def apply(self, depth, path_nodes, path_len, sizes, seconds, rng):
+        """Extra latency (ms), a dropped mask and load stats for requests made over ``seconds``.
+
+        ``path_nodes``/``path_len`` are each request's routing path as node
+        indices; ``depth`` is the serving cache (-1 for origin).
+        """
+        num_nodes = len(self.link_rate)
+        sizes = np.broadcast_to(np.asarray(sizes, dtype=np.float64), depth.shape)
+        sender = np.where(depth >= 0, depth, path_len - 1)
+        consulted = np.where(depth >= 0, depth, path_len - 2)
+        hops = range(path_nodes.shape[1])
+
+        arrivals = np.zeros(num_nodes)
+        link_bytes = np.zeros(num_nodes)
+        for h in hops:
+            cross = sender >= h
+            link_bytes += np.bincount(path_nodes[cross, h], weights=sizes[cross], minlength=num_nodes)
+            handle = consulted >= h
+            arrivals += np.bincount(path_nodes[handle, h], minlength=num_nodes)
+
+        seconds = max(seconds, 1e-9)
+        load = arrivals / seconds * self.service_s
+        server_util = load / self.servers
+        link_util = link_bytes / seconds / self.link_rate
+        node_drop = np.where(server_util > 1, 1 - 1 / np.maximum(server_util, 1), 0.0)
+        link_drop = np.where(link_util > 1, 1 - 1 / np.maximum(link_util, 1), 0.0)
+
+        # Past saturation the excess is dropped and the rest sees a nearly full queue or link.
+        load = np.minimum(load, self.servers * SATURATED_UTILIZATION)
+        queue_s = erlang_c(self.servers, load) * self.service_s / (self.servers - load)
+        # Processor sharing: a transfer slows down by 1 / (1 - utilization).
+        link_slowdown = 1 / (1 - np.minimum(link_util, SATURATED_UTILIZATION))
+
+        delay_s = np.zeros(len(depth))
+        transfer_s = np.zeros(len(depth))
+        survive = np.ones(len(depth))
+        for h in hops:
+            handle = np.nonzero(consulted >= h)[0]
+            nodes = path_nodes[handle, h]
+            delay_s[handle] += queue_s[nodes] + self.service_s
+            survive[handle] *= 1 - node_drop[nodes]
+            cross = np.nonzero(sender >= h)[0]
+            nodes = path_nodes[cross, h]
+            transfer_s[cross] = np.maximum(transfer_s[cross],
+                                           sizes[cross] / self.link_rate[nodes] * link_slowdown[nodes])
+            survive[cross] *= 1 - link_drop[nodes]
+
+        extra_ms = np.round((delay_s + transfer_s) * 1000).astype(np.int64)
+        dropped = (rng.random(len(depth)) >= survive) | (extra_ms > self.timeout_ms)
+        delivered = float(sizes[~dropped].sum())
+        return extra_ms, dropped, {
+            'dropped': int(dropped.sum()),
+            'throughput_bps': delivered * 8 / seconds,
+            'origin_utilization': float(link_util[self.is_origin].max(initial=0.0)),
+            'max_link_utilization': float(link_util.max(initial=0.0)),
+            'max_server_utilization': float(server_util.max(initial=0.0)),
+        }
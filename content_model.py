@@ -0,0 +1,126 @@
+import numpy as np
+
+SEGMENT_DURATION = 2.0  # seconds of playback per segment / tick
+MAX_PLAYBACK_LAG = 2  # live viewers trail the live edge by up to this many segments
+VOD_SEGMENTS_PER_TITLE = 1800  # one hour at two-second segments
+
+
+def zipf_cdf(n, alpha):
+    weights = 1.0 / np.arange(1, n + 1) ** alpha
+    return np.cumsum(weights) / weights.sum()
+
+
+class ContentModel:
+    """What every viewer watches: Zipf-popular live channels and a VOD catalog.
+
+    Content ids ``0 .. num_streams - 1`` are live channels; the rest are VOD
+    titles. Popularity is a Zipf law over ranks, and ``live_rank`` /
+    ``vod_rank`` say which content currently holds each rank. Rank swaps every
+    ``popularity_shift_s`` make popularity drift over time. Each tick a
+    fraction of live viewers zaps to a newly drawn channel, and scheduled
+    flash crowds move a share of viewers onto one channel for a while. All
+    draws are batched over the viewer arrays.
+
+    Popularity and its drift come from ``content_seed`` rather than the
+    viewer RNG, so every shard of a sharded run agrees on what is popular.
+    """
+
+    def __init__(self, cfg, num_viewers, rng):
+        self.rng = rng
+        self.segment_duration = cfg.get('segment_duration', SEGMENT_DURATION)
+        self.num_streams = int(cfg.get('num_streams', len(cfg.get('streams', ['mobile']))))
+        self.vod_titles = int(cfg.get('vod_titles', 0))
+        self.vod_length = int(cfg.get('vod_segments_per_title', VOD_SEGMENTS_PER_TITLE))
+        self.alpha = cfg.get('zipf_alpha', 0.8)
+        self.zap_prob = cfg.get('channel_switch_prob', 0.0)
+        self.shift_every = cfg.get('popularity_shift_s', 0)
+        self.shift_fraction = cfg.get('popularity_shift_fraction', 0.1)
+        self.flash_crowds = sorted(cfg.get('flash_crowds', []), key=lambda e: e['start_s'])
+        self._popularity_rng = np.random.default_rng(cfg.get('content_seed', 0))
+
+        self.live_cdf = zipf_cdf(self.num_streams, self.alpha)
+        self.live_rank = np.arange(self.num_streams)
+        self.vod_cdf = zipf_cdf(self.vod_titles, self.alpha) if self.vod_titles else None
+        self.vod_rank = self._popularity_rng.permutation(self.vod_titles)
+        self._shifts_done = 0
+
+        vod_share = cfg.get('vod_fraction', 0.3) if self.vod_titles else 0.0
+        self.is_vod = rng.random(num_viewers) < vod_share
+        self.viewer_content = self._draw_live(num_viewers)
+        self.viewer_lag = rng.integers(0, cfg.get('max_playback_lag', MAX_PLAYBACK_LAG) + 1, num_viewers).astype(np.int32)
+        self.vod_position = np.zeros(num_viewers, dtype=np.int64)
+        vod = np.nonzero(self.is_vod)[0]
+        if len(vod):
+            self.viewer_content[vod] = self._draw_vod(len(vod))
+            self.vod_position[vod] = rng.integers(0, self.vod_length, len(vod))
+        self._flash_members = {}
+
+    @property
+    def num_contents(self):
+        return self.num_streams + self.vod_titles
+
+    @property
+    def static(self):
+        """True when nobody ever changes content, so viewer groups can be computed once."""
+        return not (self.vod_titles or self.zap_prob or self.shift_every or self.flash_crowds)
+
+    def label(self, content_id):
+        if content_id < self.num_streams:
+            return f'live-{content_id}'
+        return f'vod-{content_id - self.num_streams}'
+
+    def _draw_live(self, n):
+        ranks = np.searchsorted(self.live_cdf, self.rng.random(n), side='right')
+        return self.live_rank[np.minimum(ranks, self.num_streams - 1)].astype(np.int32)
+
+    def _draw_vod(self, n):
+        ranks = np.searchsorted(self.vod_cdf, self.rng.random(n), side='right')
+        return (self.num_streams + self.vod_rank[np.minimum(ranks, self.vod_titles - 1)]).astype(np.int32)
+
+    def _shift_popularity(self, elapsed):
+        if not self.shift_every:
+            return
+        while self._shifts_done < int(elapsed // self.shift_every):
+            self._shifts_done += 1
+            for ranks in (self.live_rank, self.vod_rank):
+                swaps = int(len(ranks) * self.shift_fraction / 2)
+                if swaps:
+                    a, b = self._popularity_rng.choice(len(ranks), (2, swaps), replace=False)
+                    ranks[a], ranks[b] = ranks[b], ranks[a]
+
+    def _apply_flash_crowds(self, elapsed, content, seq, live_seq):
+        for i, event in enumerate(self.flash_crowds):
+            if elapsed < event['start_s']:
+                break
+            if elapsed >= event['start_s'] + event['duration_s']:
+                self._flash_members.pop(i, None)
+                continue
+            members = self._flash_members.get(i)
+            if members is None:
+                members = self._flash_members[i] = np.nonzero(
+                    self.rng.random(len(content)) < event.get('share', 0.2))[0]
+            content[members] = event.get('stream', 0)
+            seq[members] = live_seq
+
+    def requests(self, sequence):
+        """Content id and segment number each viewer asks for at live-edge ``sequence``."""
+        elapsed = sequence * self.segment_duration
+        self._shift_popularity(elapsed)
+        live = np.nonzero(~self.is_vod)[0]
+
+        if self.zap_prob and len(live):
+            zappers = live[self.rng.random(len(live)) < self.zap_prob]
+            self.viewer_content[zappers] = self._draw_live(len(zappers))
+
+        vod = np.nonzero(self.is_vod)[0]
+        if len(vod):
+            self.vod_position[vod] += 1
+            finished = vod[self.vod_position[vod] >= self.vod_length]
+            self.viewer_content[finished] = self._draw_vod(len(finished))
+            self.vod_position[finished] = 0
+
+        content = self.viewer_content.copy()
+        seq = np.where(self.is_vod, self.vod_position, np.maximum(sequence - self.viewer_lag, 0))
+        if self.flash_crowds:
+            self._apply_flash_crowds(elapsed, content, seq, sequence)
+        return content, seq
@@ -4,6 +4,7 @@ import dash_bootstrap_components as dbc
 import json
 import os
 from datetime import datetime
+from edge_cache import POLICY_LABELS
 
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
 
@@ -49,6 +50,11 @@ def load_config():
         'origin_latency': 850,
         'origin_city': 'Chennai',
         'cities_enabled': ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Hyderabad', 'Kolkata'],
+        'eviction_policy': 'lru',
+        'compare_policies': [],
+        'sim_engine': 'tick',
+        'time_scale': 1,
+        'trace_path': '',
         'running': False,
         'started_at': None
     }
@@ -330,6 +336,112 @@ app.layout = html.Div([
                 
             ], style={'display': 'flex'}),
             
+            html.Div([
+                html.Div([
+                    html.Label('Eviction Policy', 
+                              style={'fontSize': '14px', 'color': '#374151', 'marginBottom': '10px', 
+                                    'display': 'block', 'fontWeight': '600'}),
+                    dcc.Dropdown(
+                        id='eviction-policy',
+                        options=[{'label': label, 'value': policy} for policy, label in POLICY_LABELS.items()],
+                        value='lru',
+                        clearable=False,
+                        style={'backgroundColor': '#ffffff', 'borderRadius': '10px'}
+                    ),
+                    html.Div('Decides which segments edges drop when full', 
+                            style={'fontSize': '12px', 'color': '#6b7280', 'marginTop': '8px'})
+                ], style={'flex': '1', 'marginRight': '20px'}),
+                
+                html.Div([
+                    html.Label('Compare Against', 
+                              style={'fontSize': '14px', 'color': '#374151', 'marginBottom': '10px', 
+                                    'display': 'block', 'fontWeight': '600'}),
+                    dcc.Dropdown(
+                        id='compare-policies',
+                        options=[{'label': label, 'value': policy} for policy, label in POLICY_LABELS.items()],
+                        value=[],
+                        multi=True,
+                        placeholder="Shadow policies...",
+                        style={'backgroundColor': '#ffffff', 'borderRadius': '10px'}
+                    ),
+                    html.Div('Replayed on the same viewers for the cache chart', 
+                            style={'fontSize': '12px', 'color': '#6b7280', 'marginTop': '8px'})
+                ], style={'flex': '2'}),
+            ], style={'display': 'flex', 'marginTop': '25px'}),
+            
+            html.Div([
+                html.Div([
+                    html.Label('Simulation Engine', 
+                              style={'fontSize': '14px', 'color': '#374151', 'marginBottom': '10px', 
+                                    'display': 'block', 'fontWeight': '600'}),
+                    dcc.Dropdown(
+                        id='sim-engine',
+                        options=[
+                            {'label': 'Live ticks (wall clock)', 'value': 'tick'},
+                            {'label': 'Discrete-event (virtual clock)', 'value': 'event'},
+                            {'label': 'Multi-process (one shard per core)', 'value': 'sharded'},
+                            {'label': 'Trace replay (access log)', 'value': 'replay'},
+                        ],
+                        value='tick',
+                        clearable=False,
+                        style={'backgroundColor': '#ffffff', 'borderRadius': '10px'}
+                    ),
+                    html.Div('Discrete-event orders every request and cache fill in time', 
+                            style={'fontSize': '12px', 'color': '#6b7280', 'marginTop': '8px'})
+                ], style={'flex': '1', 'marginRight': '20px'}),
+                
+                html.Div([
+                    html.Label('Time Scale', 
+                              style={'fontSize': '14px', 'color': '#374151', 'marginBottom': '10px', 
+                                    'display': 'block', 'fontWeight': '600'}),
+                    html.Div([
+                        dcc.Input(
+                            id='time-scale',
+                            type='number',
+                            value=1,
+                            min=1,
+                            max=3600,
+                            step=1,
+                            style={
+                                'width': '100%', 'padding': '12px 16px', 
+                                'backgroundColor': '#ffffff',
+                                'border': '2px solid #e5e7eb',
+                                'borderRadius': '10px', 'color': '#1f2937',
+                                'fontSize': '16px', 'fontWeight': '600'
+                            }
+                        ),
+                        html.Div('×', style={
+                            'position': 'absolute', 'right': '16px', 'top': '50%',
+                            'transform': 'translateY(-50%)', 'color': '#9ca3af',
+                            'fontSize': '14px', 'pointerEvents': 'none', 'fontWeight': '500'
+                        })
+                    ], style={'position': 'relative'}),
+                    html.Div('Simulated seconds per real second (discrete-event and trace replay)', 
+                            style={'fontSize': '12px', 'color': '#6b7280', 'marginTop': '8px'})
+                ], style={'flex': '1', 'marginRight': '20px'}),
+                
+                html.Div([
+                    html.Label('Trace File', 
+                              style={'fontSize': '14px', 'color': '#374151', 'marginBottom': '10px', 
+                                    'display': 'block', 'fontWeight': '600'}),
+                    dcc.Input(
+                        id='trace-path',
+                        type='text',
+                        value='',
+                        placeholder='/var/log/nginx/access.log',
+                        style={
+                            'width': '100%', 'padding': '12px 16px', 
+                            'backgroundColor': '#ffffff',
+                            'border': '2px solid #e5e7eb',
+                            'borderRadius': '10px', 'color': '#1f2937',
+                            'fontSize': '14px'
+                        }
+                    ),
+                    html.Div('nginx combined or JSONL log (.gz ok) for trace replay', 
+                            style={'fontSize': '12px', 'color': '#6b7280', 'marginTop': '8px'})
+                ], style={'flex': '1'}),
+            ], style={'display': 'flex', 'marginTop': '25px'}),
+            
         ], style={
             'padding': '30px', 'backgroundColor': '#ffffff', 
             'borderRadius': '16px', 'marginBottom': '30px',
@@ -472,9 +584,15 @@ def validate_cities(cities):
      State('cities-dropdown', 'value'),
      State('num-viewers', 'value'),
      State('cache-size', 'value'),
-     State('origin-latency', 'value')]
+     State('origin-latency', 'value'),
+     State('eviction-policy', 'value'),
+     State('compare-policies', 'value'),
+     State('sim-engine', 'value'),
+     State('time-scale', 'value'),
+     State('trace-path', 'value')]
 )
-def control_actions(start_clicks, stop_clicks, reset_clicks, origin, cities, num_viewers, cache_size, origin_latency):
+def control_actions(start_clicks, stop_clicks, reset_clicks, origin, cities, num_viewers, cache_size, origin_latency,
+                    eviction_policy, compare_policies, sim_engine, time_scale, trace_path):
     ctx = callback_context
     if not ctx.triggered:
         config = load_config()
@@ -497,16 +615,29 @@ def control_actions(start_clicks, stop_clicks, reset_clicks, origin, cities, num
                 f"Cannot start: Need at least 4 cache locations (selected: {len(cities) if cities else 0})"
             ], style={'color': '#ef4444', 'fontWeight': '600'})
         
-        config = {
+        if sim_engine == 'replay' and not (trace_path and os.path.exists(trace_path)):
+            return html.Div([
+                html.Span('❌ ', style={'fontSize': '20px', 'marginRight': '10px'}),
+                f"Cannot start: trace file not found ({trace_path or 'none given'})"
+            ], style={'color': '#ef4444', 'fontWeight': '600'})
+        
+        # Start from the saved file so tuning keys without a control here survive a restart.
+        config = load_config()
+        config.update({
             'num_viewers': num_viewers,
             'cache_size_mb': cache_size,
             'cache_ttl': 30,
             'origin_latency': origin_latency,
             'origin_city': origin,
             'cities_enabled': cities,
+            'eviction_policy': eviction_policy,
+            'compare_policies': compare_policies or [],
+            'sim_engine': sim_engine,
+            'time_scale': time_scale or 1,
+            'trace_path': trace_path or '',
             'running': True,
             'started_at': datetime.now().isoformat()
-        }
+        })
         if save_config(config):
             return html.Div([
                 html.Span('✅ ', style={'fontSize': '20px', 'marginRight': '10px'}),
@@ -530,6 +661,11 @@ def control_actions(start_clicks, stop_clicks, reset_clicks, origin, cities, num
             'origin_latency': 850,
             'origin_city': 'Chennai',
             'cities_enabled': ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Hyderabad', 'Kolkata'],
+            'eviction_policy': 'lru',
+            'compare_policies': [],
+            'sim_engine': 'tick',
+            'time_scale': 1,
+            'trace_path': '',
             'running': False,
             'started_at': None
         }
@@ -0,0 +1,509 @@
+from collections import OrderedDict
+
+
+class EvictionPolicy:
+    """Decides which cached segment leaves when an edge runs out of bytes.
+
+    The cache owns the entries and the byte accounting; a policy only keeps
+    the ordering metadata it needs. ``evict`` must forget the key it returns.
+    """
+
+    name = None
+
+    def __init__(self, capacity_bytes):
+        self.capacity_bytes = capacity_bytes
+
+    def admit(self, key, size):
+        return True
+
+    def on_miss(self, key):
+        pass
+
+    def on_hit(self, key):
+        raise NotImplementedError
+
+    def on_insert(self, key, size):
+        raise NotImplementedError
+
+    def on_remove(self, key):
+        raise NotImplementedError
+
+    def evict(self):
+        raise NotImplementedError
+
+
+class LRUPolicy(EvictionPolicy):
+    name = 'lru'
+
+    def __init__(self, capacity_bytes):
+        super().__init__(capacity_bytes)
+        self._order = OrderedDict()
+
+    def on_hit(self, key):
+        self._order.move_to_end(key)
+
+    def on_insert(self, key, size):
+        self._order[key] = size
+
+    def on_remove(self, key):
+        del self._order[key]
+
+    def evict(self):
+        return self._order.popitem(last=False)[0]
+
+
+class _FreqNode:
+    __slots__ = ('freq', 'keys', 'prev', 'next')
+
+    def __init__(self, freq):
+        self.freq = freq
+        self.keys = OrderedDict()
+        self.prev = self.next = self
+
+
+class LFUPolicy(EvictionPolicy):
+    """O(1) LFU: a linked list of frequency buckets, LRU order inside a bucket."""
+
+    name = 'lfu'
+
+    def __init__(self, capacity_bytes):
+        super().__init__(capacity_bytes)
+        self._head = _FreqNode(0)
+        self._nodes = {}
+
+    def _insert_after(self, node, freq):
+        new = _FreqNode(freq)
+        new.prev, new.next = node, node.next
+        node.next.prev = new
+        node.next = new
+        return new
+
+    def _detach_key(self, key):
+        node = self._nodes.pop(key)
+        del node.keys[key]
+        if not node.keys:
+            node.prev.next = node.next
+            node.next.prev = node.prev
+        return node
+
+    def on_hit(self, key):
+        node = self._nodes[key]
+        target = node.next
+        if target is self._head or target.freq != node.freq + 1:
+            target = self._insert_after(node, node.freq + 1)
+        self._detach_key(key)
+        target.keys[key] = None
+        self._nodes[key] = target
+
+    def on_insert(self, key, size):
+        target = self._head.next
+        if target is self._head or target.freq != 1:
+            target = self._insert_after(self._head, 1)
+        target.keys[key] = None
+        self._nodes[key] = target
+
+    def on_remove(self, key):
+        self._detach_key(key)
+
+    def evict(self):
+        key = next(iter(self._head.next.keys))
+        self._detach_key(key)
+        return key
+
+
+class ARCPolicy(EvictionPolicy):
+    """Adaptive Replacement Cache with the recency target ``p`` kept in bytes."""
+
+    name = 'arc'
+
+    def __init__(self, capacity_bytes):
+        super().__init__(capacity_bytes)
+        self.p = 0
+        self._t1, self._t2 = OrderedDict(), OrderedDict()
+        self._b1, self._b2 = OrderedDict(), OrderedDict()
+        self._bytes = {'t1': 0, 't2': 0, 'b1': 0, 'b2': 0}
+        self._returning = None
+
+    def _push(self, name, od, key, size):
+        od[key] = size
+        self._bytes[name] += size
+
+    def _pop(self, name, od, key=None):
+        if key is None:
+            key, size = od.popitem(last=False)
+        else:
+            size = od.pop(key)
+        self._bytes[name] -= size
+        return key, size
+
+    def on_miss(self, key):
+        b1, b2 = self._bytes['b1'], self._bytes['b2']
+        if key in self._b1:
+            _, size = self._pop('b1', self._b1, key)
+            self.p = min(self.capacity_bytes, self.p + max(size, size * b2 // max(b1, 1)))
+            self._returning = key
+        elif key in self._b2:
+            _, size = self._pop('b2', self._b2, key)
+            self.p = max(0, self.p - max(size, size * b1 // max(b2, 1)))
+            self._returning = key
+
+    def on_hit(self, key):
+        if key in self._t1:
+            _, size = self._pop('t1', self._t1, key)
+            self._push('t2', self._t2, key, size)
+        else:
+            self._t2.move_to_end(key)
+
+    def on_insert(self, key, size):
+        if key == self._returning:
+            self._push('t2', self._t2, key, size)
+        else:
+            self._push('t1', self._t1, key, size)
+        self._returning = None
+
+        c = self.capacity_bytes
+        while self._b1 and self._bytes['t1'] + self._bytes['b1'] > c:
+            self._pop('b1', self._b1)
+        while self._b2 and sum(self._bytes.values()) > 2 * c:
+            self._pop('b2', self._b2)
+
+    def on_remove(self, key):
+        if key in self._t1:
+            self._pop('t1', self._t1, key)
+        else:
+            self._pop('t2', self._t2, key)
+
+    def evict(self):
+        if self._t1 and (self._bytes['t1'] > self.p or not self._t2):
+            key, size = self._pop('t1', self._t1)
+            self._push('b1', self._b1, key, size)
+        else:
+            key, size = self._pop('t2', self._t2)
+            self._push('b2', self._b2, key, size)
+        return key
+
+
+class S3FIFOPolicy(EvictionPolicy):
+    """S3-FIFO: a small probationary FIFO, a main FIFO and a ghost FIFO.
+
+    One-hit wonders leave from the small queue; segments re-requested while
+    there are promoted to the main queue, which gives lazy second chances.
+    """
+
+    name = 's3fifo'
+    SMALL_FRACTION = 0.1
+    MAX_FREQ = 3
+
+    def __init__(self, capacity_bytes):
+        super().__init__(capacity_bytes)
+        self.small_capacity = int(capacity_bytes * self.SMALL_FRACTION)
+        self._small, self._main, self._ghost = OrderedDict(), OrderedDict(), OrderedDict()
+        self._small_bytes = self._ghost_bytes = 0
+        self._freq = {}
+
+    def on_hit(self, key):
+        self._freq[key] = min(self._freq[key] + 1, self.MAX_FREQ)
+
+    def on_insert(self, key, size):
+        self._freq[key] = 0
+        if key in self._ghost:
+            self._ghost_bytes -= self._ghost.pop(key)
+            self._main[key] = size
+        else:
+            self._small[key] = size
+            self._small_bytes += size
+
+    def on_remove(self, key):
+        del self._freq[key]
+        if key in self._small:
+            self._small_bytes -= self._small.pop(key)
+        else:
+            del self._main[key]
+
+    def evict(self):
+        while True:
+            if self._small and (self._small_bytes >= self.small_capacity or not self._main):
+                key, size = self._small.popitem(last=False)
+                self._small_bytes -= size
+                if self._freq[key] > 0:
+                    self._freq[key] = 0
+                    self._main[key] = size
+                    continue
+                del self._freq[key]
+                self._ghost[key] = size
+                self._ghost_bytes += size
+                while self._ghost_bytes > self.capacity_bytes - self.small_capacity:
+                    self._ghost_bytes -= self._ghost.popitem(last=False)[1]
+                return key
+
+            key, size = self._main.popitem(last=False)
+            if self._freq[key] > 0:
+                self._freq[key] -= 1
+                self._main[key] = size
+                continue
+            del self._freq[key]
+            return key
+
+
+class CountMinSketch:
+    """4-bit count-min sketch with periodic halving, as used by TinyLFU."""
+
+    DEPTH = 4
+    MAX_COUNT = 15
+
+    def __init__(self, width, sample_size):
+        self.width = 1 << max(width - 1, 1).bit_length()
+        self.mask = self.width - 1
+        self.sample_size = sample_size
+        self.additions = 0
+        self._table = bytearray(self.width * self.DEPTH)
+
+    def _slots(self, key):
+        h = hash(key)
+        for row in range(self.DEPTH):
+            h = (h * 0x9E3779B1 + row) & 0xFFFFFFFF
+            yield row * self.width + ((h ^ (h >> 15)) & self.mask)
+
+    def add(self, key):
+        slots = list(self._slots(key))
+        lowest = min(self._table[i] for i in slots)
+        if lowest >= self.MAX_COUNT:
+            return
+        for i in slots:
+            if self._table[i] == lowest:
+                self._table[i] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self._table = bytearray(v >> 1 for v in self._table)
+            self.additions //= 2
+
+    def estimate(self, key):
+        return min(self._table[i] for i in self._slots(key))
+
+
+class WTinyLFUPolicy(EvictionPolicy):
+    """Window TinyLFU: a small LRU window in front of a segmented LRU main area.
+
+    A segment leaving the window only enters the main area if the frequency
+    sketch says it is more popular than the main area's eviction candidate.
+    """
+
+    name = 'tinylfu'
+    WINDOW_FRACTION = 0.01
+    PROTECTED_FRACTION = 0.8
+    SKETCH_OBJECT_BYTES = 64 * 1024
+
+    def __init__(self, capacity_bytes):
+        super().__init__(capacity_bytes)
+        self.window_capacity = max(int(capacity_bytes * self.WINDOW_FRACTION), 1)
+        main_capacity = capacity_bytes - self.window_capacity
+        self.protected_capacity = int(main_capacity * self.PROTECTED_FRACTION)
+        self.main_capacity = main_capacity
+
+        expected_objects = max(capacity_bytes // self.SKETCH_OBJECT_BYTES, 64)
+        self.sketch = CountMinSketch(expected_objects, expected_objects * 10)
+
+        self._window, self._probation, self._protected = OrderedDict(), OrderedDict(), OrderedDict()
+        self._window_bytes = self._probation_bytes = self._protected_bytes = 0
+
+    def on_miss(self, key):
+        self.sketch.add(key)
+
+    def on_hit(self, key):
+        self.sketch.add(key)
+        if key in self._window:
+            self._window.move_to_end(key)
+        elif key in self._protected:
+            self._protected.move_to_end(key)
+        else:
+            size = self._probation.pop(key)
+            self._probation_bytes -= size
+            self._protected[key] = size
+            self._protected_bytes += size
+            while self._protected_bytes > self.protected_capacity and len(self._protected) > 1:
+                demoted, demoted_size = self._protected.popitem(last=False)
+                self._protected_bytes -= demoted_size
+                self._probation[demoted] = demoted_size
+                self._probation_bytes += demoted_size
+
+    def on_insert(self, key, size):
+        self._window[key] = size
+        self._window_bytes += size
+
+    def on_remove(self, key):
+        if key in self._window:
+            self._window_bytes -= self._window.pop(key)
+        elif key in self._probation:
+            self._probation_bytes -= self._probation.pop(key)
+        else:
+            self._protected_bytes -= self._protected.pop(key)
+
+    def _pop_main_victim(self):
+        if self._probation:
+            key, size = self._probation.popitem(last=False)
+            self._probation_bytes -= size
+        else:
+            key, size = self._protected.popitem(last=False)
+            self._protected_bytes -= size
+        return key
+
+    def _peek_main_victim(self):
+        for queue in (self._probation, self._protected):
+            if queue:
+                return next(iter(queue))
+        return None
+
+    def evict(self):
+        while self._window_bytes > self.window_capacity or not (self._probation or self._protected):
+            candidate, size = self._window.popitem(last=False)
+            self._window_bytes -= size
+            main_bytes = self._probation_bytes + self._protected_bytes
+            if main_bytes + size <= self.main_capacity:
+                self._probation[candidate] = size
+                self._probation_bytes += size
+                continue
+
+            victim = self._peek_main_victim()
+            if victim is None:
+                return candidate
+            if self.sketch.estimate(candidate) > self.sketch.estimate(victim):
+                self._pop_main_victim()
+                self._probation[candidate] = size
+                self._probation_bytes += size
+                return victim
+            return candidate
+
+        return self._pop_main_victim()
+
+
+EVICTION_POLICIES = {
+    policy.name: policy
+    for policy in (LRUPolicy, LFUPolicy, ARCPolicy, S3FIFOPolicy, WTinyLFUPolicy)
+}
+
+POLICY_LABELS = {
+    'lru': 'LRU',
+    'lfu': 'LFU',
+    'arc': 'ARC',
+    's3fifo': 'S3-FIFO',
+    'tinylfu': 'W-TinyLFU',
+}
+
+
+class SegmentCache:
+    """Byte-budgeted segment store for one simulated edge node.
+
+    Segments are keyed by ``(stream, sequence)``. Every entry gets the same
+    TTL, so insertion order is also expiry order and expired entries can be
+    dropped from the head of a FIFO. Which entry makes room for a new one is
+    up to the eviction policy; all bundled policies are O(1) or amortized O(1).
+    """
+
+    def __init__(self, capacity_bytes, ttl, policy='lru'):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        self.capacity_bytes = int(capacity_bytes)
+        self.ttl = ttl
+        self.policy = EVICTION_POLICIES[policy](self.capacity_bytes)
+        self.used_bytes = 0
+        self._sizes = {}
+        self._expiry = OrderedDict()    # key -> expires_at, oldest insert first
+
+        self.hits = 0
+        self.misses = 0
+        self.hit_bytes = 0
+        self.miss_bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejections = 0
+
+    def __len__(self):
+        return len(self._sizes)
+
+    def __contains__(self, key):
+        return key in self._sizes
+
+    def get(self, key, size, now, count=1):
+        """Look up ``key`` and record a hit or miss of ``size`` bytes.
+
+        ``count`` folds identical requests that arrive together into one
+        lookup: they all share the outcome, but the policy sees one access.
+        """
+        expires_at = self._expiry.get(key)
+        if expires_at is not None and expires_at <= now:
+            self._remove(key)
+            self.expirations += 1
+            expires_at = None
+
+        if expires_at is None:
+            self.misses += count
+            self.miss_bytes += size * count
+            self.policy.on_miss(key)
+            return False
+
+        self.policy.on_hit(key)
+        self.hits += count
+        self.hit_bytes += size * count
+        return True
+
+    def put(self, key, size, now):
+        """Store a segment, evicting others as the policy decides to make room."""
+        if size > self.capacity_bytes or not self.policy.admit(key, size):
+            self.rejections += 1
+            return False
+        if key in self._sizes:
+            self._remove(key)
+
+        self._sizes[key] = size
+        self._expiry[key] = now + self.ttl
+        self.used_bytes += size
+        self.policy.on_insert(key, size)
+
+        while self.used_bytes > self.capacity_bytes:
+            victim = self.policy.evict()
+            self.used_bytes -= self._sizes.pop(victim)
+            del self._expiry[victim]
+            self.evictions += 1
+        return key in self._sizes
+
+    def expire(self, now):
+        """Drop every entry whose TTL has passed; O(expired)."""
+        expired = 0
+        while self._expiry:
+            key, expires_at = next(iter(self._expiry.items()))
+            if expires_at > now:
+                break
+            self._remove(key)
+            expired += 1
+        self.expirations += expired
+        return expired
+
+    def next_expiry(self):
+        """When the oldest entry expires, or None when the cache is empty."""
+        for expires_at in self._expiry.values():
+            return expires_at
+        return None
+
+    def clear(self):
+        for key in list(self._sizes):
+            self._remove(key)
+
+    def stats(self):
+        return {
+            'policy': self.policy.name,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_bytes': self.hit_bytes,
+            'miss_bytes': self.miss_bytes,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'rejections': self.rejections,
+            'objects': len(self._sizes),
+            'used_bytes': self.used_bytes,
+            'capacity_bytes': self.capacity_bytes,
+        }
+
+    def _remove(self, key):
+        self.used_bytes -= self._sizes.pop(key)
+        del self._expiry[key]
+        self.policy.on_remove(key)
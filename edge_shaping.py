@@ -0,0 +1,109 @@
+import json
+import os
+import threading
+import time
+
+from capacity_model import LINK_BANDWIDTH_MBPS, DEFAULT_LINK_BANDWIDTH_MBPS
+from locations import INDIAN_LOCATIONS
+from routing import RoutingTable
+from simulation_engine import path_latency_ms
+
+BURST_SECONDS = 0.25  # a link may send this much of its rate at once after idling
+VIEWER_LINK = 'viewers'  # far end of an edge's access link
+
+
+class TokenBucket:
+    """Byte-rate limit shared by every stream crossing one link.
+
+    Nothing runs in the background: ``reserve`` refills from the elapsed
+    time, takes the bytes (going into debt if needed) and returns how long the
+    caller should wait before sending. Debt makes later callers queue behind
+    earlier ones, so concurrent streams share the link fairly.
+    """
+
+    def __init__(self, rate_bytes, burst_bytes):
+        self.rate = float(rate_bytes)
+        self.burst = float(burst_bytes)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, nbytes, now=None):
+        with self._lock:
+            now = time.monotonic() if now is None else now
+            self.tokens = min(self.burst, self.tokens + max(now - self.updated, 0.0) * self.rate)
+            self.updated = max(self.updated, now)
+            self.tokens -= nbytes
+            return max(0.0, -self.tokens / self.rate)
+
+
+class EdgeShaper:
+    """Applies the routing model's path latency and link caps to real requests.
+
+    A viewer in ``city`` is served by the first cache on its routing path. A
+    proxy cache hit crosses only that edge's access link; a miss also crosses
+    every link up to the origin, and the slowest link sets the pace.
+    """
+
+    def __init__(self, locations, enabled_cities, origin_city, origin_latency=850):
+        self.locations = locations
+        self.origin_city = origin_city
+        self.origin_latency = origin_latency
+        self.routing = RoutingTable(locations, enabled_cities, origin_city)
+        self._links = {}
+        self._lock = threading.Lock()
+
+    def route(self, city):
+        """Routing path for a viewer city, or None when the city is unknown."""
+        if city not in self.locations:
+            return None
+        return self.routing.path(city)
+
+    def latency(self, path, is_cache_hit):
+        """Seconds of propagation delay before the first byte."""
+        return path_latency_ms(path, self.locations, is_cache_hit, self.origin_latency,
+                               origin_city=self.origin_city) / 1000.0
+
+    def link(self, from_city, to_city):
+        key = (from_city, to_city)
+        bucket = self._links.get(key)
+        if bucket is None:
+            with self._lock:
+                bucket = self._links.get(key)
+                if bucket is None:
+                    loc_type = self.locations.get(from_city, {}).get('type')
+                    rate = LINK_BANDWIDTH_MBPS.get(loc_type, DEFAULT_LINK_BANDWIDTH_MBPS) * 1e6 / 8
+                    bucket = self._links[key] = TokenBucket(rate, rate * BURST_SECONDS)
+        return bucket
+
+    def pace(self, path, nbytes, is_cache_hit):
+        """Seconds to wait before sending ``nbytes`` of a response along ``path``."""
+        now = time.monotonic()
+        delay = self.link(path[0], VIEWER_LINK).reserve(nbytes, now)
+        if not is_cache_hit:
+            for upper, lower in zip(path[1:], path[:-1]):
+                delay = max(delay, self.link(upper, lower).reserve(nbytes, now))
+        return delay
+
+    def stats(self):
+        """Links in use and, for each one with queued bytes, how long its queue is (ms)."""
+        backlog = {}
+        for (from_city, to_city), bucket in list(self._links.items()):
+            wait = bucket.reserve(0)
+            if wait:
+                backlog[f'{from_city}->{to_city}'] = round(wait * 1000)
+        return {'links': len(self._links), 'backlog_ms': backlog}
+
+
+def load_shaper(config_path='simulation_config.json'):
+    """EdgeShaper for the caches and origin in the simulation config."""
+    cfg = {}
+    if os.path.exists(config_path):
+        with open(config_path) as f:
+            cfg = json.load(f)
+    return EdgeShaper(
+        INDIAN_LOCATIONS,
+        cfg.get('cities_enabled', ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Hyderabad', 'Kolkata']),
+        cfg.get('origin_city', 'Chennai'),
+        cfg.get('origin_latency', 850),
+    )
@@ -0,0 +1,324 @@
+"""Discrete-event variant of the CDN model, running on a virtual clock.
+
+    python event_engine.py --hours 24
+"""
+import argparse
+import heapq
+import json
+import os
+import random
+import time
+
+import numpy as np
+
+from simulation_engine import (SimulationEngine, BASE_LATENCY_MS,
+                               EDGE_HIT_LATENCY_MS, lookup_segment, fill_segment)
+
+SEGMENT_DURATION = 2.0  # seconds between segments (HLS target duration)
+REQUEST_JITTER = 1.0    # a viewer asks for a new segment up to this long after it appears
+
+# Event kinds; events at the same instant run in this order
+SEGMENT, FILL, EXPIRE, REQUEST = range(4)
+
+# Content-model features that move viewers between groups; groups here are fixed
+DYNAMIC_CONTENT = {'vod_titles': 0, 'channel_switch_prob': 0.0, 'popularity_shift_s': 0, 'flash_crowds': []}
+
+
+class EventEngine(SimulationEngine):
+    """Heap-ordered events on a virtual clock instead of one batch per wall-clock tick.
+
+    Every ``segment_duration`` a segment is published. Each viewer asks for it
+    after its own fixed jitter, and the earliest viewer of a group (same path,
+    stream and lag) walks the caches for everyone. Misses fill the caches
+    when the upstream fetch completes, requests that arrive while a fill is in
+    flight wait for it, and each cache gets an expiry event when its oldest
+    entry's TTL runs out. As in the tick engine, a group's followers are
+    served by their edge, so they count as edge hits even while they wait
+    for the leader's fill. Nothing sleeps, so a window of virtual time costs
+    only the events in it.
+
+    Per-event work is scalar; the statistics of the followers of each group
+    are rebuilt in one vectorized pass when a window is collected. Because
+    groups are fixed, viewers keep the Zipf-drawn live channel they start
+    on: VOD, channel zapping, popularity drift and flash crowds are only
+    modelled by the tick engine.
+    """
+
+    def __init__(self, cfg, locations, route, seed=None, start_time=None):
+        super().__init__(dict(cfg, **DYNAMIC_CONTENT), locations, route, seed)
+        self.segment_duration = cfg.get('segment_duration', SEGMENT_DURATION)
+        self.start_time = time.time() if start_time is None else start_time
+        self.now = 0.0
+        self.events_processed = 0
+        self.py_rng = random.Random(seed)
+
+        self.viewer_jitter = self.rng.uniform(0, cfg.get('request_jitter', REQUEST_JITTER), self.num_viewers)
+        # Members of each group, earliest asker first; the earliest is the group leader.
+        self.member_order = np.lexsort((self.viewer_jitter, self.viewer_group))
+        self.group_start = np.cumsum(self.group_size) - self.group_size
+        self.group_leader = self.member_order[self.group_start]
+
+        self._group_path = self.viewer_path[self.group_leader].tolist()
+        self._group_stream = self.viewer_stream[self.group_leader].tolist()
+        self._group_lag = self.viewer_lag[self.group_leader].tolist()
+        self._group_jitter = self.viewer_jitter[self.group_leader].tolist()
+        self._group_size = self.group_size.tolist()
+        self._path_len = self.path_len.tolist()
+        self._hop_ranges = [list(zip(low.tolist(), (high - 1).tolist()))
+                            for low, high in zip(self.hop_low, self.hop_high)]
+
+        self._queue = []
+        self._seq = 0
+        self._inflight = {policy: {} for policy in self.policies}   # (city, key) -> fill time
+        self._waiting = {policy: {} for policy in self.policies}    # (city, key) -> requests waiting on that fill
+        self._expiry_pending = {policy: set() for policy in self.policies}
+        self._records = {policy: [] for policy in self.policies}
+        self._push(0.0, SEGMENT, None)
+
+    def _push(self, t, kind, payload):
+        self._seq += 1
+        heapq.heappush(self._queue, (t, kind, self._seq, payload))
+
+    def advance(self, seconds):
+        return self.run_until(self.now + seconds)
+
+    def run_until(self, t_end):
+        """Process every event up to virtual time ``t_end``; returns the window's stats shaped like ``tick``."""
+        queue = self._queue
+        self._window = t_end - self.now
+        while queue and queue[0][0] <= t_end:
+            t, kind, _, payload = heapq.heappop(queue)
+            self.now = t
+            self.events_processed += 1
+            if kind == REQUEST:
+                self._on_request(t, *payload)
+            elif kind == FILL:
+                self._on_fill(t, *payload)
+            elif kind == EXPIRE:
+                self._on_expire(t, *payload)
+            else:
+                self._on_segment(t)
+        self.now = max(self.now, t_end)
+        return self._collect()
+
+    def _on_segment(self, t):
+        self.sequence += 1
+        for g, jitter in enumerate(self._group_jitter):
+            seq = max(self.sequence - self._group_lag[g], 0)
+            self._push(t + jitter, REQUEST, (g, t, seq))
+        self._push(t + self.segment_duration, SEGMENT, None)
+
+    def _lookup(self, caches, inflight, path, key, t):
+        """Serving depth and how long the request waits for an in-flight fill there."""
+        depth = lookup_segment(caches, path, key, self.segment_size, t)
+        upto = depth if depth >= 0 else len(path) - 1
+        for d, city in enumerate(path[:upto]):
+            ready = inflight.get((city, key))
+            if ready is not None and ready > t:
+                return d, ready - t
+        return depth, 0.0
+
+    def _path_latency(self, p, depth):
+        draw = self.py_rng.random
+        if depth == 0:
+            low, high = EDGE_HIT_LATENCY_MS
+            return low + int(draw() * (high - low + 1))
+        hops = depth if depth > 0 else self._path_len[p] - 1
+        return BASE_LATENCY_MS + sum(low + int(draw() * (high - low + 1)) for low, high in self._hop_ranges[p][:hops])
+
+    def _on_request(self, t, g, published, seq):
+        p = self._group_path[g]
+        path = self.paths[p]
+        key = (self._group_stream[g], seq)
+        followers = self._group_size[g] - 1
+
+        for policy, caches in self.caches.items():
+            inflight = self._inflight[policy]
+            depth, wait = self._lookup(caches, inflight, path, key, t)
+            latency = wait * 1000 + self._path_latency(p, depth)
+            done = t + latency / 1000.0
+            if depth == -1:
+                self.origin_fetches[policy] += 1
+            if depth != 0:
+                upto = depth if depth >= 0 else len(path) - 1
+                for city in path[:upto]:
+                    if city in caches:
+                        inflight[(city, key)] = done
+                self._push(done, FILL, (policy, p, depth, key, g))
+            elif followers and wait > 0:
+                # The edge's copy is still in flight; its followers are counted when it lands.
+                waiting = self._waiting[policy]
+                waiting[(path[0], key)] = waiting.get((path[0], key), 0) + followers
+            elif followers:
+                caches[path[0]].get(key, self.segment_size, t, count=followers)
+            self._records[policy].append((g, published, depth, done, latency))
+
+    def _on_fill(self, t, policy, p, depth, key, g):
+        caches = self.caches[policy]
+        path = self.paths[p]
+        fill_segment(caches, path, depth, key, self.segment_size, t)
+        inflight = self._inflight[policy]
+        waiting = self._waiting[policy]
+        upto = depth if depth >= 0 else len(path) - 1
+        for city in path[:upto]:
+            if inflight.get((city, key)) == t:
+                del inflight[(city, key)]
+            count = waiting.pop((city, key), 0)
+            if count and city in caches:
+                caches[city].get(key, self.segment_size, t, count=count)
+            self._schedule_expiry(policy, city)
+
+        # The group's followers are served from the edge, recorded once the segment is there.
+        followers = self._group_size[g] - 1
+        edge = caches.get(path[0])
+        if followers and edge is not None and len(path) > 1:
+            edge.get(key, self.segment_size, t, count=followers)
+
+    def _schedule_expiry(self, policy, city):
+        cache = self.caches[policy].get(city)
+        pending = self._expiry_pending[policy]
+        if cache is None or city in pending:
+            return
+        expires_at = cache.next_expiry()
+        if expires_at is not None:
+            pending.add(city)
+            self._push(expires_at, EXPIRE, (policy, city))
+
+    def _on_expire(self, t, policy, city):
+        self._expiry_pending[policy].discard(city)
+        self.caches[policy][city].expire(t)
+        self._schedule_expiry(policy, city)
+
+    def _expand(self, records):
+        """One row per viewer request for a list of group-leader records."""
+        rec = np.array(records, dtype=np.float64).reshape(-1, 5)
+        groups = rec[:, 0].astype(np.int64)
+        sizes = self.group_size[groups]
+        rec_idx = np.repeat(np.arange(len(rec)), sizes)
+        pos = np.arange(int(sizes.sum())) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        members = self.member_order[self.group_start[groups][rec_idx] + pos]
+        requested = rec[rec_idx, 1] + self.viewer_jitter[members]
+        leader_depth = rec[rec_idx, 2].astype(np.int16)
+        done = rec[rec_idx, 3]
+
+        is_leader = pos == 0
+        has_edge = self.path_len[self.viewer_path[members]] > 1
+        # Followers are edge hits; those asking before the leader's fill lands wait for it.
+        follower = ~is_leader & has_edge
+        depth = np.where(follower, 0, leader_depth).astype(np.int16)
+        coalesced = follower & (leader_depth != 0) & (requested < done)
+        return {
+            'members': members, 'requested': requested, 'depth': depth, 'done': done,
+            'is_leader': is_leader, 'coalesced': coalesced, 'leader_latency': rec[rec_idx, 4],
+        }
+
+    def _collect(self):
+        empty = np.zeros(0, dtype=np.int64)
+        result = {
+            'requests': 0, 'hits': 0, 'bytes_saved': 0, 'dropped': 0, 'load': {},
+            'node_requests': np.zeros(len(self.nodes), dtype=np.int64),
+            'node_hits': np.zeros(len(self.nodes), dtype=np.int64),
+            'policies': {},
+            'log': {'viewer': empty, 'city': empty.astype(np.int32), 'hit': empty.astype(bool),
+                    'latency': empty, 'tier': empty.astype(np.int16), 'time': empty.astype(np.float64)},
+        }
+        rows = {}
+        for policy in self.policies:
+            records, self._records[policy] = self._records[policy], []
+            if records:
+                rows[policy] = self._expand(records)
+        # The capacity model only runs for the active policy; a shadow policy's
+        # request counts as dropped when the same viewer's request was dropped there.
+        dropped_viewers = self._fill_active(result, rows[self.policy]) if self.policy in rows else []
+        for policy in self.policies:
+            if policy not in rows:
+                result['policies'][policy] = {'requests': 0, 'hits': 0, 'bytes': 0, 'hit_bytes': 0}
+                continue
+            members = rows[policy]['members']
+            dropped = np.isin(members, dropped_viewers)
+            hits = {policy: rows[policy]['depth'] >= 0}
+            result['policies'].update(self._policy_deltas(hits, self.segment_size, dropped))
+        return result
+
+    def _fill_active(self, result, rows):
+        """Fill ``result`` from the active policy's rows; returns the viewers whose requests were dropped."""
+        order = np.argsort(rows['requested'], kind='stable')
+        rows = {name: column[order] for name, column in rows.items()}
+        members, depth = rows['members'], rows['depth']
+        paths = self.viewer_path[members]
+
+        # Coalesced followers get their bytes from the edge once the leader's fill lands:
+        # an edge-hit draw plus the time left on that fill.
+        coalesced = rows['coalesced']
+        latency = self._draw_latency(depth, paths)
+        latency[rows['is_leader']] = rows['leader_latency'][rows['is_leader']]
+        wait_ms = np.maximum(rows['done'][coalesced] - rows['requested'][coalesced], 0) * 1000
+        latency[coalesced] = latency[coalesced] + wait_ms.astype(np.int64)
+        latency, load, dropped = self._apply_capacity(latency, depth, paths, self.segment_size, self._window)
+
+        is_hit = depth >= 0
+        delivered = is_hit & ~dropped
+        hits = int(delivered.sum())
+        node_requests, node_hits = self._node_counters(depth, paths)
+        result.update({
+            'requests': len(members),
+            'hits': hits,
+            'bytes_saved': hits * self.segment_size,
+            'dropped': load.get('dropped', 0),
+            'load': load,
+            'node_requests': node_requests,
+            'node_hits': node_hits,
+        })
+        result['log'] = {
+            'viewer': members,
+            'city': self.viewer_city[members],
+            'hit': delivered,
+            'latency': latency,
+            'tier': np.where(is_hit, self.path_tier[paths, np.maximum(depth, 0)], self.origin_tier),
+            'time': self.start_time + rows['requested'],
+        }
+        return members[dropped]
+
+
+def main():
+    from latency_sketch import DDSketchBank, DEFAULT_QUANTILES, quantile_label
+    from locations import INDIAN_LOCATIONS
+    from routing import RoutingTable
+
+    parser = argparse.ArgumentParser(description="Run the CDN model on a virtual clock, as fast as possible.")
+    parser.add_argument('--hours', type=float, default=24)
+    parser.add_argument('--config', default='simulation_config.json')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    cfg = {}
+    if os.path.exists(args.config):
+        with open(args.config) as f:
+            cfg = json.load(f)
+    cfg.setdefault('cities_enabled', ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Hyderabad', 'Kolkata'])
+    origin = cfg.get('origin_city', 'Chennai')
+    table = RoutingTable(INDIAN_LOCATIONS, cfg['cities_enabled'], origin)
+
+    started = time.perf_counter()
+    engine = EventEngine(cfg, INDIAN_LOCATIONS, table.path, seed=args.seed, start_time=0.0)
+    sketch = DDSketchBank(['all'])
+    totals = {policy: {'requests': 0, 'hits': 0} for policy in engine.policies}
+    end = args.hours * 3600
+    while engine.now < end:
+        result = engine.advance(min(3600.0, end - engine.now))
+        sketch.add(np.zeros(len(result['log']['latency']), dtype=np.int64), result['log']['latency'])
+        for policy, delta in result['policies'].items():
+            totals[policy]['requests'] += delta['requests']
+            totals[policy]['hits'] += delta['hits']
+    elapsed = time.perf_counter() - started
+
+    print(f"{args.hours:g} h simulated in {elapsed:.1f} s ({engine.events_processed:,} events)")
+    for policy, total in totals.items():
+        ratio = total['hits'] / total['requests'] if total['requests'] else 0.0
+        print(f"  {policy:8s} requests={total['requests']:,} hit_ratio={ratio:.2%}")
+    quantiles = sketch.quantiles(DEFAULT_QUANTILES)
+    print("  latency " + " ".join(f"{quantile_label(q)}={v:.0f}ms" for q, v in quantiles.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import math
+
+import numpy as np
+
+DEFAULT_QUANTILES = (0.5, 0.95, 0.99, 0.999)
+
+
+def quantile_label(q):
+    return 'p' + f"{q * 100:g}".replace('.', '')
+
+
+class DDSketchBank:
+    """One DDSketch per label (edge city, tier, ...) in a single count matrix.
+
+    Values land in logarithmic buckets of ratio ``gamma = (1 + alpha) / (1 - alpha)``,
+    so every reported quantile is within ``alpha`` relative error. The bucket
+    range is fixed, which makes memory constant for the whole run, and a batch
+    of values for many labels is one ``np.bincount``.
+    """
+
+    def __init__(self, labels, alpha=0.01, min_value=0.5, max_value=600000.0):
+        self.labels = list(labels)
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self._offset = math.ceil(math.log(min_value) / self._log_gamma)
+        self.num_buckets = math.ceil(math.log(max_value) / self._log_gamma) - self._offset + 1
+        self.counts = np.zeros((len(self.labels), self.num_buckets), dtype=np.int64)
+
+    @property
+    def nbytes(self):
+        return self.counts.nbytes
+
+    def add(self, label_idx, values):
+        """Record ``values`` (ms) against the labels at ``label_idx``."""
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return
+        buckets = np.ceil(np.log(np.maximum(values, 1e-9)) / self._log_gamma).astype(np.int64) - self._offset
+        np.clip(buckets, 0, self.num_buckets - 1, out=buckets)
+        flat = np.asarray(label_idx, dtype=np.int64) * self.num_buckets + buckets
+        self.counts += np.bincount(flat, minlength=self.counts.size).reshape(self.counts.shape)
+
+    def merge(self, other):
+        self.counts += other.counts
+
+    def sparse_counts(self):
+        """``(labels, buckets, counts)`` of the non-empty buckets, for shipping between processes."""
+        rows, buckets = np.nonzero(self.counts)
+        return rows, buckets, self.counts[rows, buckets]
+
+    def add_counts(self, label_idx, buckets, counts):
+        np.add.at(self.counts, (np.asarray(label_idx), np.asarray(buckets)), counts)
+
+    def count(self, label=None):
+        return int(self._row(label).sum())
+
+    def quantiles(self, qs=DEFAULT_QUANTILES, label=None):
+        """Quantile estimates (ms) for one label, or for everything when ``label`` is None."""
+        row = self._row(label)
+        total = row.sum()
+        if total == 0:
+            return {q: 0.0 for q in qs}
+        cumulative = np.cumsum(row)
+        ranks = np.array([q * (total - 1) for q in qs])
+        buckets = np.searchsorted(cumulative, ranks, side='right')
+        values = 2 * self.gamma ** (buckets + self._offset) / (self.gamma + 1)
+        return {q: float(v) for q, v in zip(qs, values)}
+
+    def summary(self, qs=DEFAULT_QUANTILES):
+        """``{label: {'count': n, 'p50': ms, ...}}`` for every label with data."""
+        out = {}
+        for i, label in enumerate(self.labels):
+            n = int(self.counts[i].sum())
+            if n:
+                out[label] = {'count': n, **{quantile_label(q): v for q, v in self.quantiles(qs, label).items()}}
+        return out
+
+    def _row(self, label):
+        if label is None:
+            return self.counts.sum(axis=0)
+        return self.counts[self.labels.index(label)]
@@ -0,0 +1,71 @@
+"""Push dashboard metrics to every open browser over Socket.IO.
+
+The simulation thread builds one snapshot per tick, and only while someone
+is subscribed, then broadcasts it once to all connected tabs. Browsers
+apply it with clientside callbacks, so the server's per-tick cost stays
+the same however many dashboards are watching.
+"""
+import logging
+import threading
+
+try:
+    from flask_socketio import SocketIO, emit
+except ImportError:  # optional dependency; without it the dashboard falls back to polling
+    SocketIO = None
+    emit = None
+
+NAMESPACE = '/metrics'
+EVENT = 'metrics'
+SOCKETIO_CLIENT_JS = 'https://cdn.socket.io/4.7.2/socket.io.min.js'
+CLIENT_SCRIPTS = [SOCKETIO_CLIENT_JS] if SocketIO is not None else []
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsPublisher:
+    """Broadcasts versioned snapshots to the browsers connected to ``NAMESPACE``."""
+
+    def __init__(self, server):
+        self.socketio = SocketIO(server, async_mode='threading') if SocketIO is not None else None
+        self.subscribers = 0
+        self.version = 0
+        self.last = None
+        self._lock = threading.Lock()
+        if self.socketio is not None:
+            self.socketio.on_event('connect', self._connect, namespace=NAMESPACE)
+            self.socketio.on_event('disconnect', self._disconnect, namespace=NAMESPACE)
+
+    @property
+    def enabled(self):
+        return self.socketio is not None
+
+    def _connect(self, auth=None):
+        with self._lock:
+            self.subscribers += 1
+        if self.last is not None:
+            emit(EVENT, self.last)  # a new tab draws the current state without waiting a tick
+
+    def _disconnect(self, *args):
+        with self._lock:
+            self.subscribers = max(self.subscribers - 1, 0)
+
+    def publish(self, build):
+        """Build a snapshot with ``build()`` and broadcast it; skipped while nobody listens."""
+        if self.socketio is None or not self.subscribers:
+            return None
+        self.version += 1
+        snapshot = dict(build(), version=self.version)
+        self.last = snapshot
+        self.socketio.emit(EVENT, snapshot, namespace=NAMESPACE)
+        return snapshot
+
+    def reset(self):
+        """Forget the last snapshot, e.g. when a new simulation starts."""
+        self.last = None
+
+    def run(self, app, **kwargs):
+        """Serve the Dash app, with the Socket.IO endpoint when it is available."""
+        if self.socketio is None:
+            logger.info("flask-socketio not installed; dashboards poll for updates")
+            return app.run(**kwargs)
+        return self.socketio.run(app.server, allow_unsafe_werkzeug=True, **kwargs)
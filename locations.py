@@ -0,0 +1,156 @@
+INDIAN_LOCATIONS = {
+        'Mumbai': {'lat': 19.0760, 'lon': 72.8777, 'type': 'regional', 'region': 'West'},
+    'Chennai': {'lat': 13.0827, 'lon': 80.2707, 'type': 'regional', 'region': 'South'},
+    'Delhi': {'lat': 28.7041, 'lon': 77.1025, 'type': 'regional', 'region': 'North'},
+    'Bangalore': {'lat': 12.9716, 'lon': 77.5946, 'type': 'regional', 'region': 'South'},
+    'Hyderabad': {'lat': 17.3850, 'lon': 78.4867, 'type': 'regional', 'region': 'South'},
+    'Kolkata': {'lat': 22.5726, 'lon': 88.3639, 'type': 'regional', 'region': 'East'},
+    'Ahmedabad': {'lat': 23.0225, 'lon': 72.5714, 'type': 'regional', 'region': 'West'},
+    'Pune': {'lat': 18.5204, 'lon': 73.8567, 'type': 'sub-regional', 'region': 'West'},
+    'Jaipur': {'lat': 26.9124, 'lon': 75.7873, 'type': 'sub-regional', 'region': 'North'},
+    'Surat': {'lat': 21.1702, 'lon': 72.8311, 'type': 'sub-regional', 'region': 'West'},
+    'Lucknow': {'lat': 26.8467, 'lon': 80.9462, 'type': 'sub-regional', 'region': 'North'},
+    'Kanpur': {'lat': 26.4499, 'lon': 80.3319, 'type': 'sub-regional', 'region': 'North'},
+    'Nagpur': {'lat': 21.1458, 'lon': 79.0882, 'type': 'sub-regional', 'region': 'Central'},
+    'Indore': {'lat': 22.7196, 'lon': 75.8577, 'type': 'sub-regional', 'region': 'Central'},
+    'Bhopal': {'lat': 23.2599, 'lon': 77.4126, 'type': 'sub-regional', 'region': 'Central'},
+    'Visakhapatnam': {'lat': 17.6869, 'lon': 83.2185, 'type': 'sub-regional', 'region': 'South'},
+    'Patna': {'lat': 25.5941, 'lon': 85.1376, 'type': 'sub-regional', 'region': 'East'},
+    'Vadodara': {'lat': 22.3072, 'lon': 73.1812, 'type': 'sub-regional', 'region': 'West'},
+    'Coimbatore': {'lat': 11.0168, 'lon': 76.9558, 'type': 'sub-regional', 'region': 'South'},
+    'Ludhiana': {'lat': 30.9010, 'lon': 75.8573, 'type': 'sub-regional', 'region': 'North'},
+    'Kochi': {'lat': 9.9312, 'lon': 76.2673, 'type': 'sub-regional', 'region': 'South'},
+    'Guwahati': {'lat': 26.1445, 'lon': 91.7362, 'type': 'sub-regional', 'region': 'East'},
+    'Chandigarh': {'lat': 30.7333, 'lon': 76.7794, 'type': 'local', 'region': 'North'},
+    'Agra': {'lat': 27.1767, 'lon': 78.0081, 'type': 'local', 'region': 'North'},
+    'Varanasi': {'lat': 25.3176, 'lon': 82.9739, 'type': 'local', 'region': 'North'},
+    'Amritsar': {'lat': 31.6340, 'lon': 74.8723, 'type': 'local', 'region': 'North'},
+    'Allahabad': {'lat': 25.4358, 'lon': 81.8463, 'type': 'local', 'region': 'North'},
+    'Ranchi': {'lat': 23.3441, 'lon': 85.3096, 'type': 'local', 'region': 'East'},
+    'Bhubaneswar': {'lat': 20.2961, 'lon': 85.8245, 'type': 'local', 'region': 'East'},
+    'Dehradun': {'lat': 30.3165, 'lon': 78.0322, 'type': 'local', 'region': 'North'},
+    'Raipur': {'lat': 21.2514, 'lon': 81.6296, 'type': 'local', 'region': 'Central'},
+    'Thiruvananthapuram': {'lat': 8.5241, 'lon': 76.9366, 'type': 'local', 'region': 'South'},
+    'Mysuru': {'lat': 12.2958, 'lon': 76.6394, 'type': 'local', 'region': 'South'},
+    'Madurai': {'lat': 9.9252, 'lon': 78.1198, 'type': 'local', 'region': 'South'},
+    'Tirupati': {'lat': 13.6288, 'lon': 79.4192, 'type': 'local', 'region': 'South'},
+    'Vijayawada': {'lat': 16.5062, 'lon': 80.6480, 'type': 'local', 'region': 'South'},
+    'Mangalore': {'lat': 12.9141, 'lon': 74.8560, 'type': 'local', 'region': 'South'},
+    'Nashik': {'lat': 19.9975, 'lon': 73.7898, 'type': 'local', 'region': 'West'},
+    'Aurangabad': {'lat': 19.8762, 'lon': 75.3433, 'type': 'local', 'region': 'West'},
+    'Rajkot': {'lat': 22.3039, 'lon': 70.8022, 'type': 'local', 'region': 'West'},
+    'Jodhpur': {'lat': 26.2389, 'lon': 73.0243, 'type': 'local', 'region': 'West'},
+    'Udaipur': {'lat': 24.5854, 'lon': 73.7125, 'type': 'local', 'region': 'West'},
+    'Jammu': {'lat': 32.7266, 'lon': 74.8570, 'type': 'local', 'region': 'North'},
+    'Shimla': {'lat': 31.1048, 'lon': 77.1734, 'type': 'local', 'region': 'North'},
+    'Gurgaon': {'lat': 28.4595, 'lon': 77.0266, 'type': 'local', 'region': 'North'},
+    'Noida': {'lat': 28.5355, 'lon': 77.3910, 'type': 'local', 'region': 'North'},
+    'Faridabad': {'lat': 28.4089, 'lon': 77.3178, 'type': 'local', 'region': 'North'},
+    'Ghaziabad': {'lat': 28.6692, 'lon': 77.4538, 'type': 'local', 'region': 'North'},
+    'Meerut': {'lat': 28.9845, 'lon': 77.7064, 'type': 'local', 'region': 'North'},
+    'Vellore': {'lat': 12.9165, 'lon': 79.1325, 'type': 'local', 'region': 'South'},
+    'Salem': {'lat': 11.6643, 'lon': 78.1460, 'type': 'local', 'region': 'South'},
+    'Trichy': {'lat': 10.7905, 'lon': 78.7047, 'type': 'local', 'region': 'South'},
+    'Tirunelveli': {'lat': 8.7139, 'lon': 77.7567, 'type': 'local', 'region': 'South'},
+    'Guntur': {'lat': 16.3067, 'lon': 80.4365, 'type': 'local', 'region': 'South'},
+    'Warangal': {'lat': 17.9689, 'lon': 79.5941, 'type': 'local', 'region': 'South'},
+    'Karimnagar': {'lat': 18.4386, 'lon': 79.1288, 'type': 'local', 'region': 'South'},
+    'Rajahmundry': {'lat': 17.0005, 'lon': 81.8040, 'type': 'local', 'region': 'South'},
+    'Nellore': {'lat': 14.4426, 'lon': 79.9865, 'type': 'local', 'region': 'South'},
+    'Kadapa': {'lat': 14.4673, 'lon': 78.8242, 'type': 'local', 'region': 'South'},
+    'Kakinada': {'lat': 16.9891, 'lon': 82.2475, 'type': 'local', 'region': 'South'},
+    'Hubli': {'lat': 15.3647, 'lon': 75.1240, 'type': 'local', 'region': 'South'},
+    'Belgaum': {'lat': 15.8497, 'lon': 74.4977, 'type': 'local', 'region': 'South'},
+    'Gulbarga': {'lat': 17.3297, 'lon': 76.8343, 'type': 'local', 'region': 'South'},
+    'Jamshedpur': {'lat': 22.8046, 'lon': 86.2029, 'type': 'local', 'region': 'East'},
+    'Dhanbad': {'lat': 23.7957, 'lon': 86.4304, 'type': 'local', 'region': 'East'},
+    'Siliguri': {'lat': 26.7271, 'lon': 88.3953, 'type': 'local', 'region': 'East'},
+    'Asansol': {'lat': 23.6739, 'lon': 86.9524, 'type': 'local', 'region': 'East'},
+    'Durgapur': {'lat': 23.5204, 'lon': 87.3119, 'type': 'local', 'region': 'East'},
+    'Panchkula': {'lat': 30.6942, 'lon': 76.8535, 'type': 'village', 'region': 'North'},
+    'Mohali': {'lat': 30.7046, 'lon': 76.7179, 'type': 'village', 'region': 'North'},
+    'Zirakpur': {'lat': 30.6425, 'lon': 76.8173, 'type': 'village', 'region': 'North'},
+    'Dharamshala': {'lat': 32.2190, 'lon': 76.3234, 'type': 'village', 'region': 'North'},
+    'Manali': {'lat': 32.2432, 'lon': 77.1892, 'type': 'village', 'region': 'North'},
+    'Rishikesh': {'lat': 30.0869, 'lon': 78.2676, 'type': 'village', 'region': 'North'},
+    'Haridwar': {'lat': 29.9457, 'lon': 78.1642, 'type': 'village', 'region': 'North'},
+    'Muzaffarpur': {'lat': 26.1225, 'lon': 85.3906, 'type': 'village', 'region': 'East'},
+    'Purnia': {'lat': 25.7771, 'lon': 87.4753, 'type': 'village', 'region': 'East'},
+    'Darbhanga': {'lat': 26.1542, 'lon': 85.9009, 'type': 'village', 'region': 'East'},
+    'Bhagalpur': {'lat': 25.2425, 'lon': 86.9842, 'type': 'village', 'region': 'East'},
+    'Kurnool': {'lat': 15.8281, 'lon': 78.0373, 'type': 'village', 'region': 'South'},
+    'Anantapur': {'lat': 14.6819, 'lon': 77.6006, 'type': 'village', 'region': 'South'},
+    'Chittoor': {'lat': 13.2172, 'lon': 79.1003, 'type': 'village', 'region': 'South'},
+    'Ongole': {'lat': 15.5057, 'lon': 80.0499, 'type': 'village', 'region': 'South'},
+    'Nizamabad': {'lat': 18.6725, 'lon': 78.0941, 'type': 'village', 'region': 'South'},
+    'Khammam': {'lat': 17.2473, 'lon': 80.1514, 'type': 'village', 'region': 'South'},
+    'Mahbubnagar': {'lat': 16.7378, 'lon': 77.9826, 'type': 'village', 'region': 'South'},
+    'Tumkur': {'lat': 13.3392, 'lon': 77.1011, 'type': 'village', 'region': 'South'},
+    'Davangere': {'lat': 14.4644, 'lon': 75.9218, 'type': 'village', 'region': 'South'},
+    'Bellary': {'lat': 15.1394, 'lon': 76.9214, 'type': 'village', 'region': 'South'},
+    'Bijapur': {'lat': 16.8302, 'lon': 75.7100, 'type': 'village', 'region': 'South'},
+    'Shimoga': {'lat': 13.9299, 'lon': 75.5681, 'type': 'village', 'region': 'South'},
+    'Erode': {'lat': 11.3410, 'lon': 77.7172, 'type': 'village', 'region': 'South'},
+    'Thanjavur': {'lat': 10.7870, 'lon': 79.1378, 'type': 'village', 'region': 'South'},
+    'Dindigul': {'lat': 10.3673, 'lon': 77.9803, 'type': 'village', 'region': 'South'},
+    'Vellankanni': {'lat': 10.6833, 'lon': 79.8333, 'type': 'village', 'region': 'South'},
+    'Cuddalore': {'lat': 11.7480, 'lon': 79.7714, 'type': 'village', 'region': 'South'},
+    'Kumbakonam': {'lat': 10.9601, 'lon': 79.3845, 'type': 'village', 'region': 'South'},
+    'Palakkad': {'lat': 10.7867, 'lon': 76.6548, 'type': 'village', 'region': 'South'},
+    'Thrissur': {'lat': 10.5276, 'lon': 76.2144, 'type': 'village', 'region': 'South'},
+    'Kannur': {'lat': 11.8745, 'lon': 75.3704, 'type': 'village', 'region': 'South'},
+    'Kollam': {'lat': 8.8932, 'lon': 76.6141, 'type': 'village', 'region': 'South'},
+    'Alappuzha': {'lat': 9.4981, 'lon': 76.3388, 'type': 'village', 'region': 'South'},
+    'Kottayam': {'lat': 9.5916, 'lon': 76.5222, 'type': 'village', 'region': 'South'},
+    'Kozhikode': {'lat': 11.2588, 'lon': 75.7804, 'type': 'village', 'region': 'South'},
+    'Tiruppur': {'lat': 11.1075, 'lon': 77.3398, 'type': 'village', 'region': 'South'},
+    'Karur': {'lat': 10.9601, 'lon': 78.0766, 'type': 'village', 'region': 'South'},
+    'Namakkal': {'lat': 11.2189, 'lon': 78.1677, 'type': 'village', 'region': 'South'},
+    'Puducherry': {'lat': 11.9416, 'lon': 79.8083, 'type': 'village', 'region': 'South'},
+    'Bikaner': {'lat': 28.0229, 'lon': 73.3119, 'type': 'village', 'region': 'North'},
+    'Ajmer': {'lat': 26.4499, 'lon': 74.6399, 'type': 'village', 'region': 'North'},
+    'Kota': {'lat': 25.2138, 'lon': 75.8648, 'type': 'village', 'region': 'North'},
+    'Bharatpur': {'lat': 27.2152, 'lon': 77.4900, 'type': 'village', 'region': 'North'},
+    'Alwar': {'lat': 27.5530, 'lon': 76.6346, 'type': 'village', 'region': 'North'},
+    'Bhilwara': {'lat': 25.3407, 'lon': 74.6408, 'type': 'village', 'region': 'North'},
+    'Sikar': {'lat': 27.6119, 'lon': 75.1397, 'type': 'village', 'region': 'North'},
+    'Pali': {'lat': 25.7711, 'lon': 73.3234, 'type': 'village', 'region': 'North'},
+    'Gorakhpur': {'lat': 26.7606, 'lon': 83.3732, 'type': 'village', 'region': 'North'},
+    'Bareilly': {'lat': 28.3670, 'lon': 79.4304, 'type': 'village', 'region': 'North'},
+    'Moradabad': {'lat': 28.8389, 'lon': 78.7378, 'type': 'village', 'region': 'North'},
+    'Aligarh': {'lat': 27.8974, 'lon': 78.0880, 'type': 'village', 'region': 'North'},
+    'Saharanpur': {'lat': 29.9680, 'lon': 77.5460, 'type': 'village', 'region': 'North'},
+    'Mathura': {'lat': 27.4924, 'lon': 77.6737, 'type': 'village', 'region': 'North'},
+    'Firozabad': {'lat': 27.1591, 'lon': 78.3957, 'type': 'village', 'region': 'North'},
+    'Jhansi': {'lat': 25.4484, 'lon': 78.5685, 'type': 'village', 'region': 'North'},
+    'Gwalior': {'lat': 26.2183, 'lon': 78.1828, 'type': 'village', 'region': 'North'},
+    'Ujjain': {'lat': 23.1765, 'lon': 75.7885, 'type': 'village', 'region': 'Central'},
+    'Jabalpur': {'lat': 23.1815, 'lon': 79.9864, 'type': 'village', 'region': 'Central'},
+    'Guna': {'lat': 24.6460, 'lon': 77.3103, 'type': 'village', 'region': 'Central'},
+    'Sagar': {'lat': 23.8388, 'lon': 78.7378, 'type': 'village', 'region': 'Central'},
+    'Satna': {'lat': 24.6005, 'lon': 80.8322, 'type': 'village', 'region': 'Central'},
+    'Ratlam': {'lat': 23.3315, 'lon': 75.0367, 'type': 'village', 'region': 'Central'},
+    'Bilaspur': {'lat': 22.0797, 'lon': 82.1409, 'type': 'village', 'region': 'Central'},
+    'Korba': {'lat': 22.3595, 'lon': 82.7501, 'type': 'village', 'region': 'Central'},
+    'Raigarh': {'lat': 21.8974, 'lon': 83.3950, 'type': 'village', 'region': 'Central'},
+    'Bhilai': {'lat': 21.2095, 'lon': 81.3785, 'type': 'village', 'region': 'Central'},
+    'Kolhapur': {'lat': 16.7050, 'lon': 74.2433, 'type': 'village', 'region': 'West'},
+    'Sangli': {'lat': 16.8524, 'lon': 74.5815, 'type': 'village', 'region': 'West'},
+    'Solapur': {'lat': 17.6599, 'lon': 75.9064, 'type': 'village', 'region': 'West'},
+    'Nanded': {'lat': 19.1383, 'lon': 77.3210, 'type': 'village', 'region': 'West'},
+    'Jalgaon': {'lat': 21.0077, 'lon': 75.5626, 'type': 'village', 'region': 'West'},
+    'Amravati': {'lat': 20.9374, 'lon': 77.7796, 'type': 'village', 'region': 'West'},
+    'Akola': {'lat': 20.7002, 'lon': 77.0082, 'type': 'village', 'region': 'West'},
+    'Latur': {'lat': 18.3983, 'lon': 76.5604, 'type': 'village', 'region': 'West'},
+    'Dhule': {'lat': 20.9042, 'lon': 74.7749, 'type': 'village', 'region': 'West'},
+    'Ahmednagar': {'lat': 19.0948, 'lon': 74.7480, 'type': 'village', 'region': 'West'},
+    'Bhavnagar': {'lat': 21.7645, 'lon': 72.1519, 'type': 'village', 'region': 'West'},
+    'Jamnagar': {'lat': 22.4707, 'lon': 70.0577, 'type': 'village', 'region': 'West'},
+    'Junagadh': {'lat': 21.5222, 'lon': 70.4579, 'type': 'village', 'region': 'West'},
+    'Gandhinagar': {'lat': 23.2156, 'lon': 72.6369, 'type': 'village', 'region': 'West'},
+    'Anand': {'lat': 22.5645, 'lon': 72.9289, 'type': 'village', 'region': 'West'},
+    'Nadiad': {'lat': 22.6939, 'lon': 72.8618, 'type': 'village', 'region': 'West'},
+    'Morbi': {'lat': 22.8173, 'lon': 70.8377, 'type': 'village', 'region': 'West'},
+    'Surendranagar': {'lat': 22.7031, 'lon': 71.6371, 'type': 'village', 'region': 'West'},
+    'Gandhidham': {'lat': 23.0752, 'lon': 70.1327, 'type': 'village', 'region': 'West'},
+}
@@ -0,0 +1,215 @@
+"""Asyncio edge proxy: the routes of nginx_hls_server.py on a single event loop.
+
+Every simulated viewer is a coroutine instead of an OS thread, so the
+per-segment distance delay is an ``asyncio.sleep`` and one process holds
+tens of thousands of concurrent viewers. Viewers that name their city are
+shaped along their routing path exactly like the threaded server, with the
+waits awaited instead of slept. Requires aiohttp:
+
+    pip install aiohttp
+    python nginx_hls_async.py
+"""
+import asyncio
+import logging
+import resource
+from datetime import datetime
+
+try:
+    import aiohttp
+    from aiohttp import web
+except ImportError:  # optional dependency, only this entry point needs it
+    aiohttp = None
+    web = None
+
+import edge_proxy as edge
+from edge_shaping import load_shaper
+from viewer_registry import ViewerRegistry
+
+logger = logging.getLogger(__name__)
+
+LISTEN_BACKLOG = 4096
+viewers = ViewerRegistry(timeout=edge.VIEWER_TIMEOUT, tick=edge.VIEWER_CLEANUP_INTERVAL)
+segment_store = edge.SegmentStore(edge.SEGMENT_CACHE_MB * 1024 * 1024)
+request_count = 0
+total_segment_requests = 0
+upstream_fetches = 0
+coalesced_requests = 0
+inflight = {}
+start_time = datetime.now()
+
+
+async def fetch_upstream(session, filename):
+    """Fetch one file from nginx and cache it; None when nginx does not have it."""
+    async with session.get(f'{edge.NGINX_HLS_URL}/{filename}') as response:
+        if response.status != 200:
+            return None
+        body = await response.read()
+    mimetype = edge.get_mimetype(filename)
+    if filename.endswith('.ts'):
+        segment_store.put(filename, body, mimetype)
+    elif filename.endswith('.m3u8'):
+        segment_store.put(filename, body, mimetype, ttl=edge.playlist_ttl(body))
+    return body, mimetype
+
+
+async def fetch_once(session, filename):
+    """Coalesce concurrent misses for ``filename`` onto one upstream fetch."""
+    global upstream_fetches, coalesced_requests
+    task = inflight.get(filename)
+    if task is not None:
+        coalesced_requests += 1
+        return await asyncio.shield(task)
+
+    upstream_fetches += 1
+    task = inflight[filename] = asyncio.ensure_future(fetch_upstream(session, filename))
+    task.add_done_callback(lambda _: inflight.pop(filename, None))
+    return await asyncio.shield(task)
+
+
+async def index(request):
+    return web.Response(text=edge.INDEX_HTML, content_type='text/html')
+
+
+async def stats(request):
+    uptime = str(datetime.now() - start_time).split('.')[0]
+    return web.json_response({
+        'active_viewers': len(viewers),
+        'total_requests': request_count,
+        'segment_requests': total_segment_requests,
+        'uptime': uptime,
+        'segment_cache': segment_store.stats(),
+        'upstream_fetches': upstream_fetches,
+        'coalesced_requests': coalesced_requests,
+        'inflight_fetches': len(inflight),
+        'shaping': request.app['shaper'].stats()
+    })
+
+
+async def serve_stream(request):
+    global request_count, total_segment_requests
+    request_count += 1
+    filename = request.match_info['filename']
+
+    viewer_id = request.query.get('viewer_id', 'unknown')
+    if viewer_id != 'unknown':
+        viewers.touch(viewer_id)
+    city = edge.viewer_city(request.query, request.headers)
+    route = request.app['shaper'].route(city) if city is not None else None
+
+    if filename.endswith('.ts'):
+        total_segment_requests += 1
+        if route is None:
+            await asyncio.sleep(edge.SEGMENT_DELAY)
+        cache_control = 'public, max-age=3600, immutable'
+    else:
+        cache_control = 'no-cache, no-store, must-revalidate'
+    headers = {
+        'Cache-Control': cache_control,
+        'Access-Control-Allow-Origin': '*'
+    }
+
+    cached = segment_store.get(filename)
+    cache_status = 'HIT'
+    if cached is None:
+        cache_status = 'MISS'
+        try:
+            cached = await fetch_once(request.app['upstream'], filename)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return web.Response(text=f"Error: {e}", status=500)
+        if cached is None:
+            return web.Response(text="Not found", status=404)
+
+    body, mimetype = cached
+    headers['X-Cache'] = cache_status
+    if route is None:
+        return web.Response(body=body, content_type=mimetype, headers=headers)
+    return await shaped_response(request, body, mimetype, headers, route, cache_status == 'HIT')
+
+
+async def shaped_response(request, body, mimetype, headers, route, is_cache_hit):
+    """Send ``body`` after the path latency, paced chunk by chunk by the route's links."""
+    shaper = request.app['shaper']
+    await asyncio.sleep(shaper.latency(route, is_cache_hit))
+    response = web.StreamResponse(headers=headers)
+    response.content_type = mimetype
+    response.content_length = len(body)
+    await response.prepare(request)
+    for chunk in edge.split_chunks(body):
+        delay = shaper.pace(route, len(chunk), is_cache_hit)
+        if delay:
+            await asyncio.sleep(delay)
+        await response.write(chunk)
+    await response.write_eof()
+    return response
+
+
+async def cleanup_inactive_viewers(app):
+    while True:
+        await asyncio.sleep(edge.VIEWER_CLEANUP_INTERVAL)
+        try:
+            viewers.expire()
+        except Exception:
+            logger.exception("Viewer cleanup failed")
+
+
+async def reload_shaper(app):
+    """Rebuild the shaper when the config changes; file I/O stays off the event loop."""
+    loop = asyncio.get_running_loop()
+    mtime = app['shaper_mtime']
+    while True:
+        await asyncio.sleep(edge.SHAPER_RELOAD_INTERVAL)
+        try:
+            latest = await loop.run_in_executor(None, edge.shaping_config_mtime)
+            if latest != mtime:
+                app['shaper'] = await loop.run_in_executor(None, load_shaper, edge.SHAPING_CONFIG)
+                mtime = latest
+        except Exception:
+            # Keep serving with the previous shaper; the next pass retries.
+            logger.exception("Shaper reload failed")
+
+
+async def upstream_session(app):
+    loop = asyncio.get_running_loop()
+    app['shaper_mtime'] = await loop.run_in_executor(None, edge.shaping_config_mtime)
+    app['shaper'] = await loop.run_in_executor(None, load_shaper, edge.SHAPING_CONFIG)
+    timeout = aiohttp.ClientTimeout(sock_connect=edge.UPSTREAM_CONNECT_TIMEOUT,
+                                    sock_read=edge.UPSTREAM_READ_TIMEOUT)
+    connector = aiohttp.TCPConnector(limit=edge.UPSTREAM_POOL_SIZE)
+    app['upstream'] = aiohttp.ClientSession(timeout=timeout, connector=connector)
+    tasks = [asyncio.create_task(cleanup_inactive_viewers(app)), asyncio.create_task(reload_shaper(app))]
+    yield
+    for task in tasks:
+        task.cancel()
+    await app['upstream'].close()
+
+
+def create_app():
+    if aiohttp is None:
+        raise RuntimeError("The async edge proxy needs aiohttp: pip install aiohttp")
+    app = web.Application()
+    app.cleanup_ctx.append(upstream_session)
+    app.router.add_get('/', index)
+    app.router.add_get('/stats', stats)
+    app.router.add_get('/stream/{filename:.+}', serve_stream)
+    return app
+
+
+def raise_open_file_limit():
+    """Each viewer holds a socket, so lift the soft descriptor limit to the hard one."""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    max_files = raise_open_file_limit()
+    print("\n" + "="*70)
+    print("EdgeStream Origin Server (asyncio)")
+    print("="*70)
+    print("🌐 http://localhost:5000/")
+    print(f"📂 open file limit: {max_files}")
+    print("="*70 + "\n")
+
+    web.run_app(create_app(), host='0.0.0.0', port=5000, backlog=LISTEN_BACKLOG)
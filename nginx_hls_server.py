@@ -1,10 +1,23 @@
-from flask import Flask, render_template_string, jsonify, Response, request
+from flask import Flask, render_template_string, jsonify, Response, request, send_file
+from werkzeug.utils import safe_join
 from flask_cors import CORS
 import time
 import logging
 from datetime import datetime
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 import threading
+import os
+import tempfile
+from collections import OrderedDict
+from edge_proxy import (NGINX_HLS_URL, VIEWER_TIMEOUT, VIEWER_CLEANUP_INTERVAL, SEGMENT_DELAY,
+                        SEGMENT_CACHE_MB, SegmentStore, playlist_ttl, get_mimetype,
+                        UPSTREAM_POOL_SIZE, UPSTREAM_CONNECT_TIMEOUT, UPSTREAM_READ_TIMEOUT,
+                        STREAM_CHUNK_SIZE, split_chunks, SHAPING_CONFIG, SHAPER_RELOAD_INTERVAL,
+                        shaping_config_mtime, viewer_city, INDEX_HTML)
+from edge_shaping import load_shaper
+from viewer_registry import ViewerRegistry, ThreadCounters
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -12,406 +25,478 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)
 
-# Configuration
-WINDOWS_IP = "172.16.13.136"
-NGINX_HLS_URL = f'http://{WINDOWS_IP}:8080/hls'
-
 # Viewer tracking
-viewer_last_seen = {}
-VIEWER_TIMEOUT = 10
-
-request_count = 0
-total_segment_requests = 0
+viewers = ViewerRegistry(timeout=VIEWER_TIMEOUT, tick=VIEWER_CLEANUP_INTERVAL)
+counters = ThreadCounters(('requests', 'segment_requests'))
 start_time = datetime.now()
 
+class SingleFlight:
+    """Collapse concurrent calls for the same key into one; waiters share its result."""
+    
+    class _Call:
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.leaders = 0
+        self.waiters = 0
+    
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self._Call()
+                self.leaders += 1
+            else:
+                self.waiters += 1
+        
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+segment_store = SegmentStore(SEGMENT_CACHE_MB * 1024 * 1024)
+upstream_fetches = SingleFlight()
+
+# Upstream connection pool
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connections_opened = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+    
+    def record_checkout(self, waited):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+    
+    def record_connect(self):
+        with self._lock:
+            self.connections_opened += 1
+    
+    def stats(self):
+        with self._lock:
+            reused = max(self.checkouts - self.connections_opened, 0)
+            return {
+                'pool_size': UPSTREAM_POOL_SIZE,
+                'requests': self.checkouts,
+                'connections_opened': self.connections_opened,
+                'connections_reused': reused,
+                'reuse_ratio': reused / self.checkouts if self.checkouts else 0.0,
+                'avg_wait_ms': self.wait_seconds / self.checkouts * 1000 if self.checkouts else 0.0,
+                'max_wait_ms': self.max_wait_seconds * 1000,
+            }
+
+pool_metrics = PoolMetrics()
+
+class _InstrumentedPoolMixin:
+    def _get_conn(self, timeout=None):
+        started = time.perf_counter()
+        conn = super()._get_conn(timeout)
+        pool_metrics.record_checkout(time.perf_counter() - started)
+        return conn
+    
+    def _new_conn(self):
+        pool_metrics.record_connect()
+        return super()._new_conn()
+
+class InstrumentedHTTPConnectionPool(_InstrumentedPoolMixin, HTTPConnectionPool):
+    pass
+
+class InstrumentedHTTPSConnectionPool(_InstrumentedPoolMixin, HTTPSConnectionPool):
+    pass
+
+class PooledAdapter(HTTPAdapter):
+    """Keep-alive adapter whose pools report reuse, wait time and new connections."""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': InstrumentedHTTPConnectionPool,
+            'https': InstrumentedHTTPSConnectionPool,
+        }
+
+def create_upstream_session():
+    session = requests.Session()
+    adapter = PooledAdapter(pool_connections=4, pool_maxsize=UPSTREAM_POOL_SIZE, pool_block=True)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+upstream = create_upstream_session()
+
+# Streaming proxy
+STREAM_PROXY = True  # forward upstream chunks as they arrive instead of buffering whole files
+DISK_CACHE_DIR = None  # e.g. '/tmp/edge_cache': keep segments on disk and serve hits with sendfile
+DISK_CACHE_MB = 2048
+
+class DiskSegmentStore:
+    """Bounded LRU of segment files under ``root``.
+
+    Files already on disk at startup are indexed oldest modification time
+    first, so the byte budget holds across restarts. Evicted files are deleted.
+    """
+    
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self._entries = OrderedDict()  # filename -> size in bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if root is not None and os.path.isdir(root):
+            self._index()
+    
+    def _index(self):
+        found = []
+        for dirpath, _, names in os.walk(self.root):
+            for name in names:
+                if name.endswith('.ts'):
+                    st = os.stat(os.path.join(dirpath, name))
+                    found.append((st.st_mtime, os.path.relpath(os.path.join(dirpath, name), self.root), st.st_size))
+        with self._lock:
+            for _, filename, size in sorted(found):
+                self._entries[filename] = size
+                self.used_bytes += size
+            self._evict()
+    
+    def open(self, filename):
+        """The cached segment opened for reading, or None; an open file outlives its eviction."""
+        with self._lock:
+            if filename not in self._entries:
+                self.misses += 1
+                return None
+            try:
+                f = open(safe_join(self.root, filename), 'rb')
+            except FileNotFoundError:  # removed behind our back
+                self.used_bytes -= self._entries.pop(filename)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(filename)
+            self.hits += 1
+            return f
+    
+    def put(self, filename, body):
+        if len(body) > self.max_bytes:
+            return
+        path = safe_join(self.root, filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'wb') as f:
+            f.write(body)
+        with self._lock:
+            os.replace(tmp_path, path)
+            if filename in self._entries:
+                self.used_bytes -= self._entries.pop(filename)
+            self._entries[filename] = len(body)
+            self.used_bytes += len(body)
+            self._evict()
+    
+    def _evict(self):
+        while self.used_bytes > self.max_bytes:
+            filename, size = self._entries.popitem(last=False)
+            self.used_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(safe_join(self.root, filename))
+            except FileNotFoundError:
+                pass
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'objects': len(self._entries),
+                'used_bytes': self.used_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+disk_store = DiskSegmentStore(DISK_CACHE_DIR, DISK_CACHE_MB * 1024 * 1024)
+
+def on_disk(filename):
+    """Whether ``filename`` is cached on disk rather than in memory."""
+    return DISK_CACHE_DIR is not None and filename.endswith('.ts') and safe_join(DISK_CACHE_DIR, filename) is not None
+
+def store_fetched(filename, body, mimetype):
+    """Cache a complete upstream file: segments on disk when configured, otherwise in memory."""
+    if filename.endswith('.ts'):
+        if on_disk(filename):
+            disk_store.put(filename, body)
+        else:
+            segment_store.put(filename, body, mimetype)
+    elif filename.endswith('.m3u8'):
+        segment_store.put(filename, body, mimetype, ttl=playlist_ttl(body))
+
+def fetch_upstream(filename):
+    """Fetch one file from nginx and cache it; None when nginx does not have it."""
+    response = upstream.get(f'{NGINX_HLS_URL}/{filename}',
+                            timeout=(UPSTREAM_CONNECT_TIMEOUT, UPSTREAM_READ_TIMEOUT))
+    if response.status_code != 200:
+        return None
+    
+    body = response.content
+    mimetype = get_mimetype(filename)
+    store_fetched(filename, body, mimetype)
+    return body, mimetype
+
+class StreamingFetch:
+    """One upstream transfer that any number of clients read while it arrives.
+
+    A pump thread appends chunks; each reader yields chunks as soon as they
+    land, so time-to-first-byte is the origin's, and memory per file is one
+    copy however many viewers are attached.
+    """
+    
+    def __init__(self, filename):
+        self.filename = filename
+        self.status = None
+        self.error = None
+        self.done = False
+        self._chunks = []
+        self._cond = threading.Condition()
+    
+    def pump(self):
+        try:
+            with upstream.get(f'{NGINX_HLS_URL}/{self.filename}', stream=True,
+                              timeout=(UPSTREAM_CONNECT_TIMEOUT, UPSTREAM_READ_TIMEOUT)) as response:
+                with self._cond:
+                    self.status = response.status_code
+                    self._cond.notify_all()
+                if response.status_code == 200:
+                    for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+                        with self._cond:
+                            self._chunks.append(chunk)
+                            self._cond.notify_all()
+                    store_fetched(self.filename, b''.join(self._chunks), get_mimetype(self.filename))
+        except Exception as e:
+            logger.warning(f"Upstream fetch failed for {self.filename}: {e}")
+            with self._cond:
+                self.error = e
+        finally:
+            with self._cond:
+                self.done = True
+                self._cond.notify_all()
+    
+    def wait_status(self):
+        with self._cond:
+            self._cond.wait_for(lambda: self.status is not None or self.done)
+            return self.status
+    
+    def iter_chunks(self):
+        sent = 0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: sent < len(self._chunks) or self.done)
+                chunks = self._chunks[sent:]
+                finished = self.done
+            for chunk in chunks:
+                yield chunk
+            sent += len(chunks)
+            if finished and sent >= len(self._chunks):
+                if self.error is not None:
+                    # Raising makes the WSGI server drop the connection, so viewers
+                    # see a failed transfer instead of a short segment with a 200.
+                    raise ConnectionError(f"Upstream transfer of {self.filename} failed") from self.error
+                return
+
+class StreamingFetches:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.leaders = 0
+        self.waiters = 0
+    
+    def join(self, filename):
+        """The in-flight transfer for ``filename``, starting one if there is none."""
+        with self._lock:
+            fetch = self._inflight.get(filename)
+            if fetch is not None:
+                self.waiters += 1
+                return fetch
+            fetch = self._inflight[filename] = StreamingFetch(filename)
+            self.leaders += 1
+        threading.Thread(target=self._run, args=(fetch,), daemon=True).start()
+        return fetch
+    
+    def _run(self, fetch):
+        try:
+            fetch.pump()
+        finally:
+            with self._lock:
+                self._inflight.pop(fetch.filename, None)
+
+streaming_fetches = StreamingFetches()
+
+# Per-viewer shaping along the routing model's path (viewer city from ?city= or X-Viewer-City)
+shaper = None
+shaper_mtime = None
+shaper_checked = 0.0
+shaper_lock = threading.Lock()
+
+def get_shaper():
+    """EdgeShaper for the current simulation config, rebuilt when the file changes.
+    
+    The file is stat'ed at most every SHAPER_RELOAD_INTERVAL seconds, not on every request.
+    """
+    global shaper, shaper_mtime, shaper_checked
+    now = time.monotonic()
+    if shaper is not None and now - shaper_checked < SHAPER_RELOAD_INTERVAL:
+        return shaper
+    with shaper_lock:
+        if shaper is None or now - shaper_checked >= SHAPER_RELOAD_INTERVAL:
+            mtime = shaping_config_mtime()
+            if shaper is None or mtime != shaper_mtime:
+                shaper = load_shaper(SHAPING_CONFIG)
+                shaper_mtime = mtime
+            shaper_checked = now
+    return shaper
+
+def viewer_route(edge_shaper, args, headers):
+    """Routing path for the viewer's city, or None to fall back to the fixed SEGMENT_DELAY."""
+    city = viewer_city(args, headers)
+    if city is None:
+        return None
+    return edge_shaper.route(city)
+
+def read_chunks(f):
+    with f:
+        while True:
+            chunk = f.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+def shaped(edge_shaper, chunks, route, is_cache_hit):
+    """Yield ``chunks`` no faster than the links on ``route`` allow."""
+    for chunk in chunks:
+        delay = edge_shaper.pace(route, len(chunk), is_cache_hit)
+        if delay:
+            time.sleep(delay)
+        yield chunk
+
+def shaped_response(edge_shaper, body, mimetype, headers, route, is_cache_hit):
+    """Response for ``body`` (bytes or chunks), delayed and paced along ``route`` when it is known."""
+    if route is not None:
+        time.sleep(edge_shaper.latency(route, is_cache_hit))
+        if isinstance(body, bytes):
+            body = split_chunks(body)
+        body = shaped(edge_shaper, body, route, is_cache_hit)
+    return Response(body, mimetype=mimetype, headers=headers)
+
 def cleanup_inactive_viewers():
     while True:
         try:
-            current_time = time.time()
-            inactive = [vid for vid, last_seen in viewer_last_seen.items() 
-                       if current_time - last_seen > VIEWER_TIMEOUT]
-            for vid in inactive:
-                del viewer_last_seen[vid]
-        except:
-            pass
-        time.sleep(5)
+            viewers.expire()
+        except Exception:
+            logger.exception("Viewer cleanup failed")
+        time.sleep(VIEWER_CLEANUP_INTERVAL)
 
 cleanup_thread = threading.Thread(target=cleanup_inactive_viewers, daemon=True)
 cleanup_thread.start()
 
 @app.route('/')
 def index():
-    html = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Stream</title>
-        <link href="https://vjs.zencdn.net/8.5.2/video-js.css" rel="stylesheet">
-        <style>
-            * { margin: 0; padding: 0; box-sizing: border-box; }
-            
-            body {
-                font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-                background: #000;
-                color: #fff;
-                min-height: 100vh;
-                display: flex;
-                flex-direction: column;
-                overflow-x: hidden;
-            }
-            
-            /* Animated background */
-            body::before {
-                content: '';
-                position: fixed;
-                top: 0;
-                left: 0;
-                width: 100%;
-                height: 100%;
-                background: radial-gradient(ellipse at top, #1a1a2e 0%, #0f0f1e 50%, #000 100%);
-                z-index: -1;
-            }
-            
-            /* Floating gradient orbs */
-            .orb {
-                position: fixed;
-                border-radius: 50%;
-                filter: blur(80px);
-                opacity: 0.15;
-                animation: float 20s ease-in-out infinite;
-                z-index: 0;
-            }
-            
-            .orb1 {
-                width: 500px;
-                height: 500px;
-                background: linear-gradient(135deg, #667eea, #764ba2);
-                top: -250px;
-                left: -250px;
-                animation-delay: 0s;
-            }
-            
-            .orb2 {
-                width: 400px;
-                height: 400px;
-                background: linear-gradient(135deg, #f093fb, #f5576c);
-                bottom: -200px;
-                right: -200px;
-                animation-delay: 5s;
-            }
-            
-            .orb3 {
-                width: 350px;
-                height: 350px;
-                background: linear-gradient(135deg, #4facfe, #00f2fe);
-                top: 50%;
-                right: -175px;
-                animation-delay: 10s;
-            }
-            
-            @keyframes float {
-                0%, 100% { transform: translate(0, 0) scale(1); }
-                33% { transform: translate(30px, -30px) scale(1.1); }
-                66% { transform: translate(-20px, 20px) scale(0.9); }
-            }
-            
-            header {
-                position: relative;
-                padding: 40px 60px;
-                background: rgba(0, 0, 0, 0.5);
-                backdrop-filter: blur(40px);
-                border-bottom: 1px solid rgba(255,255,255,0.03);
-                z-index: 10;
-            }
-            
-            h1 {
-                margin: 0;
-                font-size: 48px;
-                font-weight: 700;
-                background: linear-gradient(135deg, #fff 0%, #667eea 50%, #764ba2 100%);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                letter-spacing: -2px;
-                animation: glow 3s ease-in-out infinite;
-            }
-            
-            @keyframes glow {
-                0%, 100% { filter: drop-shadow(0 0 20px rgba(102, 126, 234, 0.5)); }
-                50% { filter: drop-shadow(0 0 40px rgba(118, 75, 162, 0.8)); }
-            }
-            
-            .live-indicator {
-                display: inline-flex;
-                align-items: center;
-                gap: 10px;
-                padding: 10px 20px;
-                background: rgba(239, 68, 68, 0.1);
-                border: 1px solid rgba(239, 68, 68, 0.3);
-                border-radius: 25px;
-                font-size: 14px;
-                font-weight: 600;
-                color: #ef4444;
-                margin-top: 15px;
-                box-shadow: 0 0 30px rgba(239, 68, 68, 0.2);
-            }
-            
-            .live-dot {
-                width: 10px;
-                height: 10px;
-                background: #ef4444;
-                border-radius: 50%;
-                animation: pulse 2s ease-in-out infinite;
-                box-shadow: 0 0 15px rgba(239, 68, 68, 0.8);
-            }
-            
-            @keyframes pulse {
-                0%, 100% { opacity: 1; transform: scale(1); }
-                50% { opacity: 0.6; transform: scale(1.2); }
-            }
-            
-            .container {
-                position: relative;
-                max-width: 1600px;
-                margin: 0 auto;
-                padding: 80px 60px;
-                flex: 1;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                z-index: 5;
-            }
-            
-            .video-wrapper {
-                width: 100%;
-                position: relative;
-            }
-            
-            /* Glowing border effect */
-            .video-glow {
-                position: absolute;
-                top: -20px;
-                left: -20px;
-                right: -20px;
-                bottom: -20px;
-                background: linear-gradient(135deg, #667eea, #764ba2, #f093fb, #4facfe);
-                border-radius: 30px;
-                opacity: 0.3;
-                filter: blur(40px);
-                animation: rotate 8s linear infinite;
-                z-index: -1;
-            }
-            
-            @keyframes rotate {
-                0% { transform: rotate(0deg); }
-                100% { transform: rotate(360deg); }
-            }
-            
-            .video-container {
-                position: relative;
-                padding-bottom: 56.25%;
-                height: 0;
-                background: #000;
-                border-radius: 20px;
-                overflow: hidden;
-                box-shadow: 
-                    0 30px 80px rgba(0,0,0,0.8),
-                    0 0 100px rgba(102, 126, 234, 0.2);
-            }
-            
-            .video-container video {
-                position: absolute;
-                top: 0;
-                left: 0;
-                width: 100%;
-                height: 100%;
-            }
-            
-            /* Custom video.js styles - FIXED CONTROLS */
-            .vjs-big-play-button {
-                border: none;
-                background: linear-gradient(135deg, #667eea, #764ba2) !important;
-                border-radius: 50%;
-                width: 100px;
-                height: 100px;
-                line-height: 100px;
-                margin-top: -50px;
-                margin-left: -50px;
-                font-size: 50px;
-                box-shadow: 0 10px 40px rgba(102, 126, 234, 0.5);
-                transition: all 0.4s ease;
-            }
-            
-            .vjs-big-play-button:hover {
-                background: linear-gradient(135deg, #764ba2, #667eea) !important;
-                transform: scale(1.1);
-                box-shadow: 0 15px 60px rgba(102, 126, 234, 0.8);
-            }
-            
-            /* Control bar visibility */
-            .video-js .vjs-control-bar {
-                background: linear-gradient(to top, rgba(0,0,0,0.9), transparent) !important;
-                backdrop-filter: blur(10px);
-                display: flex !important;
-            }
-            
-            .video-js .vjs-control {
-                color: #fff !important;
-                opacity: 1 !important;
-            }
-            
-            .video-js .vjs-button > .vjs-icon-placeholder:before {
-                color: #fff !important;
-            }
-            
-            .video-js .vjs-play-progress {
-                background: linear-gradient(135deg, #667eea, #764ba2) !important;
-            }
-            
-            .video-js .vjs-volume-level {
-                background: linear-gradient(135deg, #667eea, #764ba2) !important;
-            }
-            
-            .video-js .vjs-slider {
-                background: rgba(255,255,255,0.2) !important;
-            }
-            
-            .video-js .vjs-load-progress {
-                background: rgba(255,255,255,0.3) !important;
-            }
-            
-            /* Ensure controls are always visible when needed */
-            .video-js:hover .vjs-control-bar,
-            .video-js.vjs-user-active .vjs-control-bar,
-            .video-js.vjs-paused .vjs-control-bar {
-                opacity: 1 !important;
-                visibility: visible !important;
-            }
-            
-            /* Subtle particle effect */
-            @keyframes particle {
-                0% { transform: translateY(0) translateX(0) scale(0); opacity: 0; }
-                50% { opacity: 1; }
-                100% { transform: translateY(-100vh) translateX(50px) scale(1); opacity: 0; }
-            }
-            
-            .particle {
-                position: fixed;
-                width: 3px;
-                height: 3px;
-                background: rgba(102, 126, 234, 0.5);
-                border-radius: 50%;
-                pointer-events: none;
-                z-index: 1;
-            }
-        </style>
-    </head>
-    <body>
-        <div class="orb orb1"></div>
-        <div class="orb orb2"></div>
-        <div class="orb orb3"></div>
-        
-        <header style="text-align: center;">
-            <h1>Stream</h1
-            <div class="live-indicator">
-                <span class="live-dot"></span>
-                <span>LIVE BROADCAST</span>
-            </div>
-        </header>
-        
-        <div class="container">
-            <div class="video-wrapper">
-                <div class="video-glow"></div>
-                <div class="video-container">
-                    <video id="player" class="video-js vjs-default-skin vjs-big-play-centered" 
-                           controls autoplay muted data-setup='{}'>
-                        <source src="http://localhost:5000/stream/mobile.m3u8" 
-                                type="application/x-mpegURL">
-                    </video>
-                </div>
-            </div>
-        </div>
-
-        <script src="https://vjs.zencdn.net/8.5.2/video.min.js"></script>
-        <script>
-            var player = videojs('player', {
-                liveui: true,
-                liveTracker: { trackingThreshold: 0, liveTolerance: 2 },
-                controlBar: {
-                    volumePanel: { inline: false }
-                }
-            });
-            
-            // Ensure controls are always accessible
-            player.ready(function() {
-                this.controlBar.show();
-            });
-            
-            // Create floating particles
-            function createParticle() {
-                const particle = document.createElement('div');
-                particle.className = 'particle';
-                particle.style.left = Math.random() * 100 + '%';
-                particle.style.bottom = '0';
-                particle.style.animationDuration = (Math.random() * 3 + 2) + 's';
-                particle.style.animationName = 'particle';
-                document.body.appendChild(particle);
-                
-                setTimeout(() => particle.remove(), 5000);
-            }
-            
-            setInterval(createParticle, 500);
-        </script>
-    </body>
-    </html>
-    """
-    return render_template_string(html)
+    return render_template_string(INDEX_HTML)
 
 @app.route('/stats')
 def stats():
     uptime = str(datetime.now() - start_time).split('.')[0]
+    totals = counters.snapshot()
     return jsonify({
-        'active_viewers': len(viewer_last_seen),
-        'total_requests': request_count,
-        'segment_requests': total_segment_requests,
-        'uptime': uptime
+        'active_viewers': len(viewers),
+        'total_requests': totals['requests'],
+        'segment_requests': totals['segment_requests'],
+        'uptime': uptime,
+        'segment_cache': segment_store.stats(),
+        'disk_cache': disk_store.stats() if DISK_CACHE_DIR is not None else None,
+        'upstream_fetches': upstream_fetches.leaders + streaming_fetches.leaders,
+        'coalesced_requests': upstream_fetches.waiters + streaming_fetches.waiters,
+        'upstream_pool': pool_metrics.stats(),
+        'shaping': get_shaper().stats()
     })
 
 @app.route('/stream/<path:filename>')
 def serve_stream(filename):
-    global request_count, total_segment_requests
-    request_count += 1
+    counters.incr('requests')
     
     viewer_id = request.args.get('viewer_id', 'unknown')
     if viewer_id != 'unknown':
-        viewer_last_seen[viewer_id] = time.time()
+        viewers.touch(viewer_id)
+    # One shaper per request, so routing, latency and pacing all use the same config.
+    edge_shaper = get_shaper()
+    route = viewer_route(edge_shaper, request.args, request.headers)
     
     if filename.endswith('.ts'):
-        total_segment_requests += 1
-        time.sleep(0.85)
+        counters.incr('segment_requests')
+        if route is None:
+            time.sleep(SEGMENT_DELAY)
     
-    nginx_url = f'{NGINX_HLS_URL}/{filename}'
+    if filename.endswith('.ts'):
+        cache_control = 'public, max-age=3600, immutable'
+    else:
+        cache_control = 'no-cache, no-store, must-revalidate'
+    headers = {
+        'Cache-Control': cache_control,
+        'Access-Control-Allow-Origin': '*'
+    }
+    mimetype = get_mimetype(filename)
     
-    try:
-        response = requests.get(nginx_url, timeout=5)
-        
-        if response.status_code == 200:
-            if filename.endswith('.m3u8'):
-                mimetype = 'application/vnd.apple.mpegurl'
-            elif filename.endswith('.ts'):
-                mimetype = 'video/mp2t'
-            else:
-                mimetype = 'application/octet-stream'
-            
-            return Response(response.content, 
-                          mimetype=mimetype,
-                          headers={
-                              'Cache-Control': 'no-cache, no-store, must-revalidate',
-                              'Access-Control-Allow-Origin': '*'
-                          })
-        else:
+    if on_disk(filename):
+        disk_file = disk_store.open(filename)
+        if disk_file is not None:
+            if route is not None:
+                return shaped_response(edge_shaper, read_chunks(disk_file), mimetype, {**headers, 'X-Cache': 'HIT'}, route, True)
+            # send_file hands the open file to wsgi.file_wrapper, which servers such as gunicorn turn into sendfile.
+            response = send_file(disk_file, mimetype=mimetype, conditional=False)
+            response.headers.update({**headers, 'X-Cache': 'HIT'})
+            return response
+    else:
+        cached = segment_store.get(filename)
+        if cached is not None:
+            body, mimetype = cached
+            return shaped_response(edge_shaper, body, mimetype, {**headers, 'X-Cache': 'HIT'}, route, True)
+    
+    if STREAM_PROXY:
+        fetch = streaming_fetches.join(filename)
+        status = fetch.wait_status()
+        if fetch.error is not None and status is None:
+            return f"Error: {fetch.error}", 500
+        if status != 200:
             return "Not found", 404
+        return shaped_response(edge_shaper, fetch.iter_chunks(), mimetype, {**headers, 'X-Cache': 'MISS'}, route, False)
+    
+    try:
+        cached = upstream_fetches.do(filename, lambda: fetch_upstream(filename))
     except Exception as e:
         return f"Error: {e}", 500
+    if cached is None:
+        return "Not found", 404
+    body, mimetype = cached
+    return shaped_response(edge_shaper, body, mimetype, {**headers, 'X-Cache': 'MISS'}, route, False)
 
 if __name__ == '__main__':
     print("\n" + "="*70)
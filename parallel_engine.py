@@ -0,0 +1,205 @@
+import multiprocessing as mp
+import os
+
+import numpy as np
+
+from capacity_model import ORIGIN_EGRESS_GBPS
+from latency_sketch import DDSketchBank
+from simulation_engine import SimulationEngine, TIER_LABELS, run_policies
+
+LOG_ROWS_PER_WORKER = 2000  # newest requests each worker ships for the live request log
+
+
+def partition_cities(cities, paths, num_shards):
+    """Split cities into shards that never share a cache.
+
+    Cities whose paths meet at any cache are joined (union-find), so every
+    cache is owned by exactly one shard and the sharded run gives the same
+    hits as a single process. Components are packed onto the least loaded
+    shard, biggest first.
+    """
+    parent = {city: city for city in cities}
+
+    def find(city):
+        while parent[city] != city:
+            parent[city] = parent[parent[city]]
+            city = parent[city]
+        return city
+
+    for city, path in zip(cities, paths):
+        for node in path[:-1]:
+            if node in parent:
+                parent[find(node)] = find(city)
+
+    components = {}
+    for city in cities:
+        components.setdefault(find(city), []).append(city)
+
+    shards = [[] for _ in range(min(num_shards, len(components)) or 1)]
+    for members in sorted(components.values(), key=len, reverse=True):
+        min(shards, key=len).extend(members)
+    return [sorted(shard, key=cities.index) for shard in shards if shard]
+
+
+def _shard_worker(conn, cfg, locations, shard_paths, viewer_city, seed):
+    cities = list(shard_paths)
+    engine = SimulationEngine(dict(cfg, cities_enabled=cities), locations, shard_paths.__getitem__,
+                              seed=seed, viewer_city=viewer_city)
+    conn.send((engine.nodes, engine.tier_labels))
+
+    while True:
+        now = conn.recv()
+        if now is None:
+            break
+        result = engine.tick(now)
+        log = result['log']
+        city_sketch = DDSketchBank(engine.cities)
+        tier_sketch = DDSketchBank(engine.tier_labels)
+        city_sketch.add(log['city'], log['latency'])
+        tier_sketch.add(log['tier'], log['latency'])
+        conn.send({
+            'requests': result['requests'],
+            'hits': result['hits'],
+            'bytes_saved': result['bytes_saved'],
+            'dropped': result['dropped'],
+            'load': result['load'],
+            'node_requests': result['node_requests'],
+            'node_hits': result['node_hits'],
+            'policies': result['policies'],
+            'latency': {'city': city_sketch.sparse_counts(), 'tier': tier_sketch.sparse_counts()},
+            'log': {name: column[-LOG_ROWS_PER_WORKER:] for name, column in log.items()},
+        })
+    conn.close()
+
+
+class ShardedEngine:
+    """SimulationEngine split across worker processes by independent cache subtrees.
+
+    Each worker owns the viewers, caches and counters of its shard and runs
+    ``tick`` on its own core. Per tick it returns only compact deltas: node
+    counters, policy totals, sparse DDSketch bucket counts and the newest
+    log rows. They are merged here into one result shaped like
+    ``SimulationEngine.tick``, plus a ``latency`` entry with sketch counts
+    for the whole tick.
+    """
+
+    def __init__(self, cfg, locations, route, seed=None, workers=None):
+        self.cfg = cfg
+        self.cities = [c for c in cfg.get('cities_enabled', []) if c in locations]
+        self.paths = [route(city) for city in self.cities]
+        self.policies = run_policies(cfg)
+        self.sequence = 0
+
+        rng = np.random.default_rng(seed)
+        num_viewers = cfg.get('num_viewers', 100) if self.cities else 0
+        self.viewer_city = rng.integers(0, max(len(self.cities), 1), num_viewers).astype(np.int32)
+        self.viewer_path = self.viewer_city
+
+        workers = workers or cfg.get('sim_workers') or os.cpu_count() or 1
+        city_index = {city: i for i, city in enumerate(self.cities)}
+        self.shards = partition_cities(self.cities, self.paths, workers)
+
+        self.nodes = list(self.cities)
+        self.tier_labels = list(TIER_LABELS)
+        self._workers = []
+        for k, shard in enumerate(self.shards):
+            global_city = np.array([city_index[c] for c in shard], dtype=np.int32)
+            viewers = np.nonzero(np.isin(self.viewer_city, global_city))[0]
+            local_city = np.searchsorted(global_city, self.viewer_city[viewers])
+            # The origin is shared by every shard; each gets egress in proportion to its viewers.
+            share = len(viewers) / max(num_viewers, 1)
+            shard_cfg = dict(cfg, origin_egress_gbps=cfg.get('origin_egress_gbps', ORIGIN_EGRESS_GBPS) * share)
+            parent_conn, child_conn = mp.Pipe()
+            process = mp.Process(
+                target=_shard_worker,
+                args=(child_conn, shard_cfg, locations, {c: self.paths[city_index[c]] for c in shard},
+                      local_city, None if seed is None else seed + k),
+                daemon=True,
+            )
+            process.start()
+            self._workers.append({'conn': parent_conn, 'process': process,
+                                  'viewers': viewers, 'cities': global_city})
+
+        for worker in self._workers:
+            nodes, tier_labels = worker['conn'].recv()
+            for city in nodes:
+                if city not in self.nodes:
+                    self.nodes.append(city)
+            for label in tier_labels:
+                if label not in self.tier_labels:
+                    self.tier_labels.append(label)
+            worker['nodes'] = np.array([self.nodes.index(city) for city in nodes], dtype=np.int64)
+            worker['tiers'] = np.array([self.tier_labels.index(label) for label in tier_labels], dtype=np.int64)
+
+    @property
+    def policy(self):
+        return self.policies[0]
+
+    @property
+    def num_viewers(self):
+        return len(self.viewer_city)
+
+    def city_counts(self):
+        return np.bincount(self.viewer_city, minlength=len(self.cities))
+
+    def tick(self, now):
+        """Run one tick on every worker in parallel and merge their deltas."""
+        self.sequence += 1
+        for worker in self._workers:
+            worker['conn'].send(now)
+
+        merged = {
+            'requests': 0, 'hits': 0, 'bytes_saved': 0, 'dropped': 0, 'load': {},
+            'node_requests': np.zeros(len(self.nodes), dtype=np.int64),
+            'node_hits': np.zeros(len(self.nodes), dtype=np.int64),
+            'policies': {policy: {'requests': 0, 'hits': 0, 'bytes': 0, 'hit_bytes': 0}
+                         for policy in self.policies},
+            'latency': {'city': [[], [], []], 'tier': [[], [], []]},
+        }
+        logs = []
+        for worker in self._workers:
+            delta = worker['conn'].recv()
+            for field in ('requests', 'hits', 'bytes_saved', 'dropped'):
+                merged[field] += delta[field]
+            for field, value in delta['load'].items():
+                if field in ('dropped', 'throughput_bps'):
+                    merged['load'][field] = merged['load'].get(field, 0) + value
+                else:
+                    merged['load'][field] = max(merged['load'].get(field, 0.0), value)
+            np.add.at(merged['node_requests'], worker['nodes'], delta['node_requests'])
+            np.add.at(merged['node_hits'], worker['nodes'], delta['node_hits'])
+            for policy, stats in delta['policies'].items():
+                for field, value in stats.items():
+                    merged['policies'][policy][field] += value
+
+            for name, labels in (('city', worker['cities']), ('tier', worker['tiers'])):
+                rows, buckets, counts = delta['latency'][name]
+                merged['latency'][name][0].append(labels[rows])
+                merged['latency'][name][1].append(buckets)
+                merged['latency'][name][2].append(counts)
+
+            log = delta['log']
+            logs.append({
+                'viewer': worker['viewers'][log['viewer']],
+                'city': worker['cities'][log['city']],
+                'hit': log['hit'],
+                'latency': log['latency'],
+                'tier': worker['tiers'][log['tier']],
+            })
+
+        for name, parts in merged['latency'].items():
+            merged['latency'][name] = tuple(np.concatenate(part) if part else np.zeros(0, dtype=np.int64)
+                                            for part in parts)
+        merged['log'] = {name: np.concatenate([log[name] for log in logs]) if logs else np.zeros(0)
+                         for name in ('viewer', 'city', 'hit', 'latency', 'tier')}
+        return merged
+
+    def close(self):
+        for worker in self._workers:
+            try:
+                worker['conn'].send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for worker in self._workers:
+            worker['process'].join(timeout=5)
+        self._workers = []
@@ -0,0 +1,75 @@
+import numpy as np
+
+COLUMNS = (
+    ('timestamp', np.float64),   # epoch seconds
+    ('viewer', np.int64),
+    ('city', np.int32),          # index into the engine's city list
+    ('hit', np.bool_),
+    ('latency', np.float32),     # ms
+)
+
+
+class RequestLog:
+    """Fixed-capacity columnar ring buffer of simulated requests.
+
+    Every column is preallocated at twice the capacity and each row is
+    written to both halves (a mirrored ring). The newest ``n`` rows are then
+    always one contiguous slice, so readers get NumPy views instead of copies
+    and memory stays at ``nbytes`` no matter how long the run is.
+    """
+
+    def __init__(self, capacity=10000):
+        self.capacity = int(capacity)
+        self._columns = {name: np.zeros(2 * self.capacity, dtype=dtype) for name, dtype in COLUMNS}
+        self._cursor = 0   # next write position in [0, capacity)
+        self._size = 0
+        self.total_rows = 0
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def nbytes(self):
+        return sum(column.nbytes for column in self._columns.values())
+
+    def clear(self):
+        self._cursor = 0
+        self._size = 0
+        self.total_rows = 0
+
+    def append(self, timestamp, viewer, city, hit, latency):
+        """Append a batch of rows; ``timestamp`` may be a scalar shared by the batch."""
+        viewer = np.asarray(viewer)
+        n = len(viewer)
+        self.total_rows += n
+        if n == 0:
+            return
+        values = {
+            'timestamp': np.broadcast_to(np.asarray(timestamp, dtype=np.float64), (n,)),
+            'viewer': viewer,
+            'city': np.asarray(city),
+            'hit': np.asarray(hit),
+            'latency': np.asarray(latency),
+        }
+        if n > self.capacity:
+            values = {name: column[-self.capacity:] for name, column in values.items()}
+            n = self.capacity
+
+        start = self._cursor
+        first = min(n, self.capacity - start)
+        for name, column in self._columns.items():
+            batch = values[name]
+            column[start:start + first] = batch[:first]
+            column[start + self.capacity:start + self.capacity + first] = batch[:first]
+            if first < n:
+                column[:n - first] = batch[first:]
+                column[self.capacity:self.capacity + n - first] = batch[first:]
+
+        self._cursor = (start + n) % self.capacity
+        self._size = min(self._size + n, self.capacity)
+
+    def tail(self, n=None):
+        """Views of the newest ``n`` rows (oldest first), one array per column."""
+        n = self._size if n is None else min(int(n), self._size)
+        end = self._cursor + self.capacity
+        return {name: column[end - n:end] for name, column in self._columns.items()}
@@ -0,0 +1,80 @@
+from spatial_index import SphereKDTree
+
+TIER_TYPES = ('local', 'sub-regional', 'regional')
+
+
+class RoutingTable:
+    """Cache hierarchy for every location, computed once per set of enabled caches.
+
+    Enabled caches are indexed per tier type in a KD-tree on the unit sphere,
+    so the nearest cache of a tier is an O(log n) query even with thousands of
+    PoPs. Paths follow the village -> local -> sub-regional -> regional ->
+    origin climb and are memoized, so each city's path is computed once.
+    """
+
+    def __init__(self, locations, enabled_cities, origin_city):
+        self.locations = locations
+        self.enabled = tuple(c for c in enabled_cities if c in locations)
+        self.origin_city = origin_city
+
+        self.tiers = {}
+        for tier in TIER_TYPES:
+            names = [c for c in self.enabled if locations[c]['type'] == tier]
+            self.tiers[tier] = SphereKDTree(
+                names,
+                [locations[c]['lat'] for c in names],
+                [locations[c]['lon'] for c in names],
+            )
+
+        self._nearest = {}
+        self.paths = {}
+
+    def matches(self, enabled_cities, origin_city):
+        enabled = tuple(c for c in enabled_cities if c in self.locations)
+        return enabled == self.enabled and origin_city == self.origin_city
+
+    def k_nearest(self, from_city, target_type, k=1, exclude=()):
+        """The ``k`` closest enabled caches of a tier as ``(city, km)``, never ``from_city`` itself."""
+        index = self.tiers.get(target_type)
+        if index is None or from_city not in self.locations:
+            return []
+        info = self.locations[from_city]
+        return index.nearest(info['lat'], info['lon'], k=k, exclude=(from_city,) + tuple(exclude))
+
+    def nearest_cache(self, from_city, target_type):
+        key = (from_city, target_type)
+        if key not in self._nearest:
+            nearest = self.k_nearest(from_city, target_type)
+            self._nearest[key] = nearest[0][0] if nearest else None
+        return self._nearest[key]
+
+    def path(self, from_city, origin_city=None):
+        if origin_city is None or origin_city == self.origin_city:
+            if from_city not in self.paths:
+                self.paths[from_city] = self._climb(from_city, self.origin_city)
+            return list(self.paths[from_city])
+        return self._climb(from_city, origin_city)
+
+    def _climb(self, from_city, origin_city):
+        if from_city == origin_city:
+            return [origin_city]
+        if from_city not in self.locations or origin_city not in self.locations:
+            return [origin_city]
+
+        path = [from_city]
+        current = from_city
+        climbs = (
+            ('local', ('village',)),
+            ('sub-regional', ('village', 'local')),
+            ('regional', ('village', 'local', 'sub-regional')),
+        )
+        for tier, from_types in climbs:
+            if self.locations[current]['type'] in from_types:
+                nearest = self.nearest_cache(current, tier)
+                if nearest and nearest not in path:
+                    path.append(nearest)
+                    current = nearest
+
+        if origin_city not in path:
+            path.append(origin_city)
+        return path
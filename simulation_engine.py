@@ -0,0 +1,314 @@
+import random
+
+import numpy as np
+
+from capacity_model import CapacityModel
+from content_model import ContentModel, SEGMENT_DURATION
+from edge_cache import SegmentCache, POLICY_LABELS
+
+SEGMENT_SIZE_BYTES = 500 * 1024  # 500 KB per segment
+
+BASE_LATENCY_MS = 10
+EDGE_HIT_LATENCY_MS = (15, 35)
+HOP_LATENCY_MS = {
+    'regional': (80, 150),
+    'sub-regional': (40, 80),
+    'local': (20, 40),
+}
+DEFAULT_HOP_LATENCY_MS = (10, 25)
+TIER_LABELS = ('regional', 'sub-regional', 'local', 'village', 'origin')
+
+
+def path_latency_ms(path, locations, is_cache_hit, origin_latency=850, rng=random, origin_city=None):
+    """One latency draw (ms) for a request served from the edge or fetched along ``path``.
+
+    The hop into ``origin_city`` (by default the path's last city, where
+    routing paths end) costs ``origin_latency``.
+    """
+    if not path:
+        return origin_latency
+    if is_cache_hit:
+        return rng.randint(*EDGE_HIT_LATENCY_MS)
+    if origin_city is None:
+        origin_city = path[-1]
+    total = BASE_LATENCY_MS
+    for city in path[1:]:
+        loc_type = locations.get(city, {}).get('type', 'unknown')
+        if city == origin_city:
+            total += origin_latency
+        else:
+            total += rng.randint(*HOP_LATENCY_MS.get(loc_type, DEFAULT_HOP_LATENCY_MS))
+    return total
+
+
+def run_policies(cfg):
+    """The active eviction policy first, then any shadow policies to compare against."""
+    active = cfg.get('eviction_policy', 'lru')
+    policies = [active]
+    for policy in cfg.get('compare_policies', []):
+        if policy not in policies and policy in POLICY_LABELS:
+            policies.append(policy)
+    return policies
+
+
+def build_caches(cfg, policy):
+    capacity = cfg.get('cache_size_mb', 100) * 1024 * 1024
+    ttl = cfg.get('cache_ttl', 30)
+    return {city: SegmentCache(capacity, ttl, policy) for city in cfg.get('cities_enabled', [])}
+
+
+def lookup_segment(caches, cache_path, key, size, now):
+    """Index of the first cache on the path holding ``key``, or -1 for origin."""
+    for depth, cache_city in enumerate(cache_path[:-1]):
+        cache = caches.get(cache_city)
+        if cache is None:
+            continue
+        if cache.get(key, size, now):
+            return depth
+    return -1
+
+
+def fill_segment(caches, cache_path, served_by, key, size, now):
+    """Store ``key`` in every cache below the one that served it."""
+    fill_upto = served_by if served_by >= 0 else len(cache_path) - 1
+    for cache_city in cache_path[:fill_upto]:
+        cache = caches.get(cache_city)
+        if cache is not None:
+            cache.put(key, size, now)
+
+
+def fetch_segment(caches, cache_path, key, size, now):
+    """Walk the cache tiers of a path; return the index of the serving cache or -1 for origin."""
+    served_by = lookup_segment(caches, cache_path, key, size, now)
+    fill_segment(caches, cache_path, served_by, key, size, now)
+    return served_by
+
+
+class SimulationEngine:
+    """Batched CDN model where a tick is a handful of vectorized NumPy calls.
+
+    Viewers are stored as parallel arrays (home city, routing path, stream,
+    playback lag). Viewers that share a path, stream and lag ask for the same
+    segment every tick, so the caches are walked once per such group: the
+    group leader takes the real cache outcome and the rest are coalesced onto
+    the segment the leader just pulled into the edge.
+    """
+
+    def __init__(self, cfg, locations, route, seed=None, viewer_city=None):
+        self.cfg = cfg
+        self.rng = np.random.default_rng(seed)
+        self.segment_size = int(cfg.get('segment_size_kb', SEGMENT_SIZE_BYTES // 1024) * 1024)
+        self.segment_duration = cfg.get('segment_duration', SEGMENT_DURATION)
+        self.sequence = 0
+
+        self.cities = [c for c in cfg.get('cities_enabled', []) if c in locations]
+        self.paths = [route(city) for city in self.cities]
+
+        self.nodes = list(self.cities)
+        for path in self.paths:
+            for city in path:
+                if city not in self.nodes:
+                    self.nodes.append(city)
+        node_index = {city: i for i, city in enumerate(self.nodes)}
+
+        max_len = max((len(p) for p in self.paths), default=1)
+        self.path_len = np.array([len(p) for p in self.paths], dtype=np.int16)
+        self.path_nodes = np.full((len(self.paths), max_len), -1, dtype=np.int32)
+        self.hop_low = np.zeros((len(self.paths), max(max_len - 1, 1)), dtype=np.int64)
+        self.hop_high = np.ones_like(self.hop_low)  # padding draws 0 and is masked out
+
+        self.tier_labels = list(TIER_LABELS)
+        for city in self.nodes:
+            loc_type = locations.get(city, {}).get('type', 'unknown')
+            if loc_type not in self.tier_labels:
+                self.tier_labels.append(loc_type)
+        self.origin_tier = self.tier_labels.index('origin')
+        origin_city = cfg.get('origin_city')
+        self.path_tier = np.full((len(self.paths), max_len), self.origin_tier, dtype=np.int16)
+
+        for p, path in enumerate(self.paths):
+            self.path_nodes[p, :len(path)] = [node_index[city] for city in path]
+            for h, city in enumerate(path[:-1]):
+                self.path_tier[p, h] = self.tier_labels.index(locations.get(city, {}).get('type', 'unknown'))
+            for h, city in enumerate(path[1:]):
+                loc_type = locations.get(city, {}).get('type', 'unknown')
+                if city == origin_city:
+                    low = high = cfg.get('origin_latency', 850)
+                else:
+                    low, high = HOP_LATENCY_MS.get(loc_type, DEFAULT_HOP_LATENCY_MS)
+                self.hop_low[p, h] = low
+                self.hop_high[p, h] = high + 1
+
+        self._build_viewers(cfg.get('num_viewers', 100), viewer_city)
+
+        self.policies = run_policies(cfg)
+        self.caches = {policy: build_caches(cfg, policy) for policy in self.policies}
+        self.origin_fetches = dict.fromkeys(self.policies, 0)
+        self.capacity = CapacityModel(cfg, self.nodes, locations) if cfg.get('capacity_model', True) else None
+
+    @property
+    def policy(self):
+        return self.policies[0]
+
+    @property
+    def num_viewers(self):
+        return len(self.viewer_city)
+
+    def _build_viewers(self, num_viewers, viewer_city=None):
+        rng = self.rng
+        if not self.cities:
+            num_viewers = 0
+        if viewer_city is not None:
+            self.viewer_city = np.asarray(viewer_city, dtype=np.int32)
+            num_viewers = len(self.viewer_city)
+        else:
+            self.viewer_city = rng.integers(0, max(len(self.cities), 1), num_viewers).astype(np.int32)
+        self.viewer_path = self.viewer_city.copy()
+        self.content = ContentModel(self.cfg, num_viewers, rng)
+        self.viewer_stream = self.content.viewer_content
+        self.viewer_lag = self.content.viewer_lag
+        self._group_viewers(self.viewer_stream, self.viewer_lag)
+
+    def _group_viewers(self, content, position):
+        """Group viewers that want the same segment through the same path."""
+        width = int(position.max()) + 1 if len(position) else 1
+        code = (self.viewer_path.astype(np.int64) * self.content.num_contents + content) * width + position
+        _, self.group_leader, self.viewer_group, self.group_size = np.unique(
+            code, return_index=True, return_inverse=True, return_counts=True)
+        self.viewer_group = self.viewer_group.ravel()
+
+    def city_counts(self):
+        return np.bincount(self.viewer_city, minlength=len(self.cities))
+
+    def tick(self, now, segment_size=None):
+        """Advance the live edge by one segment and serve every viewer once."""
+        segment_size = segment_size or self.segment_size
+        self.sequence += 1
+        for caches in self.caches.values():
+            for cache in caches.values():
+                cache.expire(now)
+
+        if self.content.static:
+            content = self.viewer_stream
+            seq = np.maximum(self.sequence - self.viewer_lag, 0)
+        else:
+            content, seq = self.content.requests(self.sequence)
+            self._group_viewers(content, seq)
+
+        num_groups = len(self.group_leader)
+        policy_depth = {}
+
+        for policy, caches in self.caches.items():
+            leader_depth = np.empty(num_groups, dtype=np.int16)
+            follower_depth = np.empty(num_groups, dtype=np.int16)
+            for g in range(num_groups):
+                leader = self.group_leader[g]
+                path = self.paths[self.viewer_path[leader]]
+                key = (int(content[leader]), int(seq[leader]))
+                followers = int(self.group_size[g]) - 1
+
+                depth = fetch_segment(caches, path, key, segment_size, now)
+                if depth == -1:
+                    self.origin_fetches[policy] += 1
+                follow = depth
+                edge = caches.get(path[0]) if len(path) > 1 else None
+                if followers and edge is not None and key in edge:
+                    edge.get(key, segment_size, now, count=followers)
+                    follow = 0
+                leader_depth[g] = depth
+                follower_depth[g] = follow
+
+            policy_depth[policy] = follower_depth[self.viewer_group]
+            policy_depth[policy][self.group_leader] = leader_depth
+
+        depth = policy_depth[self.policy]
+        is_hit = depth >= 0
+        latency, load, dropped = self._apply_capacity(self._draw_latency(depth), depth, self.viewer_path,
+                                                      segment_size, self.segment_duration)
+        tier = np.where(is_hit, self.path_tier[self.viewer_path, np.maximum(depth, 0)], self.origin_tier)
+
+        node_requests, node_hits = self._node_counters(depth)
+        policy_deltas = self._policy_deltas({p: d >= 0 for p, d in policy_depth.items()}, segment_size, dropped)
+        delivered = policy_deltas[self.policy]
+
+        return {
+            'requests': self.num_viewers,
+            'hits': delivered['hits'],
+            'bytes_saved': delivered['hit_bytes'],
+            'dropped': load.get('dropped', 0),
+            'load': load,
+            'node_requests': node_requests,
+            'node_hits': node_hits,
+            'policies': policy_deltas,
+            'log': {
+                'viewer': np.arange(self.num_viewers),
+                'city': self.viewer_city,
+                'hit': is_hit & ~dropped,
+                'latency': latency,
+                'tier': tier,
+            },
+        }
+
+    def _apply_capacity(self, latency, depth, viewer_path, sizes, seconds):
+        """Add queueing and transfer delay to ``latency``; dropped requests show the timeout.
+
+        Returns the latency, the load stats and the dropped mask.
+        """
+        if self.capacity is None or not len(depth):
+            return latency, {}, np.zeros(len(depth), dtype=bool)
+        extra, dropped, load = self.capacity.apply(depth, self.path_nodes[viewer_path], self.path_len[viewer_path],
+                                                   sizes, seconds, self.rng)
+        latency = latency + extra
+        latency[dropped] = self.capacity.timeout_ms
+        return latency, load, dropped
+
+    def _policy_deltas(self, policy_hits, sizes, dropped):
+        """Per-policy counters for one batch of requests.
+
+        ``policy_hits`` maps each policy to its per-request cache-hit mask.
+        Requests the capacity model dropped were never delivered, so they
+        count as requests but not as hits or saved bytes, for every policy.
+        """
+        sizes = np.broadcast_to(np.asarray(sizes, dtype=np.int64), dropped.shape)
+        total = int(sizes.sum())
+        deltas = {}
+        for policy, is_hit in policy_hits.items():
+            delivered = is_hit & ~dropped
+            deltas[policy] = {
+                'requests': len(dropped),
+                'hits': int(delivered.sum()),
+                'bytes': total,
+                'hit_bytes': int(sizes[delivered].sum()),
+            }
+        return deltas
+
+    def _draw_latency(self, depth, viewer_path=None):
+        rng = self.rng
+        viewer_path = self.viewer_path if viewer_path is None else viewer_path
+        latency = rng.integers(EDGE_HIT_LATENCY_MS[0], EDGE_HIT_LATENCY_MS[1] + 1,
+                               len(depth)).astype(np.int64)
+
+        upstream = np.nonzero(depth != 0)[0]
+        if len(upstream):
+            paths = viewer_path[upstream]
+            d = depth[upstream]
+            hops = np.where(d > 0, d, self.path_len[paths] - 1)
+            draws = rng.integers(self.hop_low[paths], self.hop_high[paths])
+            used = np.arange(draws.shape[1]) < hops[:, None]
+            latency[upstream] = BASE_LATENCY_MS + (draws * used).sum(axis=1)
+        return latency
+
+    def _node_counters(self, depth, viewer_path=None):
+        """Per-node requests and hits for every cache a viewer's request consulted."""
+        paths = self.viewer_path if viewer_path is None else viewer_path
+        consulted = np.where(depth >= 0, depth, self.path_len[paths] - 2)
+        node_requests = np.zeros(len(self.nodes), dtype=np.int64)
+        node_hits = np.zeros(len(self.nodes), dtype=np.int64)
+        for h in range(self.path_nodes.shape[1] - 1):
+            mask = consulted >= h
+            if not mask.any():
+                break
+            nodes = self.path_nodes[paths[mask], h]
+            node_requests += np.bincount(nodes, minlength=len(self.nodes))
+            node_hits += np.bincount(nodes[depth[mask] == h], minlength=len(self.nodes))
+        return node_requests, node_hits
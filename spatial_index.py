@@ -0,0 +1,97 @@
+import heapq
+import math
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+
+
+def to_unit_vectors(lat, lon):
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def chord_to_km(chord):
+    """Great-circle distance for a straight-line distance between two unit vectors."""
+    return EARTH_RADIUS_KM * 2 * math.asin(min(chord / 2, 1.0))
+
+
+class SphereKDTree:
+    """KD-tree over cities placed on the unit sphere.
+
+    Straight-line (chord) distance between unit vectors grows monotonically
+    with great-circle distance, so a plain 3D Euclidean KD-tree answers
+    great-circle nearest-neighbour queries exactly in O(log n).
+    """
+
+    LEAF_SIZE = 16
+
+    def __init__(self, names, lat, lon):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        points = to_unit_vectors(lat, lon).reshape(-1, 3)
+        self._order = np.arange(len(self.names))
+        self._points = points
+        # node: (split_dim, split_value, left, right, start, end); leaves have left == -1
+        self._nodes = []
+        if len(self.names):
+            self._build(0, len(self.names))
+
+    def __len__(self):
+        return len(self.names)
+
+    def _build(self, start, end):
+        node_id = len(self._nodes)
+        self._nodes.append(None)
+        if end - start <= self.LEAF_SIZE:
+            self._nodes[node_id] = (-1, 0.0, -1, -1, start, end)
+            return node_id
+
+        idx = self._order[start:end]
+        pts = self._points[idx]
+        dim = int(np.argmax(pts.max(axis=0) - pts.min(axis=0)))
+        mid = (end - start) // 2
+        part = np.argpartition(pts[:, dim], mid)
+        self._order[start:end] = idx[part]
+        split = float(self._points[self._order[start + mid], dim])
+
+        left = self._build(start, start + mid)
+        right = self._build(start + mid, end)
+        self._nodes[node_id] = (dim, split, left, right, start, end)
+        return node_id
+
+    def nearest(self, lat, lon, k=1, exclude=()):
+        """The ``k`` nearest cities as ``(name, km)`` pairs, closest first."""
+        if not self._nodes or k <= 0:
+            return []
+        query = to_unit_vectors(lat, lon)
+        excluded = {self.index[name] for name in exclude if name in self.index}
+        best = []  # heap whose top is the worst kept match: (-chord2, -index)
+
+        stack = [(0, 0.0)]
+        while stack:
+            node_id, plane2 = stack.pop()
+            if len(best) == k and plane2 > -best[0][0]:
+                continue
+            dim, split, left, right, start, end = self._nodes[node_id]
+            if left == -1:
+                idx = self._order[start:end]
+                chord2 = ((self._points[idx] - query) ** 2).sum(axis=1)
+                for i, d2 in zip(idx.tolist(), chord2.tolist()):
+                    if i in excluded:
+                        continue
+                    entry = (-d2, -i)
+                    if len(best) < k:
+                        heapq.heappush(best, entry)
+                    elif entry > best[0]:
+                        heapq.heapreplace(best, entry)
+                continue
+
+            diff = float(query[dim]) - split
+            near, far = (left, right) if diff < 0 else (right, left)
+            stack.append((far, max(plane2, diff * diff)))
+            stack.append((near, plane2))
+
+        ranked = sorted((-d2, -i) for d2, i in best)
+        return [(self.names[i], chord_to_km(math.sqrt(d2))) for d2, i in ranked]
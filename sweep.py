@@ -0,0 +1,197 @@
+"""Headless parameter sweep over the CDN model, one process per core.
+
+    python sweep.py --cache-size-mb 10:200:10 --cache-ttl 10,30,60 \\
+        --cities-enabled "regional|regional,sub-regional" --hours 6 --out sweep.csv
+
+Numeric options take a comma list and/or ``start:stop:step`` ranges (stop
+included). ``--origin-city`` and ``--eviction-policy`` take comma lists.
+``--cities-enabled`` takes ``|``-separated subsets, each a comma list of
+cities and/or tier names (regional, sub-regional, local, village, all).
+Every point runs ``--hours`` of virtual time with the same seed, so points
+differ only by their parameters. The discrete-event engine (``--engine
+event``, the default) is fastest; ``--engine tick`` also models VOD titles,
+channel zapping and flash crowds from the content model. ``--trace`` replays
+a recorded trace at every point instead of synthetic viewers; convert text
+logs first (``python trace_replay.py access.log --convert access.cdntrace``)
+so each worker maps the same file rather than parsing it again.
+"""
+import argparse
+import csv
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from capacity_model import ORIGIN_EGRESS_GBPS
+from event_engine import EventEngine, SEGMENT_DURATION
+from latency_sketch import DDSketchBank, DEFAULT_QUANTILES, quantile_label
+from locations import INDIAN_LOCATIONS
+from routing import RoutingTable, TIER_TYPES
+from simulation_engine import SimulationEngine, SEGMENT_SIZE_BYTES
+from trace_replay import TraceEngine, replay
+
+SWEEP_PARAMS = ('num_viewers', 'cache_size_mb', 'cache_ttl', 'origin_latency',
+                'origin_city', 'cities_enabled', 'eviction_policy',
+                'num_streams', 'zipf_alpha', 'vod_titles', 'vod_fraction', 'channel_switch_prob',
+                'segment_size_kb', 'origin_egress_gbps')
+DEFAULTS = {
+    'num_viewers': [100],
+    'cache_size_mb': [100],
+    'cache_ttl': [30],
+    'origin_latency': [850],
+    'origin_city': ['Chennai'],
+    'cities_enabled': [['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Hyderabad', 'Kolkata']],
+    'eviction_policy': ['lru'],
+    'num_streams': [1],
+    'zipf_alpha': [0.8],
+    'vod_titles': [0],
+    'vod_fraction': [0.3],
+    'channel_switch_prob': [0.0],
+    'segment_size_kb': [SEGMENT_SIZE_BYTES // 1024],
+    'origin_egress_gbps': [ORIGIN_EGRESS_GBPS],
+}
+
+
+def parse_numbers(spec, cast=int):
+    values = []
+    for part in spec.split(','):
+        if ':' in part:
+            start, stop, step = (list(map(cast, part.split(':'))) + [1])[:3]
+            values.extend(cast(v) for v in np.arange(start, stop + step / 2, step))
+        elif part:
+            values.append(cast(part))
+    return values
+
+
+def parse_city_sets(spec):
+    """``"regional|Mumbai,Delhi,village"`` -> one list of enabled cities per subset."""
+    subsets = []
+    for subset in spec.split('|'):
+        cities = []
+        for name in (n.strip() for n in subset.split(',')):
+            if name == 'all':
+                matches = list(INDIAN_LOCATIONS)
+            elif name in TIER_TYPES or name == 'village':
+                matches = [c for c, info in INDIAN_LOCATIONS.items() if info['type'] == name]
+            elif name in INDIAN_LOCATIONS:
+                matches = [name]
+            else:
+                raise ValueError(f"Unknown city or tier: {name}")
+            cities.extend(c for c in matches if c not in cities)
+        subsets.append(cities)
+    return subsets
+
+
+def sweep_points(grid):
+    names = list(grid)
+    for values in itertools.product(*(grid[name] for name in names)):
+        yield dict(zip(names, values))
+
+
+def run_tick_engine(engine, hours):
+    """Step the tick engine over ``hours`` of virtual time, one segment per tick."""
+    for n in range(int(hours * 3600 / SEGMENT_DURATION)):
+        yield engine.tick(n * SEGMENT_DURATION)
+
+
+def run_event_engine(engine, hours):
+    end = hours * 3600
+    while engine.now < end:
+        yield engine.advance(min(3600.0, end - engine.now))
+
+
+def run_point(point, hours, seed, engine_name='event', trace=None):
+    """Simulate one configuration and summarize it as a results row."""
+    cfg = dict(point)
+    if cfg['origin_city'] not in cfg['cities_enabled']:
+        cfg['cities_enabled'] = cfg['cities_enabled'] + [cfg['origin_city']]
+    table = RoutingTable(INDIAN_LOCATIONS, cfg['cities_enabled'], cfg['origin_city'])
+
+    started = time.perf_counter()
+    if trace is not None:
+        engine = TraceEngine(dict(cfg, trace_path=trace, trace_speedup=1), INDIAN_LOCATIONS, table.path, seed=seed)
+        results = replay(engine, step=3600.0)
+    elif engine_name == 'tick':
+        engine = SimulationEngine(cfg, INDIAN_LOCATIONS, table.path, seed=seed)
+        results = run_tick_engine(engine, hours)
+    else:
+        engine = EventEngine(cfg, INDIAN_LOCATIONS, table.path, seed=seed, start_time=0.0)
+        results = run_event_engine(engine, hours)
+    sketch = DDSketchBank(['all'])
+    totals = {'requests': 0, 'hits': 0, 'bytes': 0, 'hit_bytes': 0}
+    dropped = 0
+    peak_origin = 0.0
+    for result in results:
+        dropped += result['dropped']
+        peak_origin = max(peak_origin, result['load'].get('origin_utilization', 0.0))
+        latency = result['log']['latency']
+        sketch.add(np.zeros(len(latency), dtype=np.int64), latency)
+        for field in totals:
+            totals[field] += result['policies'][engine.policy][field]
+
+    if trace is not None:
+        origin_bytes = totals['bytes'] - totals['hit_bytes']  # trace requests are never coalesced
+    else:
+        origin_bytes = engine.origin_fetches[engine.policy] * engine.segment_size
+
+    row = {name: point[name] for name in SWEEP_PARAMS}
+    row['cities_enabled'] = ','.join(point['cities_enabled'])
+    row.update({
+        'requests': totals['requests'],
+        'hit_ratio': round(totals['hits'] / totals['requests'], 4) if totals['requests'] else 0.0,
+        'byte_hit_ratio': round(totals['hit_bytes'] / totals['bytes'], 4) if totals['bytes'] else 0.0,
+        **{f'{quantile_label(q)}_ms': round(v, 1) for q, v in sketch.quantiles(DEFAULT_QUANTILES).items()},
+        'drop_rate': round(dropped / totals['requests'], 4) if totals['requests'] else 0.0,
+        'origin_egress_gb': round(origin_bytes / 1024 ** 3, 3),
+        'peak_origin_utilization': round(peak_origin, 3),
+        'runtime_s': round(time.perf_counter() - started, 2),
+    })
+    return row
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel parameter sweep over the CDN simulation.")
+    parser.add_argument('--num-viewers', type=parse_numbers)
+    parser.add_argument('--cache-size-mb', type=parse_numbers)
+    parser.add_argument('--cache-ttl', type=parse_numbers)
+    parser.add_argument('--origin-latency', type=parse_numbers)
+    parser.add_argument('--origin-city', type=lambda s: s.split(','))
+    parser.add_argument('--cities-enabled', type=parse_city_sets)
+    parser.add_argument('--eviction-policy', type=lambda s: s.split(','))
+    parser.add_argument('--num-streams', type=parse_numbers)
+    parser.add_argument('--zipf-alpha', type=lambda s: parse_numbers(s, float))
+    parser.add_argument('--vod-titles', type=parse_numbers)
+    parser.add_argument('--vod-fraction', type=lambda s: parse_numbers(s, float))
+    parser.add_argument('--channel-switch-prob', type=lambda s: parse_numbers(s, float))
+    parser.add_argument('--segment-size-kb', type=parse_numbers)
+    parser.add_argument('--origin-egress-gbps', type=lambda s: parse_numbers(s, float))
+    parser.add_argument('--engine', choices=('event', 'tick'), default='event')
+    parser.add_argument('--trace', help="replay this trace (binary or text log) instead of synthetic viewers")
+    parser.add_argument('--hours', type=float, default=1.0, help="virtual time simulated per point (whole trace with --trace)")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--out', default='sweep_results.csv')
+    args = parser.parse_args(argv)
+
+    grid = {name: getattr(args, name) or DEFAULTS[name] for name in SWEEP_PARAMS}
+    points = list(sweep_points(grid))
+    print(f"Sweeping {len(points)} configurations on {args.workers} processes...", file=sys.stderr)
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        rows = list(pool.map(run_point, points, itertools.repeat(args.hours),
+                             itertools.repeat(args.seed), itertools.repeat(args.engine),
+                             itertools.repeat(args.trace), chunksize=1))
+
+    with open(args.out, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Wrote {len(rows)} rows to {args.out} in {time.perf_counter() - started:.1f} s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+import pytest
+
+from event_engine import EventEngine
+from locations import INDIAN_LOCATIONS
+from routing import RoutingTable
+from simulation_engine import SimulationEngine
+
+CITIES = ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Hyderabad', 'Kolkata']
+# Links so thin that most requests, cache hits included, are dropped
+SATURATED = {
+    'num_viewers': 500,
+    'origin_city': 'Chennai',
+    'cities_enabled': CITIES,
+    'compare_policies': ['lfu', 'arc'],
+    'link_bandwidth_mbps': {'regional': 5, 'sub-regional': 5, 'local': 5, 'village': 5},
+}
+
+
+def run(engine_class):
+    table = RoutingTable(INDIAN_LOCATIONS, CITIES, 'Chennai')
+    if engine_class is EventEngine:
+        engine = EventEngine(SATURATED, INDIAN_LOCATIONS, table.path, seed=1, start_time=0.0)
+        return engine, [engine.advance(60.0) for _ in range(5)]
+    engine = SimulationEngine(SATURATED, INDIAN_LOCATIONS, table.path, seed=1)
+    return engine, [engine.tick(n * engine.segment_duration) for n in range(20)]
+
+
+@pytest.mark.parametrize('engine_class', [SimulationEngine, EventEngine])
+def test_dropped_requests_are_not_hits(engine_class):
+    engine, results = run(engine_class)
+    assert sum(result['dropped'] for result in results) > 0
+    for result in results:
+        active = result['policies'][engine.policy]
+        assert result['hits'] + result['dropped'] <= result['requests']
+        assert active['hits'] == result['hits']
+        assert active['hit_bytes'] == result['bytes_saved']
+        assert result['log']['hit'].sum() == result['hits']
+        for delta in result['policies'].values():
+            assert delta['hit_bytes'] == delta['hits'] * engine.segment_size
+
+
+def test_dropped_requests_are_not_shadow_hits():
+    engine, results = run(SimulationEngine)
+    for result in results:
+        for delta in result['policies'].values():
+            assert delta['hits'] + result['dropped'] <= delta['requests']
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from content_model import ContentModel, zipf_cdf
+
+
+def model(num_viewers=100_000, seed=1, **cfg):
+    return ContentModel(cfg, num_viewers, np.random.default_rng(seed))
+
+
+def test_live_channels_follow_zipf():
+    m = model(num_streams=20, zipf_alpha=0.8)
+    share = np.bincount(m.viewer_content, minlength=20) / len(m.viewer_content)
+    expected = np.diff(np.concatenate([[0.0], zipf_cdf(20, 0.8)]))
+    assert share == pytest.approx(expected, abs=0.005)
+    slope = np.polyfit(np.log(np.arange(1, 21)), np.log(share), 1)[0]
+    assert slope == pytest.approx(-0.8, abs=0.05)
+
+
+def test_vod_fraction_sets_the_vod_share():
+    m = model(num_streams=5, vod_titles=200, vod_fraction=0.3)
+    assert m.is_vod.mean() == pytest.approx(0.3, abs=0.01)
+    assert (m.viewer_content[m.is_vod] >= 5).all()
+    assert (m.viewer_content[~m.is_vod] < 5).all()
+    assert (m.vod_position[m.is_vod] < m.vod_length).all()
+    assert not model(vod_titles=0, vod_fraction=0.3).is_vod.any()
+
+
+def test_vod_viewers_advance_and_move_on_after_the_title():
+    m = model(num_viewers=1_000, num_streams=2, vod_titles=10, vod_fraction=1.0, vod_segments_per_title=5)
+    start = m.vod_position.copy()
+    _, seq = m.requests(1)
+    assert np.array_equal(seq, (start + 1) % 5)
+
+
+def test_channel_switching_moves_about_zap_prob_of_live_viewers():
+    m = model(num_streams=50, zipf_alpha=0.5, channel_switch_prob=0.1)
+    before = m.viewer_content.copy()
+    m.requests(1)
+    changed = (m.viewer_content != before).mean()
+    p = np.diff(np.concatenate([[0.0], m.live_cdf]))
+    assert changed == pytest.approx(0.1 * (1 - (p ** 2).sum()), abs=0.01)
+    assert model(num_streams=50).static and not m.static
+
+
+def test_popularity_shift_comes_from_content_seed():
+    a = model(num_viewers=10, seed=1, num_streams=40, popularity_shift_s=10, popularity_shift_fraction=0.5)
+    b = model(num_viewers=10, seed=2, num_streams=40, popularity_shift_s=10, popularity_shift_fraction=0.5)
+    a.requests(4)  # 8 s: no shift yet
+    assert np.array_equal(a.live_rank, np.arange(40))
+    a.requests(5)
+    b.requests(5)
+    assert not np.array_equal(a.live_rank, np.arange(40))
+    assert np.array_equal(a.live_rank, b.live_rank)
+    assert sorted(a.live_rank) == list(range(40))
+
+
+def test_flash_crowd_holds_its_share_during_its_window():
+    crowd = {'start_s': 20, 'duration_s': 10, 'stream': 3, 'share': 0.4}
+    m = model(num_streams=10, flash_crowds=[crowd])
+    baseline = (m.viewer_content == 3).mean()
+    watching = []
+    for sequence in range(1, 20):  # elapsed = 2 s per segment
+        content, seq = m.requests(sequence)
+        elapsed = sequence * m.segment_duration
+        on_stream = content == 3
+        if crowd['start_s'] <= elapsed < crowd['start_s'] + crowd['duration_s']:
+            members = m._flash_members[0]
+            assert (content[members] == 3).all() and (seq[members] == sequence).all()
+            assert len(members) / len(content) == pytest.approx(0.4, abs=0.01)
+            watching.append(on_stream.mean())
+        else:
+            assert on_stream.mean() == pytest.approx(baseline, abs=1e-12)
+    assert len(watching) == 5
+    expected = 0.4 + 0.6 * baseline
+    assert watching == pytest.approx([expected] * 5, abs=0.01)
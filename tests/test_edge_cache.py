@@ -0,0 +1,87 @@
+import random
+
+import pytest
+
+from edge_cache import EVICTION_POLICIES, SegmentCache
+
+POLICIES = sorted(EVICTION_POLICIES)
+
+
+@pytest.mark.parametrize('policy', POLICIES)
+def test_byte_budget_and_counters_hold(policy):
+    rng = random.Random(7)
+    cache = SegmentCache(50_000, ttl=30, policy=policy)
+    sizes = {}
+    lookups = 0
+    for step in range(20_000):
+        now = step * 0.01
+        key = (0, int(rng.paretovariate(1.2)) % 400)
+        size = sizes.setdefault(key, rng.randint(500, 4_000))
+        lookups += 1
+        if not cache.get(key, size, now):
+            cache.put(key, size, now)
+        if step % 500 == 0:
+            cache.expire(now)
+
+        assert cache.used_bytes <= cache.capacity_bytes
+    stats = cache.stats()
+    assert stats['hits'] + stats['misses'] == lookups
+    assert stats['used_bytes'] == sum(sizes[key] for key in cache._sizes)
+    assert stats['objects'] == len(cache) == len(cache._expiry)
+    assert stats['hits'] > 0 and stats['evictions'] > 0
+
+
+@pytest.mark.parametrize('policy', POLICIES)
+def test_expired_segments_miss(policy):
+    cache = SegmentCache(10_000, ttl=5, policy=policy)
+    cache.put(('s', 1), 1_000, now=0)
+    assert cache.get(('s', 1), 1_000, now=4)
+    assert not cache.get(('s', 1), 1_000, now=5)
+    assert ('s', 1) not in cache
+    assert cache.used_bytes == 0
+
+
+@pytest.mark.parametrize('policy', POLICIES)
+def test_clear_empties_the_policy(policy):
+    cache = SegmentCache(10_000, ttl=30, policy=policy)
+    for i in range(20):
+        cache.put(i, 1_000, now=i)
+    cache.clear()
+    assert len(cache) == 0 and cache.used_bytes == 0
+    # A policy that kept stale keys would hand one back here and break the accounting.
+    for i in range(100, 130):
+        cache.put(i, 1_000, now=i)
+    assert cache.used_bytes <= cache.capacity_bytes
+
+
+def test_oversized_segments_are_rejected():
+    cache = SegmentCache(1_000, ttl=30)
+    assert not cache.put('big', 2_000, now=0)
+    assert cache.rejections == 1 and len(cache) == 0
+
+
+def test_lru_evicts_least_recently_used():
+    cache = SegmentCache(3_000, ttl=30, policy='lru')
+    for key in 'abc':
+        cache.put(key, 1_000, now=0)
+    cache.get('a', 1_000, now=1)
+    cache.put('d', 1_000, now=2)
+    assert 'b' not in cache
+    assert all(key in cache for key in 'acd')
+
+
+def test_lfu_evicts_least_frequently_used():
+    cache = SegmentCache(3_000, ttl=30, policy='lfu')
+    for key in 'abc':
+        cache.put(key, 1_000, now=0)
+    for _ in range(3):
+        cache.get('a', 1_000, now=1)
+        cache.get('c', 1_000, now=1)
+    cache.put('d', 1_000, now=2)
+    assert 'b' not in cache
+    assert all(key in cache for key in 'acd')
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        SegmentCache(1_000, ttl=30, policy='fifo')
@@ -0,0 +1,12 @@
+from edge_shaping import EdgeShaper
+from locations import INDIAN_LOCATIONS
+
+CITIES = ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Hyderabad', 'Kolkata']
+
+
+def test_miss_pays_origin_latency():
+    near = EdgeShaper(INDIAN_LOCATIONS, CITIES, 'Chennai', origin_latency=100)
+    far = EdgeShaper(INDIAN_LOCATIONS, CITIES, 'Chennai', origin_latency=3000)
+    path = near.route('Delhi')
+    assert path[-1] == 'Chennai'
+    assert far.latency(path, False) - near.latency(path, False) > 2.5
@@ -0,0 +1,19 @@
+import pytest
+
+from sweep import DEFAULTS, run_point
+
+
+def point(**overrides):
+    values = {name: values[0] for name, values in DEFAULTS.items()}
+    values.update(overrides)
+    return values
+
+
+@pytest.mark.parametrize('overrides', [{}, {'num_viewers': 400, 'num_streams': 3, 'cache_size_mb': 20}])
+def test_event_and_tick_engines_agree(overrides):
+    event = run_point(point(**overrides), hours=0.2, seed=3, engine_name='event')
+    tick = run_point(point(**overrides), hours=0.2, seed=3, engine_name='tick')
+    assert event['requests'] == tick['requests']
+    assert event['hit_ratio'] == pytest.approx(tick['hit_ratio'], abs=0.02)
+    assert event['p50_ms'] == pytest.approx(tick['p50_ms'], rel=0.25)
+    assert event['p99_ms'] == pytest.approx(tick['p99_ms'], rel=0.25)
@@ -0,0 +1,25 @@
+from edge_cache import SegmentCache
+from event_engine import EventEngine
+from locations import INDIAN_LOCATIONS
+from routing import RoutingTable
+
+CITIES = ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Hyderabad', 'Kolkata']
+
+
+def test_followers_are_recorded_once_the_edge_holds_the_segment(monkeypatch):
+    follower_misses = []
+    get = SegmentCache.get
+
+    def recording_get(cache, key, size, now, count=1):
+        hit = get(cache, key, size, now, count)
+        if count > 1 and not hit:
+            follower_misses.append((key, now))
+        return hit
+
+    monkeypatch.setattr(SegmentCache, 'get', recording_get)
+    cfg = {'num_viewers': 2000, 'origin_city': 'Chennai', 'cities_enabled': CITIES, 'capacity_model': False}
+    table = RoutingTable(INDIAN_LOCATIONS, CITIES, 'Chennai')
+    engine = EventEngine(cfg, INDIAN_LOCATIONS, table.path, seed=1, start_time=0.0)
+    for _ in range(3):
+        engine.advance(60.0)
+    assert follower_misses == []
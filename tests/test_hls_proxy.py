@@ -0,0 +1,76 @@
+import pytest
+import requests
+
+import nginx_hls_server as server
+
+
+class FakeResponse:
+    """Upstream response that sends ``chunks`` and then fails if ``error`` is set."""
+
+    status_code = 200
+
+    def __init__(self, chunks, error=None):
+        self.chunks = chunks
+        self.error = error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def iter_content(self, chunk_size):
+        yield from self.chunks
+        if self.error is not None:
+            raise self.error
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(server, 'SEGMENT_DELAY', 0)
+    monkeypatch.setattr(server, 'STREAM_PROXY', True)
+    monkeypatch.setattr(server, 'segment_store', server.SegmentStore(1024 * 1024))
+    return server.app.test_client()
+
+
+def test_streamed_segment_is_complete(client, monkeypatch):
+    monkeypatch.setattr(server.upstream, 'get', lambda *a, **kw: FakeResponse([b'a' * 10, b'b' * 10]))
+    response = client.get('/stream/live/ok.ts')
+    assert response.status_code == 200
+    assert response.data == b'a' * 10 + b'b' * 10
+    assert server.segment_store.get('live/ok.ts') is not None
+
+
+def test_upstream_failure_mid_body_aborts_the_response(client, monkeypatch):
+    failing = FakeResponse([b'a' * 10], error=requests.ConnectionError("reset by peer"))
+    monkeypatch.setattr(server.upstream, 'get', lambda *a, **kw: failing)
+    response = client.get('/stream/live/cut.ts', buffered=False)
+    assert response.status_code == 200
+    with pytest.raises(ConnectionError):
+        b''.join(response.response)
+    assert server.segment_store.get('live/cut.ts') is None
+
+
+def test_shaper_config_is_checked_once_per_interval(monkeypatch):
+    checks = []
+    monkeypatch.setattr(server, 'shaping_config_mtime', lambda: checks.append(1.0) or 1.0)
+    monkeypatch.setattr(server, 'shaper', None)
+    monkeypatch.setattr(server, 'SHAPER_RELOAD_INTERVAL', 60)
+    first = server.get_shaper()
+    assert all(server.get_shaper() is first for _ in range(100))
+    assert len(checks) == 1
+    # Once the interval has passed a changed file is picked up.
+    monkeypatch.setattr(server, 'shaper_checked', server.shaper_checked - 60)
+    monkeypatch.setattr(server, 'shaping_config_mtime', lambda: checks.append(2.0) or 2.0)
+    assert server.get_shaper() is not first
+    assert len(checks) == 2
+
+
+def test_routed_request_resolves_the_shaper_once(client, monkeypatch):
+    monkeypatch.setattr(server.upstream, 'get', lambda *a, **kw: FakeResponse([b'a' * 10]))
+    resolved = []
+    get_shaper = server.get_shaper
+    monkeypatch.setattr(server, 'get_shaper', lambda: resolved.append(1) or get_shaper())
+    response = client.get('/stream/live/routed.ts?city=Delhi')
+    assert response.status_code == 200 and response.data == b'a' * 10
+    assert len(resolved) == 1
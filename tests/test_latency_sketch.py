@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from latency_sketch import DEFAULT_QUANTILES, DDSketchBank, quantile_label
+
+
+def latencies(n, seed):
+    rng = np.random.default_rng(seed)
+    return rng.lognormal(mean=5, sigma=1.2, size=n)
+
+
+@pytest.mark.parametrize('alpha', [0.01, 0.05])
+def test_quantiles_within_relative_error(alpha):
+    values = latencies(50_000, seed=1)
+    sketch = DDSketchBank(['all'], alpha=alpha)
+    sketch.add(np.zeros(len(values), dtype=np.int64), values)
+    for q, estimate in sketch.quantiles((0.01, 0.5, 0.9, 0.99, 0.999)).items():
+        exact = np.quantile(values, q, method='lower')
+        assert abs(estimate - exact) <= alpha * exact * (1 + 1e-9)
+
+
+def test_labels_are_kept_apart():
+    fast, slow = latencies(1_000, seed=2), latencies(1_000, seed=3) * 10
+    sketch = DDSketchBank(['fast', 'slow'])
+    sketch.add(np.repeat([0, 1], 1_000), np.concatenate([fast, slow]))
+    assert sketch.count('fast') == sketch.count('slow') == 1_000
+    assert sketch.count() == 2_000
+    p50 = sketch.quantiles((0.5,), label='slow')[0.5]
+    assert p50 == pytest.approx(np.quantile(slow, 0.5, method='lower'), rel=0.01)
+
+
+def test_merge_and_sparse_counts_match_one_sketch():
+    values = latencies(4_000, seed=4)
+    labels = np.arange(4_000) % 3
+    whole = DDSketchBank('abc')
+    whole.add(labels, values)
+
+    merged = DDSketchBank('abc')
+    shipped = DDSketchBank('abc')
+    for part in np.array_split(np.arange(4_000), 4):
+        piece = DDSketchBank('abc')
+        piece.add(labels[part], values[part])
+        merged.merge(piece)
+        shipped.add_counts(*piece.sparse_counts())
+    assert np.array_equal(merged.counts, whole.counts)
+    assert np.array_equal(shipped.counts, whole.counts)
+
+
+def test_empty_and_summary():
+    sketch = DDSketchBank(['a', 'b'])
+    assert sketch.quantiles() == {q: 0.0 for q in DEFAULT_QUANTILES}
+    sketch.add([0, 0], [100, 200])
+    summary = sketch.summary()
+    assert list(summary) == ['a']
+    assert summary['a']['count'] == 2
+    assert set(summary['a']) == {'count'} | {quantile_label(q) for q in DEFAULT_QUANTILES}
@@ -0,0 +1,73 @@
+import numpy as np
+
+from locations import INDIAN_LOCATIONS
+from parallel_engine import ShardedEngine, partition_cities
+from routing import RoutingTable
+from simulation_engine import SimulationEngine
+
+CITIES = list(INDIAN_LOCATIONS)
+# One stream and no playback lag: viewer groups, and so every cache outcome, depend only on viewer cities.
+CFG = {
+    'num_viewers': 3000,
+    'origin_city': 'Chennai',
+    'cities_enabled': CITIES,
+    'num_streams': 1,
+    'max_playback_lag': 0,
+    'cache_size_mb': 1,
+    'cache_ttl': 6,
+    'capacity_model': False,
+}
+
+
+def cache_nodes(cities, paths):
+    return {city: set(path[:-1]) for city, path in zip(cities, paths)}
+
+
+def test_cities_sharing_a_cache_land_in_one_shard():
+    # Caches are the enabled cities themselves, so the regional hubs are cities too.
+    paths = {
+        'R1': ['R1', 'O'],
+        'R2': ['R2', 'O'],
+        'A': ['A', 'R1', 'O'],
+        'B': ['B', 'R1', 'O'],
+        'C': ['C', 'R2', 'O'],
+        'D': ['D', 'C', 'R2', 'O'],
+        'E': ['E', 'O'],
+    }
+    cities = list(paths)
+    shards = partition_cities(cities, [paths[c] for c in cities], 4)
+    shard_of = {city: k for k, shard in enumerate(shards) for city in shard}
+    assert sorted(shard_of) == sorted(cities)
+    assert shard_of['A'] == shard_of['B'] == shard_of['R1']
+    assert shard_of['C'] == shard_of['D'] == shard_of['R2']
+    assert len({shard_of['A'], shard_of['C'], shard_of['E']}) == 3
+
+
+def test_real_routing_shards_share_no_cache():
+    table = RoutingTable(INDIAN_LOCATIONS, CITIES, 'Chennai')
+    paths = [table.path(city) for city in CITIES]
+    nodes = cache_nodes(CITIES, paths)
+    shards = partition_cities(CITIES, paths, 4)
+    assert sorted(c for shard in shards for c in shard) == sorted(CITIES)
+    owned = [set().union(*(nodes[c] for c in shard)) for shard in shards]
+    for i in range(len(owned)):
+        for j in range(i + 1, len(owned)):
+            assert not owned[i] & owned[j]
+
+
+def test_sharded_run_matches_a_single_process():
+    table = RoutingTable(INDIAN_LOCATIONS, CITIES, 'Chennai')
+    sharded = ShardedEngine(CFG, INDIAN_LOCATIONS, table.path, seed=5, workers=3)
+    try:
+        single = SimulationEngine(CFG, INDIAN_LOCATIONS, table.path, seed=5, viewer_city=sharded.viewer_city)
+        for n in range(15):
+            a, b = sharded.tick(n * 2.0), single.tick(n * 2.0)
+            for field in ('requests', 'hits', 'bytes_saved'):
+                assert a[field] == b[field]
+            assert a['policies'] == b['policies']
+            merged = dict(zip(sharded.nodes, zip(a['node_requests'].tolist(), a['node_hits'].tolist())))
+            alone = dict(zip(single.nodes, zip(b['node_requests'].tolist(), b['node_hits'].tolist())))
+            assert merged == alone
+        assert 0 < b['hits'] < b['requests']
+    finally:
+        sharded.close()
@@ -0,0 +1,39 @@
+import numpy as np
+
+from request_log import RequestLog
+
+
+def rows(start, n):
+    ids = np.arange(start, start + n)
+    return {'timestamp': ids * 0.5, 'viewer': ids, 'city': ids % 7, 'hit': ids % 3 == 0, 'latency': ids * 1.5}
+
+
+def test_matches_a_list_of_the_newest_rows():
+    capacity = 50
+    log = RequestLog(capacity)
+    expected = []
+    rng = np.random.default_rng(3)
+    start = 0
+    for _ in range(200):
+        n = int(rng.integers(0, 2 * capacity))  # batches larger than the ring included
+        batch = rows(start, n)
+        log.append(batch['timestamp'], batch['viewer'], batch['city'], batch['hit'], batch['latency'])
+        expected.extend(zip(*(batch[name] for name in ('timestamp', 'viewer', 'city', 'hit', 'latency'))))
+        expected = expected[-capacity:]
+        start += n
+
+        assert len(log) == len(expected)
+        assert log.total_rows == start
+        for k in (None, 1, 7, capacity, capacity + 5):
+            tail = log.tail(k)
+            want = expected if k is None else expected[-k:]
+            got = list(zip(*(tail[name].tolist() for name in ('timestamp', 'viewer', 'city', 'hit', 'latency'))))
+            assert got == [tuple(v.item() for v in row) for row in want]
+
+
+def test_scalar_timestamp_and_clear():
+    log = RequestLog(4)
+    log.append(12.5, [1, 2], [0, 1], [True, False], [10, 20])
+    assert log.tail()['timestamp'].tolist() == [12.5, 12.5]
+    log.clear()
+    assert len(log) == 0 and log.tail()['viewer'].tolist() == []
@@ -0,0 +1,59 @@
+import math
+import random
+
+import pytest
+
+from locations import INDIAN_LOCATIONS
+from spatial_index import EARTH_RADIUS_KM, SphereKDTree
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * math.asin(math.sqrt(a))
+
+
+def brute_force(names, lat, lon, qlat, qlon, k, exclude=()):
+    ranked = sorted((haversine_km(qlat, qlon, lat[i], lon[i]), name)
+                    for i, name in enumerate(names) if name not in exclude)
+    return ranked[:k]
+
+
+def random_points(n, seed):
+    rng = random.Random(seed)
+    names = [f'c{i}' for i in range(n)]
+    return names, [rng.uniform(-80, 80) for _ in names], [rng.uniform(-180, 180) for _ in names]
+
+
+@pytest.mark.parametrize('n', [1, 10, 17, 500])
+def test_matches_brute_force(n):
+    names, lat, lon = random_points(n, seed=n)
+    tree = SphereKDTree(names, lat, lon)
+    rng = random.Random(1)
+    for _ in range(50):
+        qlat, qlon = rng.uniform(-90, 90), rng.uniform(-180, 180)
+        k = rng.randint(1, 5)
+        found = tree.nearest(qlat, qlon, k=k)
+        expected = brute_force(names, lat, lon, qlat, qlon, k)
+        assert [name for name, _ in found] == [name for _, name in expected]
+        for (_, km), (want, _) in zip(found, expected):
+            assert km == pytest.approx(want, abs=1e-6)
+
+
+def test_exclude_skips_cities():
+    names = list(INDIAN_LOCATIONS)
+    lat = [INDIAN_LOCATIONS[c]['lat'] for c in names]
+    lon = [INDIAN_LOCATIONS[c]['lon'] for c in names]
+    tree = SphereKDTree(names, lat, lon)
+    mumbai = INDIAN_LOCATIONS['Mumbai']
+    assert tree.nearest(mumbai['lat'], mumbai['lon'])[0] == ('Mumbai', 0.0)
+    found = tree.nearest(mumbai['lat'], mumbai['lon'], k=3, exclude=('Mumbai',))
+    expected = brute_force(names, lat, lon, mumbai['lat'], mumbai['lon'], 3, exclude=('Mumbai',))
+    assert [name for name, _ in found] == [name for _, name in expected]
+
+
+def test_empty_tree_and_large_k():
+    assert SphereKDTree([], [], []).nearest(0, 0) == []
+    names, lat, lon = random_points(5, seed=3)
+    assert len(SphereKDTree(names, lat, lon).nearest(0, 0, k=10)) == 5
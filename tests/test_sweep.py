@@ -0,0 +1,19 @@
+from sweep import DEFAULTS, run_point
+
+
+def point(**overrides):
+    values = {name: values[0] for name, values in DEFAULTS.items()}
+    values.update(overrides)
+    return values
+
+
+def test_origin_latency_changes_results():
+    rows = [run_point(point(origin_latency=latency), hours=0.1, seed=1) for latency in (100, 850, 3000)]
+    p99 = [row['p99_ms'] for row in rows]
+    assert p99[0] < p99[1] < p99[2]
+
+
+def test_origin_latency_changes_tick_engine_results():
+    low, high = (run_point(point(origin_latency=latency), hours=0.05, seed=1, engine_name='tick')
+                 for latency in (100, 3000))
+    assert low['p99_ms'] < high['p99_ms']
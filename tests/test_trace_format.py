@@ -0,0 +1,81 @@
+import json
+
+import numpy as np
+
+from locations import INDIAN_LOCATIONS
+from trace_format import BinaryTrace, TraceWriter, is_binary_trace
+from trace_replay import convert_log, log_batches, trace_batches
+
+CITIES = list(INDIAN_LOCATIONS)
+
+
+def write_jsonl(path, n, seed=5):
+    rng = np.random.default_rng(seed)
+    t = 1_700_000_000.0
+    with open(path, 'w') as f:
+        for i in range(n):
+            t += float(rng.exponential(0.05))
+            f.write(json.dumps({
+                'time': round(t, 3),
+                'ip': f'10.0.{int(rng.integers(0, 50))}.{i % 250}',
+                'city': CITIES[int(rng.integers(0, len(CITIES)))],
+                'url': f'/live/seg{int(rng.zipf(1.3)) % 300}.ts',
+                'bytes': int(rng.integers(100_000, 2_000_000)),
+            }) + '\n')
+            if i % 1000 == 0:
+                f.write('not json\n')  # malformed lines are skipped by both paths
+
+
+def concat(batches):
+    batches = list(batches)
+    return {name: np.concatenate([b[name] for b in batches]) for name in batches[0]}
+
+
+def test_binary_trace_replays_like_the_text_log(tmp_path):
+    src, dst = tmp_path / 'access.jsonl', tmp_path / 'access.trace'
+    write_jsonl(src, 5_000)
+    assert convert_log(str(src), str(dst), INDIAN_LOCATIONS) == 5_000
+    assert is_binary_trace(str(dst)) and not is_binary_trace(str(src))
+
+    text = concat(log_batches(str(src), CITIES, INDIAN_LOCATIONS, chunk_lines=700))
+    binary = concat(trace_batches(str(dst), CITIES, INDIAN_LOCATIONS))
+    assert np.abs(binary['time'] - text['time']).max() < 1e-3
+    assert np.array_equal(binary['city'], text['city'])
+    assert np.array_equal(binary['size'], text['size'])
+    # URLs become dense ids: one id per URL and one URL per id
+    pairs = set(zip(text['object'].tolist(), binary['object'].tolist()))
+    assert len(pairs) == len({url for url, _ in pairs}) == len({oid for _, oid in pairs})
+
+
+def test_writer_reader_round_trip(tmp_path):
+    path = str(tmp_path / 'rows.trace')
+    writer = TraceWriter(path, ['A', 'B', 'C'], base_time=100.0)
+    rng = np.random.default_rng(1)
+    written = []
+    for n in (0, 3, 1000, 17):
+        batch = {
+            'time': 100.0 + np.sort(rng.uniform(0, 3600, n)),
+            'city': rng.integers(0, 3, n),
+            'object': rng.integers(0, 5000, n),
+            'size': rng.integers(0, 10_000_000, n),
+        }
+        writer.write(batch['time'], batch['city'], batch['object'], batch['size'])
+        written.append(batch)
+    writer.close()
+
+    trace = BinaryTrace(path)
+    expected = concat(written)
+    assert len(trace) == len(expected['time'])
+    assert trace.cities == ['A', 'B', 'C']
+    assert trace.num_objects == int(expected['object'].max()) + 1
+    got = concat(trace.batches(batch_rows=64))
+    assert np.abs(got['time'] - expected['time']).max() <= 0.0005 + 1e-9
+    for name in ('city', 'object', 'size'):
+        assert np.array_equal(got[name], expected[name])
+
+
+def test_empty_trace(tmp_path):
+    path = str(tmp_path / 'empty.trace')
+    TraceWriter(path, ['A'], base_time=0.0).close()
+    trace = BinaryTrace(path)
+    assert len(trace) == 0 and list(trace.batches()) == []
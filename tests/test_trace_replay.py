@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from locations import INDIAN_LOCATIONS
+from routing import RoutingTable
+from trace_replay import TraceEngine, parse_time
+
+CITIES = ['Mumbai', 'Delhi', 'Chennai']
+CFG = {'cities_enabled': CITIES, 'origin_city': 'Chennai', 'trace_speedup': 1, 'capacity_model': False}
+T0 = 1_700_000_000.0
+# (seconds after T0, client, city, url)
+LOG = [
+    (0.0, '10.0.0.1', 'Mumbai', '/live/seg1.ts'),
+    (0.5, '10.0.0.2', 'Mumbai', '/live/seg1.ts'),
+    (1.5, '10.0.0.3', 'Delhi', '/live/seg1.ts'),
+    (1.9, '10.0.0.3', 'Delhi', '/live/seg2.ts'),
+    (3.0, '10.0.0.1', 'Mumbai', '/live/seg2.ts'),
+    (9.0, '10.0.0.2', 'Mumbai', '/live/seg2.ts'),
+]
+
+
+def engine_for(tmp_path):
+    path = tmp_path / 'access.jsonl'
+    with open(path, 'w') as f:
+        for offset, ip, city, url in LOG:
+            f.write(json.dumps({'time': T0 + offset, 'ip': ip, 'city': city, 'url': url, 'bytes': 1000}) + '\n')
+    table = RoutingTable(INDIAN_LOCATIONS, CITIES, 'Chennai')
+    return TraceEngine(dict(CFG, trace_path=str(path)), INDIAN_LOCATIONS, table.path, seed=1)
+
+
+def test_tick_replays_the_log_in_windows(tmp_path):
+    engine = engine_for(tmp_path)
+
+    first = engine.tick(100.0)
+    assert engine.trace_start == T0 and engine.trace_now == T0
+    assert first['requests'] == 1 and first['hits'] == 0
+    assert first['log']['time'].tolist() == [100.0]
+
+    second = engine.tick(102.0)  # trace window (T0, T0 + 2]
+    assert second['requests'] == 3
+    assert second['log']['hit'].tolist() == [True, False, False]
+    assert second['hits'] == 1
+    assert second['log']['time'] == pytest.approx([100.5, 101.5, 101.9])
+    assert engine.num_viewers == 2
+
+    third = engine.tick(104.0)
+    assert third['requests'] == 1 and third['hits'] == 0  # seg2 is new at the Mumbai edge
+    last = engine.tick(110.0)
+    assert last['requests'] == 1 and last['hits'] == 1
+    assert engine.exhausted and engine.requests_replayed == len(LOG)
+    assert engine.origin_fetches[engine.policy] == 4
+
+def test_parse_time_formats():
+    assert parse_time(12) == 12.0
+    assert parse_time('1700000000.5') == 1700000000.5
+    nginx = parse_time('14/Nov/2023:22:13:20 +0000')
+    assert nginx == parse_time('2023-11-14T22:13:20Z') == T0
+    with pytest.raises(ValueError):
+        parse_time('yesterday')
@@ -0,0 +1,59 @@
+import threading
+
+import pytest
+
+from viewer_registry import ThreadCounters, ViewerRegistry
+
+
+@pytest.mark.parametrize('start', [100.0, 100.5, 100.99])
+def test_viewer_expires_only_after_timeout(start):
+    viewers = ViewerRegistry(timeout=10, num_shards=4, tick=1.0)
+    viewers.touch('a', now=start)
+    for now in (start + 1, start + 5, start + 9.99):
+        assert viewers.expire(now) == 0
+    assert len(viewers) == 1
+    assert viewers.expire(start + 10 + viewers.tick) == 1
+    assert len(viewers) == 0 and viewers.expired == 1
+
+
+def test_touch_reschedules_expiry():
+    viewers = ViewerRegistry(timeout=10, num_shards=4, tick=1.0)
+    viewers.touch('a', now=100.0)
+    viewers.touch('b', now=100.0)
+    viewers.touch('a', now=108.0)
+    assert viewers.expire(111.0) == 1  # only b, whose deadline was not pushed back
+    assert len(viewers) == 1
+    assert viewers.expire(117.9) == 0
+    assert viewers.expire(118.0) == 1
+    assert len(viewers) == 0
+
+
+def test_expire_after_a_long_pause_drops_everyone():
+    viewers = ViewerRegistry(timeout=5, num_shards=2, tick=1.0)
+    for i in range(50):
+        viewers.touch(f'v{i}', now=100.0 + i % 5)
+    assert viewers.expire(1000.0) == 50
+    assert len(viewers) == 0
+
+
+def test_thread_counters_are_exact_across_threads():
+    counters = ThreadCounters(('requests', 'segment_requests'))
+    counters.SWEEP_AFTER = 4  # fold exited threads into the retired total along the way
+    num_threads, per_thread = 16, 5_000
+    barrier = threading.Barrier(num_threads // 2)
+
+    def work():
+        barrier.wait()
+        for _ in range(per_thread):
+            counters.incr('requests')
+        counters.incr('segment_requests', per_thread)
+
+    for _ in range(2):
+        threads = [threading.Thread(target=work) for _ in range(num_threads // 2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert counters.snapshot() == {'requests': num_threads * per_thread,
+                                   'segment_requests': num_threads * per_thread}
+    assert len(counters._threads) <= counters.SWEEP_AFTER
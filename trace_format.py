@@ -0,0 +1,138 @@
+"""Fixed-width columnar binary traces, read through a memory map.
+
+File layout: an 8-byte magic, a little-endian uint32 header length, a JSON
+header, then one contiguous column per field, each starting on an 8-byte
+boundary:
+
+    time    uint32  milliseconds since the header's ``base_time``
+    city    uint16  index into the header's ``cities``
+    object  uint32  object id
+    size    uint32  bytes
+
+Readers map the file instead of loading it, so every process that replays
+the same trace shares one copy in the page cache.
+"""
+import json
+import os
+import shutil
+import struct
+import tempfile
+
+import numpy as np
+
+MAGIC = b'CDNTRC1\0'
+COLUMNS = (
+    ('time', np.dtype('<u4')),
+    ('city', np.dtype('<u2')),
+    ('object', np.dtype('<u4')),
+    ('size', np.dtype('<u4')),
+)
+BATCH_ROWS = 1 << 18  # rows per batch; small enough to stay in cache while converted
+
+
+def is_binary_trace(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+class TraceWriter:
+    """Appends columnar batches to a binary trace.
+
+    Each column is spooled to its own temporary file while rows arrive, and
+    ``close`` writes the header and copies the columns behind it, so memory
+    stays at one batch regardless of the trace length.
+    """
+
+    def __init__(self, path, cities, base_time):
+        self.path = path
+        self.cities = list(cities)
+        self.base_time = float(base_time)
+        self.count = 0
+        self.num_objects = 0
+        self._spool = {name: tempfile.TemporaryFile() for name, _ in COLUMNS}
+
+    def write(self, time, city, obj, size):
+        """Append rows; ``time`` is epoch seconds, the rest are integer arrays."""
+        delta = np.round((np.asarray(time, dtype=np.float64) - self.base_time) * 1000)
+        if len(delta) and (delta.min() < 0 or delta.max() > np.iinfo(np.uint32).max):
+            raise ValueError("Trace spans more than 49 days or goes back before base_time")
+        obj = np.asarray(obj)
+        columns = {'time': delta, 'city': city, 'object': obj, 'size': np.minimum(size, np.iinfo(np.uint32).max)}
+        for name, dtype in COLUMNS:
+            self._spool[name].write(np.asarray(columns[name]).astype(dtype).tobytes())
+        self.count += len(delta)
+        if len(obj):
+            self.num_objects = max(self.num_objects, int(obj.max()) + 1)
+
+    def close(self):
+        header = json.dumps({
+            'count': self.count,
+            'base_time': self.base_time,
+            'cities': self.cities,
+            'num_objects': self.num_objects,
+            'columns': [name for name, _ in COLUMNS],
+        }).encode()
+        with open(self.path, 'wb') as out:
+            out.write(MAGIC + struct.pack('<I', len(header)) + header)
+            for name, _ in COLUMNS:
+                out.write(b'\0' * (_align(out.tell()) - out.tell()))
+                spool = self._spool[name]
+                spool.seek(0)
+                shutil.copyfileobj(spool, out)
+                spool.close()
+
+
+class BinaryTrace:
+    """Zero-copy view of a binary trace; each column is a read-only ``np.memmap``."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a binary trace")
+            (length,) = struct.unpack('<I', f.read(4))
+            header = json.loads(f.read(length))
+        self.count = header['count']
+        self.base_time = header['base_time']
+        self.cities = header['cities']
+        self.num_objects = header['num_objects']
+
+        offset = len(MAGIC) + 4 + length
+        self.columns = {}
+        for name, dtype in COLUMNS:
+            offset = _align(offset)
+            self.columns[name] = (np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=(self.count,))
+                                  if self.count else np.zeros(0, dtype=dtype))
+            offset += self.count * dtype.itemsize
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def nbytes(self):
+        return os.path.getsize(self.path)
+
+    def batches(self, city_map=None, start=0, stop=None, batch_rows=BATCH_ROWS):
+        """Columnar batches shaped like ``trace_replay.trace_batches`` (without clients).
+
+        ``time`` is converted to epoch seconds and ``city`` translated through
+        ``city_map`` (trace city -> simulator city) when given; ``object`` and
+        ``size`` are memory-map views.
+        """
+        stop = self.count if stop is None else min(stop, self.count)
+        for lo in range(start, stop, batch_rows):
+            hi = min(lo + batch_rows, stop)
+            city = self.columns['city'][lo:hi]
+            yield {
+                'time': self.base_time + self.columns['time'][lo:hi] / 1000.0,
+                'city': city_map[city] if city_map is not None else city,
+                'object': self.columns['object'][lo:hi],
+                'size': self.columns['size'][lo:hi],
+            }
@@ -0,0 +1,408 @@
+"""Replay real edge access logs through the CDN model.
+
+    python trace_replay.py access.log --speedup 60
+
+    python trace_replay.py access.log --convert access.cdntrace
+
+Logs are streamed through a generator pipeline (read a chunk of lines,
+parse, map each client onto a city, pack NumPy columns), so only one chunk
+is in memory however large the file is. nginx combined format and JSONL are
+both accepted, plain or gzipped. ``--convert`` parses a log once into the
+binary format of ``trace_format``, which later runs read through a memory
+map instead of parsing again.
+"""
+import argparse
+import functools
+import gzip
+import itertools
+import json
+import re
+import time
+import zlib
+from datetime import datetime
+
+import numpy as np
+
+from locations import INDIAN_LOCATIONS
+from routing import RoutingTable
+from simulation_engine import SimulationEngine, fetch_segment
+from spatial_index import SphereKDTree
+from trace_format import BinaryTrace, TraceWriter, is_binary_trace
+
+CHUNK_LINES = 50000  # lines parsed per pipeline step
+MAX_ROWS_PER_TICK = 200000  # a tick that is due more requests leaves the rest for the next one
+
+# $remote_addr - $remote_user [$time_local] "$request" $status $body_bytes_sent
+# "$http_referer" "$http_user_agent", optionally followed by a quoted geo field
+# ("$geoip_city" or "lat,lon").
+NGINX_COMBINED = re.compile(
+    r'(\S+) \S+ \S+ \[([^\]]+)\] "\S+ (\S+)[^"]*" (\d{3}) (\d+|-) "[^"]*" "[^"]*"(?: "([^"]*)")?')
+
+JSONL_TIME = ('time', 'timestamp', 'ts', 'time_local', 'msec')
+JSONL_CLIENT = ('client', 'ip', 'remote_addr', 'client_ip')
+JSONL_URL = ('url', 'uri', 'path', 'object', 'request_uri')
+JSONL_SIZE = ('size', 'bytes', 'body_bytes_sent', 'bytes_sent')
+
+
+def open_log(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+
+def read_chunks(path, chunk_lines=CHUNK_LINES):
+    """Lists of at most ``chunk_lines`` raw lines."""
+    with open_log(path) as f:
+        while True:
+            lines = list(itertools.islice(f, chunk_lines))
+            if not lines:
+                break
+            yield lines
+
+
+def detect_format(path):
+    with open_log(path) as f:
+        for line in f:
+            if line.strip():
+                return 'jsonl' if line.lstrip().startswith('{') else 'nginx'
+    return 'nginx'
+
+
+def _first(record, names, default=None):
+    for name in names:
+        if record.get(name) is not None:
+            return record[name]
+    return default
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_time_text(value):
+    try:
+        return float(value)
+    except ValueError:
+        try:
+            return datetime.strptime(value, '%d/%b/%Y:%H:%M:%S %z').timestamp()
+        except ValueError:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+
+def parse_time(value):
+    """Epoch seconds from a number, an nginx ``$time_local`` or an ISO 8601 string."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    # Lines of one second share a timestamp string, so parse each distinct one once.
+    return _parse_time_text(value)
+
+
+def parse_nginx(chunks):
+    """``(time, client, geo, url, size)`` per combined-format line; malformed lines are skipped."""
+    for lines in chunks:
+        rows = []
+        for line in lines:
+            m = NGINX_COMBINED.match(line)
+            if m is None:
+                continue
+            client, stamp, url, status, size, geo = m.groups()
+            try:
+                rows.append((parse_time(stamp), client, geo, url, 0 if size == '-' else int(size)))
+            except ValueError:
+                continue
+        yield rows
+
+
+def parse_jsonl(chunks):
+    """Same rows as ``parse_nginx`` from one JSON object per line."""
+    for lines in chunks:
+        rows = []
+        for line in lines:
+            try:
+                record = json.loads(line)
+                ts = parse_time(_first(record, JSONL_TIME))
+            except (ValueError, TypeError, AttributeError):
+                continue
+            geo = record.get('city')
+            if geo is None and record.get('lat') is not None and record.get('lon') is not None:
+                geo = f"{record['lat']},{record['lon']}"
+            rows.append((ts, str(_first(record, JSONL_CLIENT, '')), geo,
+                         str(_first(record, JSONL_URL, '')), int(_first(record, JSONL_SIZE, 0) or 0)))
+        yield rows
+
+
+class GeoMapper:
+    """Maps a client onto one of the enabled cities.
+
+    A geo field naming an enabled city is used as is; any other known city
+    or a ``"lat,lon"`` pair goes to the nearest enabled city. Clients with no
+    usable geo are spread over the cities by a hash of their /24 network, so
+    one subnet always lands in the same place.
+    """
+
+    def __init__(self, cities, locations):
+        self.cities = list(cities)
+        self.locations = locations
+        self.index = {city: i for i, city in enumerate(self.cities)}
+        self.tree = SphereKDTree(self.cities,
+                                 np.array([locations[c]['lat'] for c in self.cities]),
+                                 np.array([locations[c]['lon'] for c in self.cities]))
+        self._geo = {}
+
+    def _nearest(self, lat, lon):
+        name, _ = self.tree.nearest(lat, lon)[0]
+        return self.index[name]
+
+    def _from_geo(self, geo):
+        if geo in self.index:
+            return self.index[geo]
+        if geo in self.locations:
+            return self._nearest(self.locations[geo]['lat'], self.locations[geo]['lon'])
+        try:
+            lat, lon = (float(v) for v in geo.split(','))
+        except ValueError:
+            return -1
+        return self._nearest(lat, lon)
+
+    def city(self, client, geo):
+        if geo:
+            found = self._geo.get(geo)
+            if found is None:
+                found = self._geo[geo] = self._from_geo(geo)
+            if found >= 0:
+                return found
+        network = client.rsplit('.', 1)[0]
+        return zlib.crc32(network.encode()) % len(self.cities)
+
+
+def log_batches(path, cities, locations, fmt=None, chunk_lines=CHUNK_LINES):
+    """Columnar batches of a text log: time, client, city, object, size."""
+    fmt = fmt or detect_format(path)
+    parse = parse_jsonl if fmt == 'jsonl' else parse_nginx
+    mapper = GeoMapper(cities, locations)
+    for rows in parse(read_chunks(path, chunk_lines)):
+        if not rows:
+            continue
+        ts, clients, geos, urls, sizes = zip(*rows)
+        yield {
+            'time': np.array(ts, dtype=np.float64),
+            'client': np.array([zlib.crc32(c.encode()) for c in clients], dtype=np.int64),
+            'city': np.array([mapper.city(c, g) for c, g in zip(clients, geos)], dtype=np.int32),
+            'object': np.array(urls, dtype=object),
+            'size': np.array(sizes, dtype=np.int64),
+        }
+
+
+def trace_batches(path, cities, locations, fmt=None):
+    """Columnar batches of a text log or a binary trace, with cities mapped onto ``cities``."""
+    if not is_binary_trace(path):
+        return log_batches(path, cities, locations, fmt)
+    trace = BinaryTrace(path)
+    mapper = GeoMapper(cities, locations)
+    return trace.batches(np.array([mapper.city('', name) for name in trace.cities], dtype=np.int32))
+
+
+def convert_log(src, dst, locations, fmt=None):
+    """Parse a text log once and write it as a binary trace; returns the row count.
+
+    Clients are mapped onto every known location, so the trace can later be
+    replayed against any set of enabled caches. URLs become dense object ids.
+    """
+    cities = list(locations)
+    objects = {}
+    writer = None
+    for batch in log_batches(src, cities, locations, fmt):
+        if writer is None:
+            writer = TraceWriter(dst, cities, batch['time'][0])
+        ids = np.array([objects.setdefault(url, len(objects)) for url in batch['object']], dtype=np.uint32)
+        writer.write(batch['time'], batch['city'], ids, batch['size'])
+    if writer is None:
+        writer = TraceWriter(dst, cities, 0.0)
+    writer.close()
+    return writer.count
+
+
+def replay(engine, step=2.0):
+    """Tick ``engine`` every ``step`` wall-clock seconds of a virtual clock until the trace runs out."""
+    now = 0.0
+    while not engine.exhausted:
+        yield engine.tick(now)
+        now += step
+
+
+class TraceEngine(SimulationEngine):
+    """Replays a request trace instead of drawing synthetic viewers.
+
+    ``tick(now)`` moves the trace clock forward ``trace_speedup`` (by
+    default the dashboard's ``time_scale``) times the
+    wall-clock time since the previous tick and serves every logged request
+    up to it through the cache hierarchy, in log order and at its logged
+    time. Results have the same shape as ``SimulationEngine.tick``; the
+    viewers of a tick are the clients seen in it (every request counts as a
+    viewer for binary traces, which store no client). A tick serves at most
+    ``trace_max_rows_per_tick`` requests, so when the model cannot keep up
+    the replay falls behind instead of buffering the backlog.
+    """
+
+    def __init__(self, cfg, locations, route, seed=None, batches=None):
+        super().__init__(dict(cfg, num_viewers=0), locations, route, seed)
+        self.speedup = float(cfg.get('trace_speedup', cfg.get('time_scale', 1)))
+        self.max_rows = int(cfg.get('trace_max_rows_per_tick', MAX_ROWS_PER_TICK))
+        if batches is None:
+            batches = trace_batches(cfg['trace_path'], self.cities, locations, cfg.get('trace_format'))
+        self._batches = iter(batches)
+        self._pending = None
+        self.exhausted = False
+        self.wall_start = None
+        self.trace_start = None
+        self.trace_now = None
+        self.requests_replayed = 0
+        self._clients = np.zeros(0, dtype=np.int64)
+        self._clock = None
+
+    @property
+    def num_viewers(self):
+        return len(np.unique(self._clients))
+
+    def _take_until(self, t_end, limit):
+        """At most ``limit`` trace rows up to ``t_end``, pulling batches from the pipeline as needed."""
+        parts = []
+        taken = 0
+        while not self.exhausted and taken < limit:
+            if self._pending is None:
+                self._pending = next(self._batches, None)
+                if self._pending is None:
+                    self.exhausted = True
+                    break
+            batch = self._pending
+            # Logs are written as requests finish, so stop at the first later row rather than sorting.
+            later = batch['time'] > t_end
+            cut = min(int(later.argmax()) if later.any() else len(later), limit - taken)
+            taken += cut
+            if cut == len(later):
+                parts.append(batch)
+                self._pending = None
+                continue
+            if cut:
+                parts.append({name: column[:cut] for name, column in batch.items()})
+                self._pending = {name: column[cut:] for name, column in batch.items()}
+            break
+        if not parts:
+            return {name: np.zeros(0, dtype=dtype) for name, dtype in
+                    (('time', np.float64), ('client', np.int64), ('city', np.int32),
+                     ('object', object), ('size', np.int64))}
+        return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+    def _first_time(self):
+        if self._pending is None:
+            self._pending = next(self._batches, None)
+        return None if self._pending is None else float(self._pending['time'][0])
+
+    def tick(self, now):
+        """Serve the trace requests that fall in the wall-clock time since the last tick."""
+        if self.wall_start is None:
+            self.wall_start = now
+            self.trace_start = self._first_time()
+            if self.trace_start is None:
+                self.exhausted = True
+                self.trace_start = 0.0
+        self.trace_now = self.trace_start + (now - self.wall_start) * self.speedup
+        rows = self._take_until(self.trace_now, self.max_rows)
+        clock = float(rows['time'][-1]) if len(rows['time']) else self.trace_now
+        window = max(clock - self._clock, 1.0) if self._clock is not None else 1.0
+        self._clock = clock
+        for caches in self.caches.values():
+            for cache in caches.values():
+                cache.expire(clock)
+
+        city = rows['city']
+        n = len(city)
+        policy_hits = {}
+        times = rows['time'].tolist()
+        keys = rows['object'].tolist()
+        sizes = rows['size'].tolist()
+        paths = [self.paths[c] for c in city.tolist()]
+        for policy, caches in self.caches.items():
+            served = np.empty(n, dtype=np.int16)
+            for i in range(n):
+                served[i] = fetch_segment(caches, paths[i], keys[i], sizes[i], times[i])
+            self.origin_fetches[policy] += int((served < 0).sum())
+            policy_hits[policy] = served >= 0
+            if policy == self.policy:
+                depth = served
+
+        self.viewer_city = self.viewer_path = city
+        clients = rows.get('client')
+        if clients is None:
+            clients = self.requests_replayed + np.arange(n)
+        self._clients = clients
+        self.requests_replayed += n
+        is_hit = depth >= 0
+        tier = np.where(is_hit, self.path_tier[city, np.maximum(depth, 0)], self.origin_tier)
+        node_requests, node_hits = self._node_counters(depth, city)
+        latency, load, dropped = self._apply_capacity(self._draw_latency(depth, city), depth, city,
+                                                      rows['size'], window)
+        policy_deltas = self._policy_deltas(policy_hits, rows['size'], dropped)
+        delivered = policy_deltas[self.policy]
+
+        return {
+            'requests': n,
+            'hits': delivered['hits'],
+            'bytes_saved': delivered['hit_bytes'],
+            'dropped': load.get('dropped', 0),
+            'load': load,
+            'node_requests': node_requests,
+            'node_hits': node_hits,
+            'policies': policy_deltas,
+            'log': {
+                'time': self.wall_start + (rows['time'] - self.trace_start) / self.speedup,
+                'viewer': clients,
+                'city': city,
+                'hit': is_hit & ~dropped,
+                'latency': latency,
+                'tier': tier,
+            },
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay an access log through the CDN model.")
+    parser.add_argument('trace', help="nginx combined log, JSONL file (optionally .gz) or binary trace")
+    parser.add_argument('--config', default='simulation_config.json')
+    parser.add_argument('--format', choices=('nginx', 'jsonl'))
+    parser.add_argument('--speedup', type=float, default=3600.0, help="trace seconds replayed per tick second")
+    parser.add_argument('--tick', type=float, default=2.0, help="seconds of wall clock between ticks")
+    parser.add_argument('--convert', metavar='OUT', help="write the log as a binary trace instead of replaying it")
+    args = parser.parse_args(argv)
+
+    if args.convert:
+        started = time.perf_counter()
+        count = convert_log(args.trace, args.convert, INDIAN_LOCATIONS, args.format)
+        print(f"Wrote {count:,} requests to {args.convert} in {time.perf_counter() - started:.1f} s")
+        return
+
+    try:
+        with open(args.config) as f:
+            cfg = json.load(f)
+    except (OSError, ValueError):
+        cfg = {'cities_enabled': ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Hyderabad', 'Kolkata'],
+               'origin_city': 'Chennai'}
+    cfg.update(trace_path=args.trace, trace_format=args.format, trace_speedup=args.speedup)
+    table = RoutingTable(INDIAN_LOCATIONS, cfg['cities_enabled'], cfg.get('origin_city', 'Chennai'))
+    engine = TraceEngine(cfg, INDIAN_LOCATIONS, table.path)
+
+    started = time.perf_counter()
+    requests = hits = 0
+    for result in replay(engine, args.tick):
+        requests += result['requests']
+        hits += result['hits']
+
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        'requests': requests,
+        'hit_ratio': round(hits / requests, 4) if requests else 0.0,
+        'origin_fetches': engine.origin_fetches[engine.policy],
+        'trace_seconds': round(engine.trace_now - engine.trace_start, 1),
+        'runtime_s': round(elapsed, 2),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+import math
+import threading
+import time
+import zlib
+
+
+class _Shard:
+    __slots__ = ('lock', 'last_seen', 'deadline', 'wheel', 'cursor')
+
+    def __init__(self, num_slots):
+        self.lock = threading.Lock()
+        self.last_seen = {}
+        self.deadline = {}  # viewer -> absolute wheel tick at which it expires
+        self.wheel = [set() for _ in range(num_slots)]
+        self.cursor = 0  # next tick to expire
+
+
+class ViewerRegistry:
+    """Last-seen time per viewer, sharded so request threads rarely contend.
+
+    Each shard has its own lock and a timing wheel of ``tick``-second slots.
+    A viewer sits in exactly one slot, the one for its expiry deadline, and
+    moves only when a later request pushes the deadline into another slot.
+    ``expire`` therefore visits the slots that came due and touches only the
+    viewers that actually timed out.
+    """
+
+    def __init__(self, timeout=10, num_shards=64, tick=1.0):
+        self.timeout = timeout
+        self.tick = tick
+        self.num_slots = int(timeout / tick) + 2
+        self._shards = [_Shard(self.num_slots) for _ in range(num_shards)]
+        self.expired = 0
+
+    def _tick_of(self, t):
+        return int(t // self.tick)
+
+    def _shard(self, viewer_id):
+        return self._shards[zlib.crc32(viewer_id.encode()) % len(self._shards)]
+
+    def __len__(self):
+        return sum(len(shard.last_seen) for shard in self._shards)
+
+    def touch(self, viewer_id, now=None):
+        now = time.time() if now is None else now
+        # Round the deadline up so a viewer is never dropped before ``timeout`` has passed.
+        due = math.ceil((now + self.timeout) / self.tick)
+        shard = self._shard(viewer_id)
+        with shard.lock:
+            shard.last_seen[viewer_id] = now
+            old = shard.deadline.get(viewer_id)
+            if old == due:
+                return
+            if old is not None:
+                shard.wheel[old % self.num_slots].discard(viewer_id)
+            shard.deadline[viewer_id] = due
+            shard.wheel[due % self.num_slots].add(viewer_id)
+
+    def expire(self, now=None):
+        """Drop viewers whose deadline has passed; returns how many were dropped."""
+        current = self._tick_of(time.time() if now is None else now)
+        dropped = 0
+        for shard in self._shards:
+            with shard.lock:
+                # After a long pause every slot is due; one lap of the wheel covers them all.
+                start = max(shard.cursor, current - self.num_slots + 1)
+                for t in range(start, current + 1):
+                    slot = shard.wheel[t % self.num_slots]
+                    due = [v for v in slot if shard.deadline[v] <= current]
+                    for viewer_id in due:
+                        slot.discard(viewer_id)
+                        del shard.deadline[viewer_id]
+                        del shard.last_seen[viewer_id]
+                    dropped += len(due)
+                shard.cursor = max(shard.cursor, current + 1)
+        self.expired += dropped
+        return dropped
+
+
+class ThreadCounters:
+    """Counters that request threads bump without locks and ``/stats`` sums on read.
+
+    Every thread increments its own dict, so no update is ever lost. The dicts
+    of threads that have exited are folded into a retired total (and dropped)
+    when counters are read or new threads register, keeping memory bounded
+    under a thread-per-request server.
+    """
+
+    SWEEP_AFTER = 256
+
+    def __init__(self, names):
+        self.names = tuple(names)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._threads = []  # (thread, counts)
+        self._retired = dict.fromkeys(self.names, 0)
+
+    def _counts(self):
+        counts = getattr(self._local, 'counts', None)
+        if counts is None:
+            counts = self._local.counts = dict.fromkeys(self.names, 0)
+            with self._lock:
+                self._threads.append((threading.current_thread(), counts))
+                if len(self._threads) > self.SWEEP_AFTER:
+                    self._sweep()
+        return counts
+
+    def incr(self, name, n=1):
+        counts = self._counts()
+        counts[name] += n
+
+    def _sweep(self):
+        alive = []
+        for thread, counts in self._threads:
+            if thread.is_alive():
+                alive.append((thread, counts))
+            else:
+                for name, value in counts.items():
+                    self._retired[name] += value
+        self._threads = alive
+
+    def snapshot(self):
+        with self._lock:
+            self._sweep()
+            totals = dict(self._retired)
+            for _, counts in self._threads:
+                for name in self.names:
+                    totals[name] += counts[name]
+        return totals
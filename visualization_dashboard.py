@@ -1,23 +1,36 @@
 import dash
-from dash import dcc, html, Input, Output
+from dash import dcc, html, Input, Output, State, Patch, no_update, ClientsideFunction
 import dash_bootstrap_components as dbc
 import plotly.graph_objects as go
-import plotly.express as px
 from datetime import datetime
 import json
 import os
-import random
 import numpy as np
 import pandas as pd
 import threading
 import time
 import logging
 import math
+import zlib
+import functools
+from edge_cache import POLICY_LABELS
+from routing import RoutingTable
+from locations import INDIAN_LOCATIONS
+from request_log import RequestLog
+from latency_sketch import DDSketchBank, DEFAULT_QUANTILES, quantile_label
+from flask import jsonify
+from simulation_engine import SimulationEngine
+from event_engine import EventEngine
+from parallel_engine import ShardedEngine
+from trace_replay import TraceEngine
+from live_metrics import MetricsPublisher, CLIENT_SCRIPTS
+from plotly.subplots import make_subplots
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
+app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP], external_scripts=CLIENT_SCRIPTS)
+publisher = MetricsPublisher(app.server)
 
 def load_config():
     try:
@@ -33,168 +46,18 @@ def load_config():
         'origin_latency': 850,
         'origin_city': 'Chennai',
         'cities_enabled': ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Hyderabad', 'Kolkata'],
+        'eviction_policy': 'lru',
+        'compare_policies': [],
+        'request_log_capacity': 10000,
+        'sim_engine': 'tick',
+        'time_scale': 1,
+        'trace_path': '',
+        'sim_workers': 0,
         'running': False
     }
 
 config = load_config()
 
-INDIAN_LOCATIONS = {
-        'Mumbai': {'lat': 19.0760, 'lon': 72.8777, 'type': 'regional', 'region': 'West'},
-    'Chennai': {'lat': 13.0827, 'lon': 80.2707, 'type': 'regional', 'region': 'South'},
-    'Delhi': {'lat': 28.7041, 'lon': 77.1025, 'type': 'regional', 'region': 'North'},
-    'Bangalore': {'lat': 12.9716, 'lon': 77.5946, 'type': 'regional', 'region': 'South'},
-    'Hyderabad': {'lat': 17.3850, 'lon': 78.4867, 'type': 'regional', 'region': 'South'},
-    'Kolkata': {'lat': 22.5726, 'lon': 88.3639, 'type': 'regional', 'region': 'East'},
-    'Ahmedabad': {'lat': 23.0225, 'lon': 72.5714, 'type': 'regional', 'region': 'West'},
-    'Pune': {'lat': 18.5204, 'lon': 73.8567, 'type': 'sub-regional', 'region': 'West'},
-    'Jaipur': {'lat': 26.9124, 'lon': 75.7873, 'type': 'sub-regional', 'region': 'North'},
-    'Surat': {'lat': 21.1702, 'lon': 72.8311, 'type': 'sub-regional', 'region': 'West'},
-    'Lucknow': {'lat': 26.8467, 'lon': 80.9462, 'type': 'sub-regional', 'region': 'North'},
-    'Kanpur': {'lat': 26.4499, 'lon': 80.3319, 'type': 'sub-regional', 'region': 'North'},
-    'Nagpur': {'lat': 21.1458, 'lon': 79.0882, 'type': 'sub-regional', 'region': 'Central'},
-    'Indore': {'lat': 22.7196, 'lon': 75.8577, 'type': 'sub-regional', 'region': 'Central'},
-    'Bhopal': {'lat': 23.2599, 'lon': 77.4126, 'type': 'sub-regional', 'region': 'Central'},
-    'Visakhapatnam': {'lat': 17.6869, 'lon': 83.2185, 'type': 'sub-regional', 'region': 'South'},
-    'Patna': {'lat': 25.5941, 'lon': 85.1376, 'type': 'sub-regional', 'region': 'East'},
-    'Vadodara': {'lat': 22.3072, 'lon': 73.1812, 'type': 'sub-regional', 'region': 'West'},
-    'Coimbatore': {'lat': 11.0168, 'lon': 76.9558, 'type': 'sub-regional', 'region': 'South'},
-    'Ludhiana': {'lat': 30.9010, 'lon': 75.8573, 'type': 'sub-regional', 'region': 'North'},
-    'Kochi': {'lat': 9.9312, 'lon': 76.2673, 'type': 'sub-regional', 'region': 'South'},
-    'Guwahati': {'lat': 26.1445, 'lon': 91.7362, 'type': 'sub-regional', 'region': 'East'},
-    'Chandigarh': {'lat': 30.7333, 'lon': 76.7794, 'type': 'local', 'region': 'North'},
-    'Agra': {'lat': 27.1767, 'lon': 78.0081, 'type': 'local', 'region': 'North'},
-    'Varanasi': {'lat': 25.3176, 'lon': 82.9739, 'type': 'local', 'region': 'North'},
-    'Amritsar': {'lat': 31.6340, 'lon': 74.8723, 'type': 'local', 'region': 'North'},
-    'Allahabad': {'lat': 25.4358, 'lon': 81.8463, 'type': 'local', 'region': 'North'},
-    'Ranchi': {'lat': 23.3441, 'lon': 85.3096, 'type': 'local', 'region': 'East'},
-    'Bhubaneswar': {'lat': 20.2961, 'lon': 85.8245, 'type': 'local', 'region': 'East'},
-    'Dehradun': {'lat': 30.3165, 'lon': 78.0322, 'type': 'local', 'region': 'North'},
-    'Raipur': {'lat': 21.2514, 'lon': 81.6296, 'type': 'local', 'region': 'Central'},
-    'Thiruvananthapuram': {'lat': 8.5241, 'lon': 76.9366, 'type': 'local', 'region': 'South'},
-    'Mysuru': {'lat': 12.2958, 'lon': 76.6394, 'type': 'local', 'region': 'South'},
-    'Madurai': {'lat': 9.9252, 'lon': 78.1198, 'type': 'local', 'region': 'South'},
-    'Tirupati': {'lat': 13.6288, 'lon': 79.4192, 'type': 'local', 'region': 'South'},
-    'Vijayawada': {'lat': 16.5062, 'lon': 80.6480, 'type': 'local', 'region': 'South'},
-    'Mangalore': {'lat': 12.9141, 'lon': 74.8560, 'type': 'local', 'region': 'South'},
-    'Nashik': {'lat': 19.9975, 'lon': 73.7898, 'type': 'local', 'region': 'West'},
-    'Aurangabad': {'lat': 19.8762, 'lon': 75.3433, 'type': 'local', 'region': 'West'},
-    'Rajkot': {'lat': 22.3039, 'lon': 70.8022, 'type': 'local', 'region': 'West'},
-    'Jodhpur': {'lat': 26.2389, 'lon': 73.0243, 'type': 'local', 'region': 'West'},
-    'Udaipur': {'lat': 24.5854, 'lon': 73.7125, 'type': 'local', 'region': 'West'},
-    'Jammu': {'lat': 32.7266, 'lon': 74.8570, 'type': 'local', 'region': 'North'},
-    'Shimla': {'lat': 31.1048, 'lon': 77.1734, 'type': 'local', 'region': 'North'},
-    'Gurgaon': {'lat': 28.4595, 'lon': 77.0266, 'type': 'local', 'region': 'North'},
-    'Noida': {'lat': 28.5355, 'lon': 77.3910, 'type': 'local', 'region': 'North'},
-    'Faridabad': {'lat': 28.4089, 'lon': 77.3178, 'type': 'local', 'region': 'North'},
-    'Ghaziabad': {'lat': 28.6692, 'lon': 77.4538, 'type': 'local', 'region': 'North'},
-    'Meerut': {'lat': 28.9845, 'lon': 77.7064, 'type': 'local', 'region': 'North'},
-    'Vellore': {'lat': 12.9165, 'lon': 79.1325, 'type': 'local', 'region': 'South'},
-    'Salem': {'lat': 11.6643, 'lon': 78.1460, 'type': 'local', 'region': 'South'},
-    'Trichy': {'lat': 10.7905, 'lon': 78.7047, 'type': 'local', 'region': 'South'},
-    'Tirunelveli': {'lat': 8.7139, 'lon': 77.7567, 'type': 'local', 'region': 'South'},
-    'Guntur': {'lat': 16.3067, 'lon': 80.4365, 'type': 'local', 'region': 'South'},
-    'Warangal': {'lat': 17.9689, 'lon': 79.5941, 'type': 'local', 'region': 'South'},
-    'Karimnagar': {'lat': 18.4386, 'lon': 79.1288, 'type': 'local', 'region': 'South'},
-    'Rajahmundry': {'lat': 17.0005, 'lon': 81.8040, 'type': 'local', 'region': 'South'},
-    'Nellore': {'lat': 14.4426, 'lon': 79.9865, 'type': 'local', 'region': 'South'},
-    'Kadapa': {'lat': 14.4673, 'lon': 78.8242, 'type': 'local', 'region': 'South'},
-    'Kakinada': {'lat': 16.9891, 'lon': 82.2475, 'type': 'local', 'region': 'South'},
-    'Hubli': {'lat': 15.3647, 'lon': 75.1240, 'type': 'local', 'region': 'South'},
-    'Belgaum': {'lat': 15.8497, 'lon': 74.4977, 'type': 'local', 'region': 'South'},
-    'Gulbarga': {'lat': 17.3297, 'lon': 76.8343, 'type': 'local', 'region': 'South'},
-    'Jamshedpur': {'lat': 22.8046, 'lon': 86.2029, 'type': 'local', 'region': 'East'},
-    'Dhanbad': {'lat': 23.7957, 'lon': 86.4304, 'type': 'local', 'region': 'East'},
-    'Siliguri': {'lat': 26.7271, 'lon': 88.3953, 'type': 'local', 'region': 'East'},
-    'Asansol': {'lat': 23.6739, 'lon': 86.9524, 'type': 'local', 'region': 'East'},
-    'Durgapur': {'lat': 23.5204, 'lon': 87.3119, 'type': 'local', 'region': 'East'},
-    'Panchkula': {'lat': 30.6942, 'lon': 76.8535, 'type': 'village', 'region': 'North'},
-    'Mohali': {'lat': 30.7046, 'lon': 76.7179, 'type': 'village', 'region': 'North'},
-    'Zirakpur': {'lat': 30.6425, 'lon': 76.8173, 'type': 'village', 'region': 'North'},
-    'Dharamshala': {'lat': 32.2190, 'lon': 76.3234, 'type': 'village', 'region': 'North'},
-    'Manali': {'lat': 32.2432, 'lon': 77.1892, 'type': 'village', 'region': 'North'},
-    'Rishikesh': {'lat': 30.0869, 'lon': 78.2676, 'type': 'village', 'region': 'North'},
-    'Haridwar': {'lat': 29.9457, 'lon': 78.1642, 'type': 'village', 'region': 'North'},
-    'Muzaffarpur': {'lat': 26.1225, 'lon': 85.3906, 'type': 'village', 'region': 'East'},
-    'Purnia': {'lat': 25.7771, 'lon': 87.4753, 'type': 'village', 'region': 'East'},
-    'Darbhanga': {'lat': 26.1542, 'lon': 85.9009, 'type': 'village', 'region': 'East'},
-    'Bhagalpur': {'lat': 25.2425, 'lon': 86.9842, 'type': 'village', 'region': 'East'},
-    'Kurnool': {'lat': 15.8281, 'lon': 78.0373, 'type': 'village', 'region': 'South'},
-    'Anantapur': {'lat': 14.6819, 'lon': 77.6006, 'type': 'village', 'region': 'South'},
-    'Chittoor': {'lat': 13.2172, 'lon': 79.1003, 'type': 'village', 'region': 'South'},
-    'Ongole': {'lat': 15.5057, 'lon': 80.0499, 'type': 'village', 'region': 'South'},
-    'Nizamabad': {'lat': 18.6725, 'lon': 78.0941, 'type': 'village', 'region': 'South'},
-    'Khammam': {'lat': 17.2473, 'lon': 80.1514, 'type': 'village', 'region': 'South'},
-    'Mahbubnagar': {'lat': 16.7378, 'lon': 77.9826, 'type': 'village', 'region': 'South'},
-    'Tumkur': {'lat': 13.3392, 'lon': 77.1011, 'type': 'village', 'region': 'South'},
-    'Davangere': {'lat': 14.4644, 'lon': 75.9218, 'type': 'village', 'region': 'South'},
-    'Bellary': {'lat': 15.1394, 'lon': 76.9214, 'type': 'village', 'region': 'South'},
-    'Bijapur': {'lat': 16.8302, 'lon': 75.7100, 'type': 'village', 'region': 'South'},
-    'Shimoga': {'lat': 13.9299, 'lon': 75.5681, 'type': 'village', 'region': 'South'},
-    'Erode': {'lat': 11.3410, 'lon': 77.7172, 'type': 'village', 'region': 'South'},
-    'Thanjavur': {'lat': 10.7870, 'lon': 79.1378, 'type': 'village', 'region': 'South'},
-    'Dindigul': {'lat': 10.3673, 'lon': 77.9803, 'type': 'village', 'region': 'South'},
-    'Vellankanni': {'lat': 10.6833, 'lon': 79.8333, 'type': 'village', 'region': 'South'},
-    'Cuddalore': {'lat': 11.7480, 'lon': 79.7714, 'type': 'village', 'region': 'South'},
-    'Kumbakonam': {'lat': 10.9601, 'lon': 79.3845, 'type': 'village', 'region': 'South'},
-    'Palakkad': {'lat': 10.7867, 'lon': 76.6548, 'type': 'village', 'region': 'South'},
-    'Thrissur': {'lat': 10.5276, 'lon': 76.2144, 'type': 'village', 'region': 'South'},
-    'Kannur': {'lat': 11.8745, 'lon': 75.3704, 'type': 'village', 'region': 'South'},
-    'Kollam': {'lat': 8.8932, 'lon': 76.6141, 'type': 'village', 'region': 'South'},
-    'Alappuzha': {'lat': 9.4981, 'lon': 76.3388, 'type': 'village', 'region': 'South'},
-    'Kottayam': {'lat': 9.5916, 'lon': 76.5222, 'type': 'village', 'region': 'South'},
-    'Kozhikode': {'lat': 11.2588, 'lon': 75.7804, 'type': 'village', 'region': 'South'},
-    'Tiruppur': {'lat': 11.1075, 'lon': 77.3398, 'type': 'village', 'region': 'South'},
-    'Karur': {'lat': 10.9601, 'lon': 78.0766, 'type': 'village', 'region': 'South'},
-    'Namakkal': {'lat': 11.2189, 'lon': 78.1677, 'type': 'village', 'region': 'South'},
-    'Puducherry': {'lat': 11.9416, 'lon': 79.8083, 'type': 'village', 'region': 'South'},
-    'Bikaner': {'lat': 28.0229, 'lon': 73.3119, 'type': 'village', 'region': 'North'},
-    'Ajmer': {'lat': 26.4499, 'lon': 74.6399, 'type': 'village', 'region': 'North'},
-    'Kota': {'lat': 25.2138, 'lon': 75.8648, 'type': 'village', 'region': 'North'},
-    'Bharatpur': {'lat': 27.2152, 'lon': 77.4900, 'type': 'village', 'region': 'North'},
-    'Alwar': {'lat': 27.5530, 'lon': 76.6346, 'type': 'village', 'region': 'North'},
-    'Bhilwara': {'lat': 25.3407, 'lon': 74.6408, 'type': 'village', 'region': 'North'},
-    'Sikar': {'lat': 27.6119, 'lon': 75.1397, 'type': 'village', 'region': 'North'},
-    'Pali': {'lat': 25.7711, 'lon': 73.3234, 'type': 'village', 'region': 'North'},
-    'Gorakhpur': {'lat': 26.7606, 'lon': 83.3732, 'type': 'village', 'region': 'North'},
-    'Bareilly': {'lat': 28.3670, 'lon': 79.4304, 'type': 'village', 'region': 'North'},
-    'Moradabad': {'lat': 28.8389, 'lon': 78.7378, 'type': 'village', 'region': 'North'},
-    'Aligarh': {'lat': 27.8974, 'lon': 78.0880, 'type': 'village', 'region': 'North'},
-    'Saharanpur': {'lat': 29.9680, 'lon': 77.5460, 'type': 'village', 'region': 'North'},
-    'Mathura': {'lat': 27.4924, 'lon': 77.6737, 'type': 'village', 'region': 'North'},
-    'Firozabad': {'lat': 27.1591, 'lon': 78.3957, 'type': 'village', 'region': 'North'},
-    'Jhansi': {'lat': 25.4484, 'lon': 78.5685, 'type': 'village', 'region': 'North'},
-    'Gwalior': {'lat': 26.2183, 'lon': 78.1828, 'type': 'village', 'region': 'North'},
-    'Ujjain': {'lat': 23.1765, 'lon': 75.7885, 'type': 'village', 'region': 'Central'},
-    'Jabalpur': {'lat': 23.1815, 'lon': 79.9864, 'type': 'village', 'region': 'Central'},
-    'Guna': {'lat': 24.6460, 'lon': 77.3103, 'type': 'village', 'region': 'Central'},
-    'Sagar': {'lat': 23.8388, 'lon': 78.7378, 'type': 'village', 'region': 'Central'},
-    'Satna': {'lat': 24.6005, 'lon': 80.8322, 'type': 'village', 'region': 'Central'},
-    'Ratlam': {'lat': 23.3315, 'lon': 75.0367, 'type': 'village', 'region': 'Central'},
-    'Bilaspur': {'lat': 22.0797, 'lon': 82.1409, 'type': 'village', 'region': 'Central'},
-    'Korba': {'lat': 22.3595, 'lon': 82.7501, 'type': 'village', 'region': 'Central'},
-    'Raigarh': {'lat': 21.8974, 'lon': 83.3950, 'type': 'village', 'region': 'Central'},
-    'Bhilai': {'lat': 21.2095, 'lon': 81.3785, 'type': 'village', 'region': 'Central'},
-    'Kolhapur': {'lat': 16.7050, 'lon': 74.2433, 'type': 'village', 'region': 'West'},
-    'Sangli': {'lat': 16.8524, 'lon': 74.5815, 'type': 'village', 'region': 'West'},
-    'Solapur': {'lat': 17.6599, 'lon': 75.9064, 'type': 'village', 'region': 'West'},
-    'Nanded': {'lat': 19.1383, 'lon': 77.3210, 'type': 'village', 'region': 'West'},
-    'Jalgaon': {'lat': 21.0077, 'lon': 75.5626, 'type': 'village', 'region': 'West'},
-    'Amravati': {'lat': 20.9374, 'lon': 77.7796, 'type': 'village', 'region': 'West'},
-    'Akola': {'lat': 20.7002, 'lon': 77.0082, 'type': 'village', 'region': 'West'},
-    'Latur': {'lat': 18.3983, 'lon': 76.5604, 'type': 'village', 'region': 'West'},
-    'Dhule': {'lat': 20.9042, 'lon': 74.7749, 'type': 'village', 'region': 'West'},
-    'Ahmednagar': {'lat': 19.0948, 'lon': 74.7480, 'type': 'village', 'region': 'West'},
-    'Bhavnagar': {'lat': 21.7645, 'lon': 72.1519, 'type': 'village', 'region': 'West'},
-    'Jamnagar': {'lat': 22.4707, 'lon': 70.0577, 'type': 'village', 'region': 'West'},
-    'Junagadh': {'lat': 21.5222, 'lon': 70.4579, 'type': 'village', 'region': 'West'},
-    'Gandhinagar': {'lat': 23.2156, 'lon': 72.6369, 'type': 'village', 'region': 'West'},
-    'Anand': {'lat': 22.5645, 'lon': 72.9289, 'type': 'village', 'region': 'West'},
-    'Nadiad': {'lat': 22.6939, 'lon': 72.8618, 'type': 'village', 'region': 'West'},
-    'Morbi': {'lat': 22.8173, 'lon': 70.8377, 'type': 'village', 'region': 'West'},
-    'Surendranagar': {'lat': 22.7031, 'lon': 71.6371, 'type': 'village', 'region': 'West'},
-    'Gandhidham': {'lat': 23.0752, 'lon': 70.1327, 'type': 'village', 'region': 'West'},
-}
-
 def calculate_distance(lat1, lon1, lat2, lon2):
     R = 6371
     dlat = math.radians(lat2 - lat1)
@@ -203,142 +66,247 @@ def calculate_distance(lat1, lon1, lat2, lon2):
     c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
     return R * c
 
-def find_nearest_cache(from_city, target_type, enabled_cities, exclude=None):
-    if from_city not in INDIAN_LOCATIONS:
-        return None
-    from_info = INDIAN_LOCATIONS[from_city]
-    candidates = []
-    for city in enabled_cities:
-        if city == from_city or city == exclude or city not in INDIAN_LOCATIONS:
-            continue
-        city_info = INDIAN_LOCATIONS[city]
-        if city_info['type'] == target_type:
-            dist = calculate_distance(from_info['lat'], from_info['lon'], city_info['lat'], city_info['lon'])
-            candidates.append((city, dist))
-    if not candidates:
-        return None
-    candidates.sort(key=lambda x: x[1])
-    return candidates[0][0]
+routing_table = None
 
-def get_cache_hierarchy(from_city, origin_city):
-    if from_city == origin_city:
-        return [origin_city]
-    if from_city not in INDIAN_LOCATIONS or origin_city not in INDIAN_LOCATIONS:
-        return [origin_city]
-    
+def get_routing_table():
+    """Routing table for the current config; rebuilt only when the enabled caches or origin change."""
+    global routing_table
     enabled_cities = config.get('cities_enabled', [])
-    city_info = INDIAN_LOCATIONS[from_city]
-    path = [from_city]
-    current = from_city
-    
-    if city_info['type'] == 'village':
-        nearest_local = find_nearest_cache(current, 'local', enabled_cities)
-        if nearest_local and nearest_local not in path:
-            path.append(nearest_local)
-            current = nearest_local
-    
-    if INDIAN_LOCATIONS[current]['type'] in ['village', 'local']:
-        nearest_sub = find_nearest_cache(current, 'sub-regional', enabled_cities)
-        if nearest_sub and nearest_sub not in path:
-            path.append(nearest_sub)
-            current = nearest_sub
-    
-    if INDIAN_LOCATIONS[current]['type'] in ['village', 'local', 'sub-regional']:
-        nearest_regional = find_nearest_cache(current, 'regional', enabled_cities)
-        if nearest_regional and nearest_regional not in path:
-            path.append(nearest_regional)
-            current = nearest_regional
-    
-    if origin_city not in path:
-        path.append(origin_city)
-    
-    return path
-
-def calculate_latency(path, is_cache_hit):
-    if not path:
-        return config.get('origin_latency', 850)
-    if is_cache_hit:
-        return random.randint(15, 35)
-    total = 10
-    for i in range(1, len(path)):
-        loc_type = INDIAN_LOCATIONS.get(path[i], {}).get('type', 'unknown')
-        if loc_type == 'origin':
-            total += config.get('origin_latency', 850)
-        elif loc_type == 'regional':
-            total += random.randint(80, 150)
-        elif loc_type == 'sub-regional':
-            total += random.randint(40, 80)
-        elif loc_type == 'local':
-            total += random.randint(20, 40)
-        else:
-            total += random.randint(10, 25)
-    return total
+    origin_city = config.get('origin_city', 'Chennai')
+    if routing_table is None or not routing_table.matches(enabled_cities, origin_city):
+        routing_table = RoutingTable(INDIAN_LOCATIONS, enabled_cities, origin_city)
+    return routing_table
+
+def get_cache_hierarchy(from_city, origin_city):
+    return get_routing_table().path(from_city, origin_city)
+
+# Map marker (color, base size) by tier; the origin is drawn biggest
+MAP_NODE_STYLES = {
+    'origin': ('#f5576c', 42),
+    'regional': ('#667eea', 32),
+    'sub-regional': ('#4facfe', 26),
+    'local': ('#43e97b', 20),
+}
+MAP_DEFAULT_NODE_STYLE = ('#fbbf24', 16)
+
+def edge_lines(edges):
+    """lon/lat arrays that draw every (from, to) edge in one trace, edges split by NaN."""
+    ends = np.array([[INDIAN_LOCATIONS[city]['lon'], INDIAN_LOCATIONS[city]['lat']]
+                     for edge in edges for city in edge]).reshape(-1, 2, 2)
+    gap = np.full((len(edges), 1, 2), np.nan)
+    points = np.concatenate([ends, gap], axis=1).reshape(-1, 2)
+    return points[:, 0], points[:, 1]
+
+def figure_shape(*parts):
+    """Short fingerprint of whatever fixes a figure's traces and layout."""
+    return zlib.crc32(json.dumps(parts, default=str).encode())
+
+def empty_figure(text, plot_bg=True):
+    fig = go.Figure()
+    fig.add_annotation(text=text, xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(size=16, color='#64748b'))
+    fig.update_layout(paper_bgcolor='rgba(0,0,0,0)', height=340, margin=dict(l=0,r=0,t=0,b=0))
+    if plot_bg:
+        fig.update_layout(plot_bgcolor='rgba(0,0,0,0)')
+    return fig
 
 class SimulationState:
     def __init__(self):
         self.running = False
-        self.viewers = {}
+        self.engine = None
+        self.policy = 'lru'
+        self.policy_stats = {}
         self.cache_stats = {}
-        self.request_log = []
+        self.request_log = RequestLog(config.get('request_log_capacity', 10000))
+        self.city_sketch = None
+        self.tier_sketch = None
         self.total_hits = 0
         self.total_requests = 0
         self.bandwidth_saved_bytes = 0
+        self.total_dropped = 0
+        self.tick = 0
+        self.snapshot = None
+    
+    @property
+    def num_viewers(self):
+        return self.engine.num_viewers if self.engine is not None else 0
+    
+    def city_counts(self):
+        if self.engine is None:
+            return {}
+        return {city: int(count) for city, count in zip(self.engine.cities, self.engine.city_counts())}
         
 sim = SimulationState()
 
+SNAPSHOT_ROWS = 200  # newest request-log rows kept per snapshot (latency histogram window)
+STATS_ROWS = 100     # of which averaged on the latency card
+LOG_ROWS = 25        # of which listed under Live Requests
+
+def build_snapshot():
+    """Aggregate everything the dashboard shows for the current tick.
+    
+    Built once per tick by the simulation thread; callbacks only format it.
+    The request-log rows are copied because the ring buffer keeps moving.
+    """
+    engine = sim.engine
+    counts = engine.city_counts() if engine is not None else []
+    city_counts = {city: int(count) for city, count in zip(engine.cities, counts)} if engine is not None else {}
+    regions = {}
+    for city, count in city_counts.items():
+        if city in INDIAN_LOCATIONS:
+            region = INDIAN_LOCATIONS[city]['region']
+            regions[region] = regions.get(region, 0) + count
+    
+    links = []
+    if engine is not None:
+        seen = set()
+        for p in np.nonzero(counts)[0]:
+            path = engine.paths[p]
+            for edge in zip(path, path[1:]):
+                if edge not in seen and edge[0] in INDIAN_LOCATIONS and edge[1] in INDIAN_LOCATIONS:
+                    seen.add(edge)
+                    links.append(edge)
+    
+    recent = {name: column.copy() for name, column in sim.request_log.tail(SNAPSHOT_ROWS).items()}
+    stats_window = recent['latency'][-STATS_ROWS:]
+    return {
+        'tick': sim.tick,
+        'num_viewers': sim.num_viewers,
+        'cities': list(engine.cities) if engine is not None else [],
+        'city_counts': city_counts,
+        'regions': regions,
+        'links': links,
+        'totals': {
+            'requests': sim.total_requests,
+            'hits': sim.total_hits,
+            'dropped': sim.total_dropped,
+            'bytes_saved': sim.bandwidth_saved_bytes,
+        },
+        'latency': {
+            'mean': float(stats_window.mean()) if len(stats_window) else 0.0,
+            'tails': sim.city_sketch.quantiles() if sim.city_sketch is not None else None,
+        },
+        'recent': recent,
+        'log_rows': sim.request_log.total_rows,
+        # None until a run starts; then edge cities with more than 10 requests
+        'hit_rates': {city: stats['hits'] / stats['requests'] * 100
+                      for city, stats in sim.cache_stats.items() if stats['requests'] > 10}
+                     if sim.cache_stats else None,
+        'policies': {policy: dict(stats) for policy, stats in sim.policy_stats.items() if stats['requests'] > 0},
+    }
+
+def refresh_snapshot():
+    """Start a new tick: bump the version and rebuild the snapshot."""
+    sim.tick += 1
+    sim.snapshot = build_snapshot()
+    return sim.snapshot
+
+def current_snapshot():
+    snapshot = sim.snapshot
+    if snapshot is None:
+        snapshot = sim.snapshot = build_snapshot()
+    return snapshot
+
+def per_tick(callback):
+    """Memoize a callback for the current tick, keyed on its arguments after the trigger.
+    
+    Every tab that asks again before the next tick, with the same stored
+    state, gets the already-formatted output instead of redoing the work.
+    Callbacks run on Flask's request threads, so the cache is locked and an
+    output is only kept if the tick did not move while it was computed.
+    """
+    lock = threading.Lock()
+    cache = {'tick': None, 'results': {}}
+    
+    @functools.wraps(callback)
+    def wrapper(n, *state):
+        tick = current_snapshot()['tick']
+        key = json.dumps(state, default=str, sort_keys=True)
+        with lock:
+            if cache['tick'] == tick and key in cache['results']:
+                return cache['results'][key]
+        result = callback(n, *state)
+        with lock:
+            if current_snapshot()['tick'] == tick:
+                if cache['tick'] != tick:
+                    cache['tick'] = tick
+                    cache['results'] = {}
+                cache['results'][key] = result
+        return result
+    
+    return wrapper
+
+def apply_tick(engine, result):
+    """Fold one engine tick into the dashboard counters."""
+    sim.total_requests += result['requests']
+    sim.total_hits += result['hits']
+    sim.bandwidth_saved_bytes += result['bytes_saved']
+    sim.total_dropped += result.get('dropped', 0)
+    
+    for city, requests, hits in zip(engine.nodes, result['node_requests'], result['node_hits']):
+        if requests and city in sim.cache_stats:
+            stats = sim.cache_stats[city]
+            stats['requests'] += int(requests)
+            stats['hits'] += int(hits)
+            stats['misses'] += int(requests - hits)
+    
+    for policy, delta in result['policies'].items():
+        stats = sim.policy_stats.setdefault(policy, {'requests': 0, 'hits': 0, 'bytes': 0, 'hit_bytes': 0})
+        for field, value in delta.items():
+            stats[field] += value
+    
+    log = result['log']
+    sim.request_log.append(log.get('time', time.time()), log['viewer'], log['city'], log['hit'], log['latency'])
+    if 'latency' in result:
+        # Sharded runs ship sketch buckets for every request and only a sample of the log.
+        sim.city_sketch.add_counts(*result['latency']['city'])
+        sim.tier_sketch.add_counts(*result['latency']['tier'])
+    else:
+        sim.city_sketch.add(log['city'], log['latency'])
+        sim.tier_sketch.add(log['tier'], log['latency'])
+
 def simulation_loop():
     """Simulated CDN loop - works without streaming server"""
     logger.info("🚀 CDN Simulation started")
-    warmup_cycles = 0
+    engine = sim.engine
     
     while sim.running:
         try:
-            warmup_cycles += 1
-            cache_hit_probability = min(0.85, 0.3 + (warmup_cycles * 0.05))
-            segment_size = 500 * 1024  # 500 KB per segment
-            
-            for viewer_id, viewer_data in list(sim.viewers.items()):
-                city = viewer_data['city']
-                cache_path = viewer_data['cache_path']
-                
-                is_hit = len(cache_path) > 1 and random.random() < cache_hit_probability
-                latency = calculate_latency(cache_path, is_hit)
-                
-                sim.total_requests += 1
-                if is_hit:
-                    sim.total_hits += 1
-                    sim.bandwidth_saved_bytes += segment_size
-                
-                for cache_city in cache_path:
-                    if cache_city in sim.cache_stats:
-                        sim.cache_stats[cache_city]['requests'] += 1
-                        if is_hit and cache_city == cache_path[0]:
-                            sim.cache_stats[cache_city]['hits'] += 1
-                        elif not is_hit:
-                            sim.cache_stats[cache_city]['misses'] += 1
-                
-                sim.request_log.append({
-                    'timestamp': datetime.now(),
-                    'viewer_id': viewer_id,
-                    'city': city,
-                    'path': cache_path,
-                    'hit': is_hit,
-                    'latency': latency,
-                })
-            
-            if len(sim.request_log) > 1000:
-                sim.request_log = sim.request_log[-1000:]
+            if sim.engine is not engine:
+                break
+            if isinstance(engine, EventEngine):
+                # Virtual time runs time_scale times faster than the wall clock.
+                result = engine.advance(2 * config.get('time_scale', 1))
+            else:
+                result = engine.tick(time.time())
+            apply_tick(engine, result)
+            refresh_snapshot()
+            publisher.publish(live_snapshot)
             
             time.sleep(2)
             
         except Exception as e:
             logger.error(f"Simulation error: {e}")
             time.sleep(2)
+    
+    if isinstance(engine, ShardedEngine):
+        engine.close()
 
 app.layout = html.Div([
+    # Polls the server only when snapshots can't be pushed; otherwise the browser polls its own socket.
     dcc.Interval(id='interval', interval=2000),
+    dcc.Interval(id='live-poll', interval=500, disabled=not publisher.enabled),
+    dcc.Store(id='live-metrics'),
+    dcc.Store(id='socket-connected', data=False),
+    dcc.Store(id='stats-data'),
+    dcc.Store(id='live-shapes'),
     dcc.Interval(id='config-check', interval=3000),
     dcc.Store(id='click-data-store'),
+    # What each browser's figures were last fully built from; ticks with the same shape send a Patch.
+    dcc.Store(id='india-map-shape'),
+    dcc.Store(id='cache-chart-shape'),
+    dcc.Store(id='latency-chart-shape'),
+    dcc.Store(id='regional-chart-shape'),
+    dcc.Store(id='timeline-chart-shape'),
     
     html.Div([
         html.Div([
@@ -408,7 +376,9 @@ app.layout = html.Div([
                     'WebkitBackgroundClip': 'text', 'WebkitTextFillColor': 'transparent',
                     'lineHeight': '1', 'marginBottom': '8px'
                 }),
-                html.Div('Avg Latency', style={'fontSize': '11px', 'color': '#8b92a8', 'textTransform': 'uppercase'})
+                html.Div('Avg Latency', style={'fontSize': '11px', 'color': '#8b92a8', 'textTransform': 'uppercase'}),
+                html.Div(id='stat-latency-detail', children='p50 0 • p95 0 • p99 0 • p99.9 0',
+                         style={'fontSize': '11px', 'color': '#8b92a8', 'marginTop': '6px'})
             ], style={
                 'position': 'absolute', 'bottom': '30px', 'left': '40px', 'padding': '26px 32px',
                 'backgroundColor': 'rgba(17, 20, 32, 0.93)', 'borderRadius': '18px',
@@ -448,7 +418,8 @@ app.layout = html.Div([
             html.Div([
                 html.H3('⚡ Live Requests', style={'fontSize': '20px', 'fontWeight': '600', 'color': '#e2e8f0', 'marginBottom': '12px'}),
                 html.Div('Green = Hit • Red = Miss', style={'fontSize': '13px', 'color': '#64748b', 'marginBottom': '20px'}),
-                html.Div(id='request-log', style={'maxHeight': '350px', 'overflowY': 'auto'})
+                html.Div(id='request-log', className='request-log',
+                         children=html.Div("Waiting...", className='request-log-empty'))
             ], style={'flex': '1', 'padding': '30px', 'backgroundColor': 'rgba(17, 20, 32, 0.95)', 'borderRadius': '16px', 'marginLeft': '15px', 'border': '1px solid rgba(245, 87, 108, 0.15)'})
         ], style={'display': 'flex', 'marginBottom': '30px'}),
         
@@ -508,9 +479,10 @@ def update_header(n):
 
 @app.callback(
     Output('interval', 'disabled'),
-    Input('config-check', 'n_intervals')
+    Input('config-check', 'n_intervals'),
+    Input('socket-connected', 'data')
 )
-def check_simulation(n):
+def check_simulation(n, socket_connected=False):
     global config, sim
     new_config = load_config()
     should_run = new_config.get('running', False)
@@ -518,66 +490,135 @@ def check_simulation(n):
     if should_run and not sim.running:
         config = new_config
         sim.running = True
-        sim.viewers = {}
         sim.cache_stats = {city: {'hits': 0, 'misses': 0, 'requests': 0} 
                           for city in config.get('cities_enabled', [])}
         sim.total_hits = 0
         sim.total_requests = 0
         sim.bandwidth_saved_bytes = 0
+        sim.total_dropped = 0
+        sim.request_log = RequestLog(config.get('request_log_capacity', 10000))
+        publisher.reset()
         
-        origin_city = config.get('origin_city', 'Chennai')
-        enabled_cities = [c for c in config.get('cities_enabled', []) if c in INDIAN_LOCATIONS]
-        
-        for i in range(config.get('num_viewers', 100)):
-            city = random.choice(enabled_cities)
-            cache_path = get_cache_hierarchy(city, origin_city)
-            sim.viewers[f"v{i}"] = {'city': city, 'cache_path': cache_path}
+        engine_cls = {'event': EventEngine, 'sharded': ShardedEngine, 'replay': TraceEngine}.get(config.get('sim_engine'), SimulationEngine)
+        sim.engine = engine_cls(config, INDIAN_LOCATIONS, get_routing_table().path)
+        sim.policy = sim.engine.policy
+        sim.city_sketch = DDSketchBank(sim.engine.cities)
+        sim.tier_sketch = DDSketchBank(sim.engine.tier_labels)
+        sim.policy_stats = {policy: {'requests': 0, 'hits': 0, 'bytes': 0, 'hit_bytes': 0}
+                           for policy in sim.engine.policies}
         
+        refresh_snapshot()
         threading.Thread(target=simulation_loop, daemon=True).start()
     elif not should_run and sim.running:
         sim.running = False
-        sim.viewers = {}
+        sim.engine = None
+        refresh_snapshot()
     
-    return not sim.running
+    # Keep polling until this tab's socket is up, e.g. if the client script failed to load.
+    return not sim.running or bool(socket_connected)
+
+def stats_data(snapshot):
+    """Numbers behind the stat cards and the Live Requests list; formatted in the browser."""
+    totals = snapshot['totals']
+    tails = snapshot['latency']['tails'] or {q: 0 for q in DEFAULT_QUANTILES}
+    recent = {name: column[-LOG_ROWS:][::-1] for name, column in snapshot['recent'].items()}
+    cities = snapshot['cities']
+    return {
+        'tick': snapshot['tick'],
+        'viewers': snapshot['num_viewers'],
+        'requests': totals['requests'],
+        'hits': totals['hits'],
+        'dropped': totals['dropped'],
+        'bytes_saved': totals['bytes_saved'],
+        'latency': round(snapshot['latency']['mean'], 1),
+        'tails': [[f"p{q * 100:g}", round(float(tails[q]), 1)] for q in DEFAULT_QUANTILES],
+        'rows': len(recent['latency']),
+        # newest first; None while no engine can name the cities
+        'log': {
+            'city': [cities[c] for c in recent['city']],
+            'hit': recent['hit'].astype(bool).tolist(),
+            'latency': recent['latency'].round().astype(int).tolist(),
+        } if cities else None,
+    }
 
 @app.callback(
+    Output('stats-data', 'data'),
+    Input('interval', 'n_intervals')
+)
+@per_tick
+def update_stats_data(n):
+    return stats_data(current_snapshot())
+
+# Stat cards and the request list are formatted in the browser (assets/stats_cards.js).
+app.clientside_callback(
+    ClientsideFunction('stats', 'cards'),
     [Output('stat-viewers', 'children'),
      Output('stat-hitrate', 'children'),
      Output('stat-hitrate-detail', 'children'),
      Output('stat-latency', 'children'),
+     Output('stat-latency-detail', 'children'),
      Output('stat-bandwidth', 'children')],
-    Input('interval', 'n_intervals')
+    Input('stats-data', 'data'),
+    prevent_initial_call=True
 )
-def update_stats(n):
-    hitrate = (sim.total_hits / sim.total_requests * 100) if sim.total_requests > 0 else 0
-    
-    recent = sim.request_log[-100:] if sim.request_log else []
-    avg_latency = np.mean([r['latency'] for r in recent]) if recent else 0
-    
-    bw_bytes = sim.bandwidth_saved_bytes
-    if bw_bytes >= 1024**3:
-        bw_display = f"{bw_bytes / (1024**3):.2f} GB"
-    elif bw_bytes >= 1024**2:
-        bw_display = f"{bw_bytes / (1024**2):.1f} MB"
-    elif bw_bytes >= 1024:
-        bw_display = f"{bw_bytes / 1024:.1f} KB"
-    else:
-        bw_display = f"{bw_bytes} B"
+
+app.clientside_callback(
+    ClientsideFunction('stats', 'log'),
+    Output('request-log', 'children'),
+    Input('stats-data', 'data'),
+    prevent_initial_call=True
+)
+
+def map_state(snapshot):
+    """Enabled cities with their viewer counts and marker sizes, and the links carrying viewers."""
+    city_counts = snapshot['city_counts']
     
-    return (
-        f"{len(sim.viewers):,}",
-        f"{hitrate:.1f}%",
-        f"{sim.total_hits:,}/{sim.total_requests:,} hits",
-        f"{avg_latency:.0f}ms",
-        bw_display
-    )
+    origin_city = config.get('origin_city', 'Chennai')
+    cities = [city for city in config.get('cities_enabled', []) if city in INDIAN_LOCATIONS]
+    types = ['origin' if city == origin_city else INDIAN_LOCATIONS[city]['type'] for city in cities]
+    styles = [MAP_NODE_STYLES.get(t, MAP_DEFAULT_NODE_STYLE) for t in types]
+    viewers = np.array([city_counts.get(city, 0) for city in cities], dtype=np.int64)
+    sizes = np.array([size for _, size in styles]) + np.minimum(viewers / 50, 18)
+    return origin_city, cities, styles, viewers, sizes, snapshot['links']
 
 @app.callback(
-    Output('india-map', 'figure'),
+    [Output('india-map', 'figure'),
+     Output('india-map-shape', 'data')],
     [Input('interval', 'n_intervals'),
-     Input('click-data-store', 'data')]
+     Input('live-shapes', 'data'),
+     Input('click-data-store', 'data')],
+    State('india-map-shape', 'data')
 )
-def update_map(n, click_data):
+@per_tick
+def update_map(n, live_shapes, click_data, shape):
+    origin_city, cities, styles, viewers, sizes, links = map_state(current_snapshot())
+    clicked = click_data.get('city') if click_data else None
+    
+    # Edges, one trace per style: the clicked city's path, links into the origin, other links.
+    highlight, to_origin, other = [], [], []
+    if clicked in INDIAN_LOCATIONS:
+        path = get_cache_hierarchy(clicked, origin_city)
+        highlight = [(a, b) for a, b in zip(path, path[1:]) if a in INDIAN_LOCATIONS and b in INDIAN_LOCATIONS]
+    drawn = set(highlight)
+    for edge in links:
+        if edge not in drawn:
+            (to_origin if edge[1] == origin_city else other).append(edge)
+    edge_styles = [(edges, width, color) for edges, width, color in (
+        (other, 1, 'rgba(102, 126, 234, 0.25)'),
+        (to_origin, 1.5, 'rgba(245, 87, 108, 0.3)'),
+        (highlight, 5, 'rgba(251, 191, 36, 0.9)')) if edges]
+    
+    # 'base' is what pushed snapshots are checked against; they don't know this browser's click.
+    base = figure_shape(cities, origin_city, links)
+    new_shape = {'key': figure_shape(base, clicked), 'base': base}
+    if shape == new_shape:
+        # Same nodes and edges: only the viewer-driven marker sizes and hover counts change.
+        patched = Patch()
+        node = patched['data'][len(edge_styles)]
+        node['marker']['size'] = sizes.round(1).tolist()
+        node['text'] = viewers.tolist()
+        return patched, no_update
+    
     fig = go.Figure()
     
     fig.update_geos(
@@ -594,90 +635,32 @@ def update_map(n, click_data):
         lonaxis=dict(range=[68, 98]),
     )
     
-    city_counts = {}
-    for v in sim.viewers.values():
-        city_counts[v['city']] = city_counts.get(v['city'], 0) + 1
-    
-    enabled_cities = config.get('cities_enabled', [])
-    origin_city = config.get('origin_city', 'Chennai')
-    
-    for city in enabled_cities:
-        if city not in INDIAN_LOCATIONS:
-            continue
-            
-        info = INDIAN_LOCATIONS[city]
-        viewer_count = city_counts.get(city, 0)
-        
-        if city == origin_city:
-            color, size = '#f5576c', 42
-        elif info['type'] == 'regional':
-            color, size = '#667eea', 32
-        elif info['type'] == 'sub-regional':
-            color, size = '#4facfe', 26
-        elif info['type'] == 'local':
-            color, size = '#43e97b', 20
-        else:
-            color, size = '#fbbf24', 16
-        
-        size += min(viewer_count / 50, 18)
-        
-        line_width = 5 if (click_data and click_data.get('city') == city) else 2
-        line_color = '#fbbf24' if (click_data and click_data.get('city') == city) else 'rgba(255,255,255,0.8)'
-        
+    for edges, width, color in edge_styles:
+        lon, lat = edge_lines(edges)
         fig.add_trace(go.Scattergeo(
-            lon=[info['lon']],
-            lat=[info['lat']],
-            text=None,
-            mode='markers',
-            marker=dict(size=size, color=color, line=dict(width=line_width, color=line_color), opacity=0.95),
-            customdata=[[city]],
-            hovertemplate=f"<b>{city}</b><br>Viewers: {viewer_count}<br>Type: {info['type']}<extra></extra>",
+            lon=lon, lat=lat, mode='lines',
+            line=dict(width=width, color=color),
+            hoverinfo='skip',
             showlegend=False
         ))
     
-    drawn = set()
-    
-    if click_data and click_data.get('city'):
-        clicked_city = click_data['city']
-        if clicked_city in INDIAN_LOCATIONS:
-            path = get_cache_hierarchy(clicked_city, origin_city)
-            for i in range(len(path)-1):
-                if path[i] in INDIAN_LOCATIONS and path[i+1] in INDIAN_LOCATIONS:
-                    from_info = INDIAN_LOCATIONS[path[i]]
-                    to_info = INDIAN_LOCATIONS[path[i+1]]
-                    fig.add_trace(go.Scattergeo(
-                        lon=[from_info['lon'], to_info['lon']],
-                        lat=[from_info['lat'], to_info['lat']],
-                        mode='lines',
-                        line=dict(width=5, color='rgba(251, 191, 36, 0.9)'),
-                        hoverinfo='skip',
-                        showlegend=False
-                    ))
-                    drawn.add(f"{path[i]}-{path[i+1]}")
-    
-    for v in list(sim.viewers.values())[:100]:
-        path = v['cache_path']
-        for i in range(len(path)-1):
-            key = f"{path[i]}-{path[i+1]}"
-            if key in drawn or path[i] not in INDIAN_LOCATIONS or path[i+1] not in INDIAN_LOCATIONS:
-                continue
-            drawn.add(key)
-            from_info = INDIAN_LOCATIONS[path[i]]
-            to_info = INDIAN_LOCATIONS[path[i+1]]
-            
-            if path[i+1] == origin_city:
-                line_color, width = 'rgba(245, 87, 108, 0.3)', 1.5
-            else:
-                line_color, width = 'rgba(102, 126, 234, 0.25)', 1
-            
-            fig.add_trace(go.Scattergeo(
-                lon=[from_info['lon'], to_info['lon']],
-                lat=[from_info['lat'], to_info['lat']],
-                mode='lines',
-                line=dict(width=width, color=line_color),
-                hoverinfo='skip',
-                showlegend=False
-            ))
+    selected = np.array([city == clicked for city in cities], dtype=bool)
+    fig.add_trace(go.Scattergeo(
+        lon=np.array([INDIAN_LOCATIONS[city]['lon'] for city in cities]),
+        lat=np.array([INDIAN_LOCATIONS[city]['lat'] for city in cities]),
+        mode='markers',
+        marker=dict(
+            size=sizes.round(1),
+            color=[color for color, _ in styles],
+            line=dict(width=np.where(selected, 5, 2),
+                      color=np.where(selected, '#fbbf24', 'rgba(255,255,255,0.8)')),
+            opacity=0.95
+        ),
+        text=viewers,
+        customdata=[[city, INDIAN_LOCATIONS[city]['type']] for city in cities],
+        hovertemplate="<b>%{customdata[0]}</b><br>Viewers: %{text}<br>Type: %{customdata[1]}<extra></extra>",
+        showlegend=False
+    ))
     
     fig.update_layout(
         title=None,
@@ -689,7 +672,7 @@ def update_map(n, click_data):
         dragmode=False
     )
     
-    return fig
+    return fig, new_shape
 
 @app.callback(
     [Output('click-data-store', 'data'),
@@ -710,8 +693,8 @@ def display_click_info(clickData):
     
     for i in range(1, len(path)):
         loc_type = INDIAN_LOCATIONS.get(path[i], {}).get('type', 'unknown')
-        if loc_type == 'origin':
-            origin_latency += 850
+        if path[i] == origin_city:
+            origin_latency += config.get('origin_latency', 850)
         elif loc_type == 'regional':
             origin_latency += 120
         elif loc_type == 'sub-regional':
@@ -787,85 +770,120 @@ def display_click_info(clickData):
     
     return {'city': city}, details
 
-@app.callback(
-    Output('request-log', 'children'),
-    Input('interval', 'n_intervals')
-)
-def update_log(n):
-    if not sim.request_log:
-        return html.Div("Waiting...", style={'color': '#64748b', 'textAlign': 'center', 'padding': '60px'})
-    
-    entries = []
-    for req in sim.request_log[-25:][::-1]:
-        icon = '●' if req['hit'] else '○'
-        color = '#10b981' if req['hit'] else '#ef4444'
-        status = 'HIT' if req['hit'] else 'MISS'
-        
-        entries.append(html.Div([
-            html.Span(icon, style={'color': color, 'marginRight': '14px', 'fontSize': '16px'}),
-            html.Span(req['city'], style={'fontSize': '15px', 'color': '#e2e8f0', 'fontWeight': '500', 'marginRight': '18px', 'minWidth': '120px', 'display': 'inline-block'}),
-            html.Span(f"{req['latency']:.0f}ms", style={'fontSize': '14px', 'color': color, 'fontWeight': '600', 'marginRight': '12px'}),
-            html.Span(status, style={'fontSize': '12px', 'color': color, 'opacity': '0.7'})
-        ], style={'padding': '12px 0', 'borderBottom': '1px solid rgba(255,255,255,0.05)'}))
+def cache_state(snapshot):
+    """Top-10 edge hit rates and each compared policy's hit and byte-hit ratios, in percent."""
+    hit_rates = snapshot['hit_rates']
+    df = pd.DataFrame({'City': list(hit_rates), 'Hit Rate': list(hit_rates.values())})
+    df = df.sort_values('Hit Rate', ascending=False).head(10)
     
-    return entries
+    policies = snapshot['policies']
+    labels = [POLICY_LABELS.get(p, p) for p in policies]
+    hit_ratios = [stats['hits'] / stats['requests'] * 100 for stats in policies.values()]
+    byte_hit_ratios = [stats['hit_bytes'] / stats['bytes'] * 100 for stats in policies.values()]
+    return df, labels, hit_ratios, byte_hit_ratios
 
 @app.callback(
-    Output('cache-chart', 'figure'),
-    Input('interval', 'n_intervals')
+    [Output('cache-chart', 'figure'),
+     Output('cache-chart-shape', 'data')],
+    [Input('interval', 'n_intervals'),
+     Input('live-shapes', 'data')],
+    State('cache-chart-shape', 'data')
 )
-def update_cache_chart(n):
-    if not sim.cache_stats:
-        fig = go.Figure()
-        fig.add_annotation(text="No data yet", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(size=16, color='#64748b'))
-        fig.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', height=340, margin=dict(l=0,r=0,t=0,b=0))
-        return fig
-    
-    cities = []
-    hitrates = []
-    
-    for city, stats in sim.cache_stats.items():
-        if stats['requests'] > 10:
-            cities.append(city)
-            hitrates.append((stats['hits'] / stats['requests']) * 100)
-    
-    if not cities:
-        fig = go.Figure()
-        fig.add_annotation(text="Collecting data...", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(size=16, color='#64748b'))
-        fig.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', height=340, margin=dict(l=0,r=0,t=0,b=0))
-        return fig
-    
-    df = pd.DataFrame({'City': cities, 'Hit Rate': hitrates})
-    df = df.sort_values('Hit Rate', ascending=False).head(10)
+@per_tick
+def update_cache_chart(n, live_shapes, shape):
+    snapshot = current_snapshot()
+    if snapshot['hit_rates'] is None:
+        return empty_figure("No data yet"), None
+    
+    df, labels, hit_ratios, byte_hit_ratios = cache_state(snapshot)
+    if df.empty:
+        return empty_figure("Collecting data..."), None
+    
+    new_shape = figure_shape('cache', labels)
+    if shape == new_shape:
+        patched = Patch()
+        top = df['Hit Rate'].round(2).tolist()
+        patched['data'][0]['x'] = df['City'].tolist()
+        patched['data'][0]['y'] = top
+        patched['data'][0]['text'] = top
+        patched['data'][0]['marker']['color'] = top
+        patched['data'][1]['y'] = [round(v, 2) for v in hit_ratios]
+        patched['data'][2]['y'] = [round(v, 2) for v in byte_hit_ratios]
+        return patched, no_update
     
-    fig = px.bar(df, x='City', y='Hit Rate', color='Hit Rate', color_continuous_scale='RdYlGn', text='Hit Rate')
-    fig.update_traces(texttemplate='%{text:.1f}%', textposition='outside')
+    fig = make_subplots(rows=1, cols=2, column_widths=[0.62, 0.38], horizontal_spacing=0.08)
+    fig.add_trace(go.Bar(
+        x=df['City'], y=df['Hit Rate'],
+        marker=dict(color=df['Hit Rate'], colorscale='RdYlGn', cmin=0, cmax=100),
+        text=df['Hit Rate'], texttemplate='%{text:.1f}%', textposition='outside',
+        showlegend=False
+    ), row=1, col=1)
+    fig.add_trace(go.Bar(
+        x=labels, y=hit_ratios, name='Hit ratio', marker=dict(color='#4facfe'),
+        texttemplate='%{y:.1f}%', textposition='outside'
+    ), row=1, col=2)
+    fig.add_trace(go.Bar(
+        x=labels, y=byte_hit_ratios, name='Byte-hit ratio', marker=dict(color='#43e97b'),
+        texttemplate='%{y:.1f}%', textposition='outside'
+    ), row=1, col=2)
+    
+    fig.update_xaxes(gridcolor='rgba(255,255,255,0.05)', title='')
+    fig.update_yaxes(gridcolor='rgba(255,255,255,0.05)', range=[0, 110])
+    fig.update_yaxes(title='Hit Rate (%)', row=1, col=1)
     fig.update_layout(
         paper_bgcolor='rgba(0,0,0,0)',
         plot_bgcolor='rgba(0,0,0,0)',
         font=dict(color='#e2e8f0', size=12),
-        xaxis=dict(gridcolor='rgba(255,255,255,0.05)', title=''),
-        yaxis=dict(gridcolor='rgba(255,255,255,0.05)', title='Hit Rate (%)', range=[0, 100]),
         margin=dict(l=40, r=20, t=20, b=40),
-        showlegend=False,
+        barmode='group',
+        showlegend=True,
+        legend=dict(orientation='h', x=1, xanchor='right', y=1.08, font=dict(size=11)),
         height=340
     )
     
-    return fig
+    return fig, new_shape
+
+def quantile_markers(tails):
+    """Vertical p50/p95/p99/p99.9 lines and their labels as layout shapes and annotations."""
+    shapes, annotations = [], []
+    for q, dash_style in zip(DEFAULT_QUANTILES, ['solid', 'dash', 'dot', 'dashdot']):
+        x = round(float(tails[q]), 1)
+        shapes.append(dict(type='line', xref='x', yref='y domain', x0=x, x1=x, y0=0, y1=1,
+                           line=dict(color='#f5576c', width=1.5, dash=dash_style)))
+        annotations.append(dict(xref='x', yref='y domain', x=x, y=1, xanchor='left', yanchor='top',
+                                showarrow=False, text=f"p{q * 100:g} {tails[q]:.0f}ms",
+                                font=dict(size=10, color='#f5576c')))
+    return shapes, annotations
+
+def latency_state(snapshot):
+    """The snapshot's request latencies and the whole-run quantile markers."""
+    latencies = snapshot['recent']['latency']
+    tails = snapshot['latency']['tails']
+    shapes, annotations = quantile_markers(tails) if tails is not None else ([], [])
+    return latencies, shapes, annotations
 
 @app.callback(
-    Output('latency-chart', 'figure'),
-    Input('interval', 'n_intervals')
+    [Output('latency-chart', 'figure'),
+     Output('latency-chart-shape', 'data')],
+    [Input('interval', 'n_intervals'),
+     Input('live-shapes', 'data')],
+    State('latency-chart-shape', 'data')
 )
-def update_latency_chart(n):
-    if not sim.request_log:
-        fig = go.Figure()
-        fig.add_annotation(text="No data yet", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(size=16, color='#64748b'))
-        fig.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', height=340, margin=dict(l=0,r=0,t=0,b=0))
-        return fig
+@per_tick
+def update_latency_chart(n, live_shapes, shape):
+    snapshot = current_snapshot()
+    if not len(snapshot['recent']['latency']):
+        return empty_figure("No data yet"), None
+    
+    latencies, shapes, annotations = latency_state(snapshot)
     
-    recent = sim.request_log[-200:]
-    latencies = [r['latency'] for r in recent]
+    new_shape = figure_shape('latency', len(shapes))
+    if shape == new_shape:
+        patched = Patch()
+        patched['data'][0]['x'] = latencies.round(1).tolist()
+        patched['layout']['shapes'] = shapes
+        patched['layout']['annotations'] = annotations
+        return patched, no_update
     
     fig = go.Figure()
     fig.add_trace(go.Histogram(
@@ -882,28 +900,33 @@ def update_latency_chart(n):
         yaxis=dict(title='Frequency', gridcolor='rgba(255,255,255,0.05)'),
         margin=dict(l=40, r=20, t=20, b=40),
         showlegend=False,
+        shapes=shapes,
+        annotations=annotations,
         height=340
     )
     
-    return fig
+    return fig, new_shape
 
 @app.callback(
-    Output('regional-chart', 'figure'),
-    Input('interval', 'n_intervals')
+    [Output('regional-chart', 'figure'),
+     Output('regional-chart-shape', 'data')],
+    [Input('interval', 'n_intervals'),
+     Input('live-shapes', 'data')],
+    State('regional-chart-shape', 'data')
 )
-def update_regional_chart(n):
-    if not sim.viewers:
-        fig = go.Figure()
-        fig.add_annotation(text="No data yet", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(size=16, color='#64748b'))
-        fig.update_layout(paper_bgcolor='rgba(0,0,0,0)', height=340, margin=dict(l=0,r=0,t=0,b=0))
-        return fig
+@per_tick
+def update_regional_chart(n, live_shapes, shape):
+    snapshot = current_snapshot()
+    if not snapshot['num_viewers']:
+        return empty_figure("No data yet", plot_bg=False), None
     
-    regions = {}
-    for v in sim.viewers.values():
-        city = v['city']
-        if city in INDIAN_LOCATIONS:
-            region = INDIAN_LOCATIONS[city]['region']
-            regions[region] = regions.get(region, 0) + 1
+    regions = snapshot['regions']
+    
+    new_shape = figure_shape('regional', list(regions))
+    if shape == new_shape:
+        patched = Patch()
+        patched['data'][0]['values'] = list(regions.values())
+        return patched, no_update
     
     fig = go.Figure(data=[go.Pie(
         labels=list(regions.keys()),
@@ -921,23 +944,54 @@ def update_regional_chart(n):
         height=340
     )
     
-    return fig
+    return fig, new_shape
+
+TIMELINE_POINTS = 60
 
 @app.callback(
-    Output('timeline-chart', 'figure'),
-    Input('interval', 'n_intervals')
+    [Output('timeline-chart', 'figure'),
+     Output('timeline-chart-shape', 'data')],
+    [Input('interval', 'n_intervals'),
+     Input('live-shapes', 'data')],
+    State('timeline-chart-shape', 'data')
 )
-def update_timeline_chart(n):
-    if not sim.request_log:
-        fig = go.Figure()
-        fig.add_annotation(text="No data yet", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(size=16, color='#64748b'))
-        fig.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', height=340, margin=dict(l=0,r=0,t=0,b=0))
-        return fig
-    
-    recent = sim.request_log[-60:]
-    times = [r['timestamp'] for r in recent]
-    latencies = [r['latency'] for r in recent]
-    hits = [r['hit'] for r in recent]
+@per_tick
+def update_timeline_chart(n, live_shapes, shape):
+    snapshot = current_snapshot()
+    if not len(snapshot['recent']['latency']):
+        return empty_figure("No data yet"), None
+    
+    recent = {name: column[-TIMELINE_POINTS:] for name, column in snapshot['recent'].items()}
+    shown = len(recent['latency'])
+    new_shape = {'rows': snapshot['log_rows'], 'shown': shown, 'last': float(recent['timestamp'][-1])}
+    
+    if shape and shape.get('rows') is not None:
+        added = snapshot['log_rows'] - shape['rows']
+        if added == 0 and shape == new_shape:
+            return no_update, no_update
+        patched = Patch()
+        trace = patched['data'][0]
+        if added >= shown:
+            # The whole window turned over: resend the points, keep the layout.
+            trace['x'] = [datetime.fromtimestamp(t) for t in recent['timestamp']]
+            trace['y'] = recent['latency'].round(1).tolist()
+            trace['marker']['color'] = ['#10b981' if h else '#ef4444' for h in recent['hit']]
+            return patched, new_shape
+        # Append only while the browser's newest point sits right before the new rows.
+        if added > 0 and float(recent['timestamp'][-added - 1]) == shape['last']:
+            new = {name: column[-added:] for name, column in recent.items()}
+            trace['x'].extend([datetime.fromtimestamp(t) for t in new['timestamp']])
+            trace['y'].extend(new['latency'].round(1).tolist())
+            trace['marker']['color'].extend(['#10b981' if h else '#ef4444' for h in new['hit']])
+            for _ in range(shape['shown'] + added - shown):
+                del trace['x'][0]
+                del trace['y'][0]
+                del trace['marker']['color'][0]
+            return patched, new_shape
+    
+    times = [datetime.fromtimestamp(t) for t in recent['timestamp']]
+    latencies = recent['latency']
+    hits = recent['hit']
     
     fig = go.Figure()
     fig.add_trace(go.Scatter(
@@ -962,7 +1016,112 @@ def update_timeline_chart(n):
         height=340
     )
     
-    return fig
+    return fig, new_shape
+
+def live_snapshot():
+    """One tick of chart data for every subscribed browser, with the shape each figure needs to take it."""
+    state = current_snapshot()
+    origin_city, cities, styles, viewers, sizes, links = map_state(state)
+    shapes = {'map': figure_shape(cities, origin_city, links)}
+    snapshot = {
+        'shapes': shapes,
+        'stats': stats_data(state),
+        'map': {'size': sizes.round(1).tolist(), 'text': viewers.tolist()},
+    }
+    
+    if state['hit_rates'] is not None:
+        df, labels, hit_ratios, byte_hit_ratios = cache_state(state)
+        if not df.empty:
+            shapes['cache'] = figure_shape('cache', labels)
+            snapshot['cache'] = {
+                'x': df['City'].tolist(),
+                'y': df['Hit Rate'].round(2).tolist(),
+                'hit_ratio': [round(v, 2) for v in hit_ratios],
+                'byte_hit_ratio': [round(v, 2) for v in byte_hit_ratios],
+            }
+    
+    if len(state['recent']['latency']):
+        latencies, markers, annotations = latency_state(state)
+        shapes['latency'] = figure_shape('latency', len(markers))
+        snapshot['latency'] = {'x': latencies.round(1).tolist(), 'shapes': markers, 'annotations': annotations}
+        
+        recent = {name: column[-TIMELINE_POINTS:] for name, column in state['recent'].items()}
+        shapes['timeline'] = 'timeline'
+        snapshot['timeline'] = {
+            'x': [datetime.fromtimestamp(t).isoformat() for t in recent['timestamp']],
+            'y': recent['latency'].round(1).tolist(),
+            'color': ['#10b981' if h else '#ef4444' for h in recent['hit']],
+        }
+    
+    if state['num_viewers']:
+        regions = state['regions']
+        shapes['regional'] = figure_shape('regional', list(regions))
+        snapshot['regional'] = {'values': list(regions.values())}
+    
+    return snapshot
+
+# Pushed snapshots are applied in the browser (assets/live_metrics.js), without a server round-trip.
+app.clientside_callback(
+    ClientsideFunction('live', 'poll'),
+    Output('live-metrics', 'data'),
+    Input('live-poll', 'n_intervals'),
+    State('live-metrics', 'data')
+)
+
+app.clientside_callback(
+    ClientsideFunction('live', 'connected'),
+    Output('socket-connected', 'data'),
+    Input('live-poll', 'n_intervals'),
+    State('socket-connected', 'data')
+)
+
+app.clientside_callback(
+    ClientsideFunction('live', 'stats'),
+    Output('stats-data', 'data', allow_duplicate=True),
+    Input('live-metrics', 'data'),
+    prevent_initial_call=True
+)
+
+app.clientside_callback(
+    ClientsideFunction('live', 'shapes'),
+    Output('live-shapes', 'data'),
+    Input('live-metrics', 'data'),
+    [State('india-map-shape', 'data'),
+     State('cache-chart-shape', 'data'),
+     State('latency-chart-shape', 'data'),
+     State('regional-chart-shape', 'data'),
+     State('timeline-chart-shape', 'data')],
+    prevent_initial_call=True
+)
+
+for graph_id, shape_id, function in (('india-map', 'india-map-shape', 'map'),
+                                     ('cache-chart', 'cache-chart-shape', 'cache'),
+                                     ('latency-chart', 'latency-chart-shape', 'latency'),
+                                     ('regional-chart', 'regional-chart-shape', 'regional'),
+                                     ('timeline-chart', 'timeline-chart-shape', 'timeline')):
+    app.clientside_callback(
+        ClientsideFunction('live', function),
+        Output(graph_id, 'figure', allow_duplicate=True),
+        Input('live-metrics', 'data'),
+        [State(graph_id, 'figure'),
+         State(shape_id, 'data')],
+        prevent_initial_call=True
+    )
+
+@app.server.route('/api/latency')
+def latency_quantiles():
+    """Whole-run latency quantiles overall, per edge city and per serving tier."""
+    if sim.city_sketch is None:
+        return jsonify({'running': sim.running, 'overall': {}, 'cities': {}, 'tiers': {}})
+    overall = {quantile_label(q): v for q, v in sim.city_sketch.quantiles().items()}
+    overall['count'] = sim.city_sketch.count()
+    return jsonify({
+        'running': sim.running,
+        'relative_error': sim.city_sketch.alpha,
+        'overall': overall,
+        'cities': sim.city_sketch.summary(),
+        'tiers': sim.tier_sketch.summary(),
+    })
 
 if __name__ == '__main__':
     print("\n" + "="*80)
@@ -978,4 +1137,4 @@ if __name__ == '__main__':
     print("   • All 4 graphs working")
     print("="*80 + "\n")
     
-    app.run(debug=False, host='0.0.0.0', port=8051)
+    publisher.run(app, debug=False, host='0.0.0.0', port=8051)